@@ -0,0 +1,25 @@
+"""Weekly schedule windows and date exceptions
+
+Revision ID: weekly_schedule_001
+Revises: interest_revamp_001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'weekly_schedule_001'
+down_revision = 'interest_revamp_001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('system_schedule', sa.Column('weekly_windows', sa.JSON(), nullable=True))
+    op.add_column('system_schedule', sa.Column('exceptions', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('system_schedule', 'exceptions')
+    op.drop_column('system_schedule', 'weekly_windows')
@@ -6,6 +6,10 @@ load_dotenv()
 class Settings:
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./auth_system.db")
+    # Connection pool (SQLAlchemy QueuePool defaults)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-this-secret-key")
@@ -59,4 +63,150 @@ class Settings:
     RATE_LIMIT_LOGIN: int = int(os.getenv("RATE_LIMIT_LOGIN", "5"))
     RATE_LIMIT_REGISTER: int = int(os.getenv("RATE_LIMIT_REGISTER", "3"))
 
+    # Heavy-hitter tracking (top offenders)
+    HEAVY_HITTER_TOP_K: int = int(os.getenv("HEAVY_HITTER_TOP_K", "20"))
+    HEAVY_HITTER_WINDOW_SECONDS: int = int(os.getenv("HEAVY_HITTER_WINDOW_SECONDS", "60"))
+    HEAVY_HITTER_WINDOWS: int = int(os.getenv("HEAVY_HITTER_WINDOWS", "10"))
+    HEAVY_HITTER_DECAY: float = float(os.getenv("HEAVY_HITTER_DECAY", "0.7"))
+
+    # Admission control (per-route-class concurrency limits)
+    ADMISSION_CONTROL_ENABLED: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "True") == "True"
+    # Per class: concurrent requests, queued requests, max queueing time
+    ADMISSION_AUTH_HOT_LIMIT: int = int(os.getenv("ADMISSION_AUTH_HOT_LIMIT", "24"))
+    ADMISSION_AUTH_HOT_QUEUE: int = int(os.getenv("ADMISSION_AUTH_HOT_QUEUE", "200"))
+    ADMISSION_AUTH_HOT_WAIT_MS: int = int(os.getenv("ADMISSION_AUTH_HOT_WAIT_MS", "2000"))
+    ADMISSION_AUTH_GENERATE_LIMIT: int = int(os.getenv("ADMISSION_AUTH_GENERATE_LIMIT", "8"))
+    ADMISSION_AUTH_GENERATE_QUEUE: int = int(os.getenv("ADMISSION_AUTH_GENERATE_QUEUE", "100"))
+    ADMISSION_AUTH_GENERATE_WAIT_MS: int = int(os.getenv("ADMISSION_AUTH_GENERATE_WAIT_MS", "1000"))
+    ADMISSION_ADMIN_LOGIN_LIMIT: int = int(os.getenv("ADMISSION_ADMIN_LOGIN_LIMIT", "2"))
+    ADMISSION_ADMIN_LOGIN_QUEUE: int = int(os.getenv("ADMISSION_ADMIN_LOGIN_QUEUE", "16"))
+    ADMISSION_ADMIN_LOGIN_WAIT_MS: int = int(os.getenv("ADMISSION_ADMIN_LOGIN_WAIT_MS", "2000"))
+    # Prometheus scrapes of /api/monitoring/prometheus
+    ADMISSION_METRICS_SCRAPE_LIMIT: int = int(os.getenv("ADMISSION_METRICS_SCRAPE_LIMIT", "2"))
+    ADMISSION_METRICS_SCRAPE_QUEUE: int = int(os.getenv("ADMISSION_METRICS_SCRAPE_QUEUE", "8"))
+    ADMISSION_METRICS_SCRAPE_WAIT_MS: int = int(os.getenv("ADMISSION_METRICS_SCRAPE_WAIT_MS", "5000"))
+    ADMISSION_ADMIN_LIMIT: int = int(os.getenv("ADMISSION_ADMIN_LIMIT", "4"))
+    ADMISSION_ADMIN_QUEUE: int = int(os.getenv("ADMISSION_ADMIN_QUEUE", "32"))
+    ADMISSION_ADMIN_WAIT_MS: int = int(os.getenv("ADMISSION_ADMIN_WAIT_MS", "1000"))
+    # Cacheable status/health polling and static uploads
+    ADMISSION_PUBLIC_READ_LIMIT: int = int(os.getenv("ADMISSION_PUBLIC_READ_LIMIT", "16"))
+    ADMISSION_PUBLIC_READ_QUEUE: int = int(os.getenv("ADMISSION_PUBLIC_READ_QUEUE", "512"))
+    ADMISSION_PUBLIC_READ_WAIT_MS: int = int(os.getenv("ADMISSION_PUBLIC_READ_WAIT_MS", "2000"))
+    ADMISSION_DEFAULT_LIMIT: int = int(os.getenv("ADMISSION_DEFAULT_LIMIT", "8"))
+    ADMISSION_DEFAULT_QUEUE: int = int(os.getenv("ADMISSION_DEFAULT_QUEUE", "64"))
+    ADMISSION_DEFAULT_WAIT_MS: int = int(os.getenv("ADMISSION_DEFAULT_WAIT_MS", "1000"))
+
+    # Workload executors (threads per pool)
+    EXECUTOR_DB_WORKERS: int = int(os.getenv("EXECUTOR_DB_WORKERS", "16"))
+    EXECUTOR_CRYPTO_WORKERS: int = int(os.getenv("EXECUTOR_CRYPTO_WORKERS", "2"))
+    EXECUTOR_RENDER_WORKERS: int = int(os.getenv("EXECUTOR_RENDER_WORKERS", "4"))
+    EXECUTOR_IO_WORKERS: int = int(os.getenv("EXECUTOR_IO_WORKERS", "8"))
+
+    # Password hashing process pool (0 workers = hash inline)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    PASSWORD_HASH_START_METHOD: str = os.getenv("PASSWORD_HASH_START_METHOD", "spawn")
+
+    # Password hashing cost (calibrate with scripts/calibrate_password_hash.py)
+    PASSWORD_HASH_SCHEME: str = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_KIB: int = int(os.getenv("ARGON2_MEMORY_KIB", "65536"))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "2"))
+
+    # Schedule snapshot cache (shared version file signals other workers)
+    SCHEDULE_VERSION_FILE: str = os.getenv("SCHEDULE_VERSION_FILE", "logs/schedule.version")
+    SCHEDULE_VERSION_CHECK_SECONDS: float = float(os.getenv("SCHEDULE_VERSION_CHECK_SECONDS", "1.0"))
+    # Days of open/close transitions compiled ahead into the lookup table
+    SCHEDULE_HORIZON_DAYS: int = int(os.getenv("SCHEDULE_HORIZON_DAYS", "14"))
+    # Push status to WebSocket subscribers at each transition
+    SCHEDULE_BROADCASTER_ENABLED: bool = os.getenv("SCHEDULE_BROADCASTER_ENABLED", "True").lower() == "true"
+    SCHEDULE_BROADCAST_MAX_SLEEP_SECONDS: float = float(os.getenv("SCHEDULE_BROADCAST_MAX_SLEEP_SECONDS", "60"))
+    # Upper bound on Cache-Control max-age for schedule-derived responses
+    HTTP_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "30"))
+
+    # WebSocket fan-out (/api/system/ws)
+    WS_MAX_CONNECTIONS: int = int(os.getenv("WS_MAX_CONNECTIONS", "10000"))
+    WS_QUEUE_SIZE: int = int(os.getenv("WS_QUEUE_SIZE", "16"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+    WS_HEARTBEAT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_SECONDS", "30"))
+    WS_IDLE_TIMEOUT_SECONDS: float = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "90"))
+
+    # Admin event stream (/api/admin/events/ws)
+    ADMIN_EVENTS_BUFFER_SIZE: int = int(os.getenv("ADMIN_EVENTS_BUFFER_SIZE", "1000"))
+    ADMIN_EVENTS_QUEUE_SIZE: int = int(os.getenv("ADMIN_EVENTS_QUEUE_SIZE", "512"))
+    ADMIN_EVENTS_MAX_CONNECTIONS: int = int(os.getenv("ADMIN_EVENTS_MAX_CONNECTIONS", "100"))
+
+    # Cross-worker pub/sub: "local", "sqlite:///path/broker.db" or "redis://host:6379"
+    BROKER_URL: str = os.getenv("BROKER_URL", "local")
+    BROKER_POLL_SECONDS: float = float(os.getenv("BROKER_POLL_SECONDS", "0.05"))
+
+    # Security audit log (JSON Lines, batched by a writer thread)
+    AUDIT_LOG_FILE: str = os.getenv("AUDIT_LOG_FILE", "logs/security_audit.jsonl")
+    AUDIT_LOG_MAX_BYTES: int = int(os.getenv("AUDIT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    AUDIT_LOG_BACKUP_COUNT: int = int(os.getenv("AUDIT_LOG_BACKUP_COUNT", "30"))
+    AUDIT_QUEUE_SIZE: int = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "512"))
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "0.2"))
+    # 0 = fsync every batch, > 0 = at most every N seconds, < 0 = never (OS decides)
+    AUDIT_FSYNC_INTERVAL_SECONDS: float = float(os.getenv("AUDIT_FSYNC_INTERVAL_SECONDS", "1"))
+
+    # Domain event bus: per-subscriber queue bound, shutdown drain budget
+    EVENT_BUS_QUEUE_SIZE: int = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000"))
+    EVENT_BUS_DRAIN_SECONDS: float = float(os.getenv("EVENT_BUS_DRAIN_SECONDS", "5"))
+
+    # Per-route latency/size/status metrics (pure ASGI middleware)
+    HTTP_METRICS_ENABLED: bool = os.getenv("HTTP_METRICS_ENABLED", "True") == "True"
+    # Requests running more SQL statements than this are logged (0 = off)
+    REQUEST_QUERY_BUDGET: int = int(os.getenv("REQUEST_QUERY_BUDGET", "30"))
+
+    # Request tracing: spans appended as JSON Lines (summarise with scripts/trace_report.py)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "True") == "True"
+    # Share of requests traced unless the caller sent a sampled traceparent
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+    # Traces started per second per worker, sampled or continued (0 = no cap)
+    TRACE_MAX_PER_SECOND: int = int(os.getenv("TRACE_MAX_PER_SECOND", "20"))
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "logs/traces.jsonl")
+    TRACE_MAX_BYTES: int = int(os.getenv("TRACE_MAX_BYTES", str(20 * 1024 * 1024)))
+    TRACE_BACKUP_COUNT: int = int(os.getenv("TRACE_BACKUP_COUNT", "5"))
+    TRACE_QUEUE_SIZE: int = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+    # On-demand stack sampling profiler (GET /api/monitoring/profile)
+    PROFILER_MAX_SECONDS: float = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+    PROFILER_MAX_STACKS: int = int(os.getenv("PROFILER_MAX_STACKS", "10000"))
+
+    # Slow-request watchdog: stack samples of requests still running past their threshold
+    SLOW_REQUEST_WATCHDOG_ENABLED: bool = os.getenv("SLOW_REQUEST_WATCHDOG_ENABLED", "True") == "True"
+    SLOW_REQUEST_THRESHOLD_MS: float = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "1000"))
+    # Per-route overrides: "POST /api/auth/pin/verify=500,/api/admin/audit=5000"
+    SLOW_REQUEST_ROUTES: str = os.getenv("SLOW_REQUEST_ROUTES", "POST /api/auth/pin/verify=500")
+    SLOW_REQUEST_CHECK_MS: float = float(os.getenv("SLOW_REQUEST_CHECK_MS", "100"))
+    SLOW_REQUEST_MAX_SAMPLES: int = int(os.getenv("SLOW_REQUEST_MAX_SAMPLES", "20"))
+    SLOW_REQUEST_BUFFER_SIZE: int = int(os.getenv("SLOW_REQUEST_BUFFER_SIZE", "100"))
+
+    # Memory diagnostics (tracemalloc snapshots kept per worker, frames per allocation)
+    MEMORY_MAX_SNAPSHOTS: int = int(os.getenv("MEMORY_MAX_SNAPSHOTS", "5"))
+    MEMORY_TRACEMALLOC_FRAMES: int = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "1"))
+
+    # Background health probes (cached for /api/monitoring/live, /ready, /startup)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "10"))
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+    # Consecutive failures of a critical probe before the worker reports not ready
+    HEALTH_FAILURE_THRESHOLD: int = int(os.getenv("HEALTH_FAILURE_THRESHOLD", "2"))
+    HEALTH_DISK_PATHS: str = os.getenv("HEALTH_DISK_PATHS", "uploads,logs")
+    HEALTH_DISK_MIN_FREE_MB: float = float(os.getenv("HEALTH_DISK_MIN_FREE_MB", "500"))
+    # SMTP reachability (not critical); on by default when SMTP credentials are set
+    HEALTH_SMTP_PROBE: bool = os.getenv("HEALTH_SMTP_PROBE", str(bool(os.getenv("SMTP_USER")))) == "True"
+
+    # Metrics registry: per-worker snapshot files merged on scrape ("" = this process only)
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "1"))
+
+    # SQL telemetry: statements slower than this are logged (parameters redacted)
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_TELEMETRY_MAX_STATEMENTS: int = int(os.getenv("SQL_TELEMETRY_MAX_STATEMENTS", "500"))
+
+    # Single-flight coalescing: max seconds a follower waits on a shared read
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", "10"))
+
 settings = Settings()
\ No newline at end of file
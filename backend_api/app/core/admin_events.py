@@ -0,0 +1,161 @@
+"""
+Admin Event Stream
+
+Typed domain events pushed to admin dashboards over
+/api/admin/events/ws, replacing polling of metrics and pending queues.
+
+    admin_events.emit(AdminEventType.REGISTRATION_CREATED, pending_user_id=user.id)
+
+- emit() is safe from sync services running in executor threads and
+  from async code; it never blocks the caller.
+- Events travel through the cross-worker broker, so every worker's ring
+  buffer and admin sockets see every event.
+- Each event's cursor is the broker's message id, assigned when the
+  event is received, not by the emitting worker. Ids follow the order
+  every worker receives events in, so they are the same on all workers
+  and never go backwards. A reconnecting dashboard passes its last
+  cursor and receives only what it missed, from the last
+  ADMIN_EVENTS_BUFFER_SIZE events.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.broker import Broker, broker
+from app.core.websocket_manager import ConnectionManager, serialize
+
+ADMIN_EVENTS_CHANNEL = "admin_events"
+
+
+class AdminEventType(str, Enum):
+    REGISTRATION_CREATED = "registration.created"
+    INTEREST_CREATED = "interest.created"
+    WAITLIST_CREATED = "waitlist.created"
+    LOGIN_SUCCEEDED = "login.succeeded"
+    LOGIN_FAILED = "login.failed"
+    LOCKOUT = "security.lockout"
+    RATE_LIMITED = "security.rate_limited"
+    SCHEDULE_CHANGED = "schedule.changed"
+
+
+class AdminEventStream:
+    def __init__(self, buffer_size: int = 1000, queue_size: int = 512, broker: Optional[Broker] = None):
+        self.broker = broker
+        self.buffer_size = buffer_size
+        # (message id, serialized event) in arrival order, ids increasing
+        self._ring: Deque[Tuple[int, str]] = deque(maxlen=buffer_size)
+        self._ring_lock = threading.Lock()
+        # Ids for events received without a broker; see Broker._sequence
+        self._seq = time.time_ns() // 1000
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Admin dashboards; same fan-out engine as /api/system/ws
+        self.subscribers = ConnectionManager(
+            max_connections=settings.ADMIN_EVENTS_MAX_CONNECTIONS,
+            queue_size=queue_size,
+            send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+            heartbeat_interval=settings.WS_HEARTBEAT_SECONDS,
+            idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS
+        )
+        if broker is not None:
+            broker.subscribe_sequenced(ADMIN_EVENTS_CHANNEL, self._receive)
+
+        self.emitted = 0
+
+    def start(self) -> None:
+        """Bind to the running loop so emit() from threads can publish"""
+        self._loop = asyncio.get_running_loop()
+
+    def stop(self) -> None:
+        self._loop = None
+
+    def emit(self, event_type: AdminEventType, **data: Any) -> None:
+        """Broadcast an event; its cursor is assigned on receipt"""
+        payload = serialize({
+            "type": "event",
+            "event": event_type.value,
+            "timestamp": datetime.utcnow().isoformat(),
+            "data": data
+        })
+        self.emitted += 1
+
+        loop = self._loop
+        if self.broker is None or loop is None or loop.is_closed():
+            # Not started (scripts, unit tests): this process only
+            with self._ring_lock:
+                self._seq += 1
+                message_id = self._seq
+            self._receive(message_id, payload)
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(self._publish(payload))
+        else:
+            loop.call_soon_threadsafe(lambda: loop.create_task(self._publish(payload)))
+
+    async def _publish(self, payload: str) -> None:
+        try:
+            await self.broker.publish(ADMIN_EVENTS_CHANNEL, payload)
+        except Exception as e:
+            print(f"Warning: admin event publish failed: {e}")
+
+    def _receive(self, message_id: int, payload: str) -> None:
+        # The cursor goes first in the already-serialized event
+        payload = f'{{"cursor":{message_id},{payload[1:]}'
+        with self._ring_lock:
+            self._ring.append((message_id, payload))
+        self.subscribers.deliver(payload)
+
+    def since(self, cursor: Optional[str], limit: int = 100) -> Tuple[List[str], bool]:
+        """
+        Serialized events after `cursor` (oldest first), and whether events
+        may have been missed: the cursor is older than this worker's
+        buffer (evicted, or from before the worker started) or malformed.
+        A cursor newer than the buffer is a worker still catching up on
+        the broker feed; the events follow live.
+        """
+        with self._ring_lock:
+            events = list(self._ring)
+        if cursor is None:
+            return [payload for _, payload in events[-limit:]], False
+        if not events:
+            # Restarted, or nothing received yet: whatever came before is gone
+            return [], True
+        try:
+            after = int(cursor)
+        except ValueError:
+            return [], True
+
+        truncated = after < events[0][0]
+        newer = [payload for message_id, payload in events if message_id > after]
+        return newer[:limit], truncated
+
+    def latest_cursor(self) -> Optional[str]:
+        with self._ring_lock:
+            return str(self._ring[-1][0]) if self._ring else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "emitted": self.emitted,
+            "buffered": len(self._ring),
+            "buffer_size": self.buffer_size,
+            "latest_cursor": self.latest_cursor(),
+            "subscribers": self.subscribers.stats()
+        }
+
+
+# Global instance
+admin_events = AdminEventStream(
+    buffer_size=settings.ADMIN_EVENTS_BUFFER_SIZE,
+    queue_size=settings.ADMIN_EVENTS_QUEUE_SIZE,
+    broker=broker
+)
@@ -0,0 +1,316 @@
+"""
+Audit Log Index and Search
+
+Closed (rotated) audit segments are sealed into a seekable compressed
+form plus a sparse index, so incident queries read only the blocks that
+can match:
+
+    security_audit.jsonl         active segment, plain JSON Lines
+    security_audit.jsonl.1.seg   independently zlib-compressed blocks of whole lines
+    security_audit.jsonl.1.idx   per-block byte offset, length, time range
+                                 and postings: event / ip / user_id / success -> block numbers
+
+    results = audit_search.search(event="pin_verified", success=False, ip="10.0.0.7",
+                                  since=datetime.utcnow() - timedelta(hours=6))
+
+- Sealed segments are memory-mapped; a query intersects the postings of
+  every filter, drops blocks outside the time range, and decompresses
+  only what remains.
+- The active segment (at most AUDIT_LOG_MAX_BYTES) has no index yet; it
+  is memory-mapped and lines are pre-filtered on raw bytes before any
+  JSON is parsed.
+- Results are newest first.
+"""
+import json
+import mmap
+import os
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.config import settings
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+INDEXED_FIELDS = ("event", "ip", "user_id", "success")
+
+
+def _key(value: Any) -> str:
+    """Posting key for a field value, as it appears after JSON round-trip"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "null" if value is None else str(value)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    """Audit timestamps are naive UTC ISO strings, compared as text"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def seal_segment(raw_path: str, block_bytes: int = 64 * 1024, level: int = 6) -> Dict[str, Any]:
+    """
+    Compress a closed JSON Lines segment into <raw_path>.seg + .idx and
+    remove the raw file. Returns the index. Call with the audit log's
+    rotation lock held (AuditLogger._rotate): no worker may still be
+    appending to raw_path.
+    """
+    blocks: List[Dict[str, Any]] = []
+    postings: Dict[str, Dict[str, Set[int]]] = {field: {} for field in INDEXED_FIELDS}
+    seg_path, idx_path = raw_path + SEGMENT_SUFFIX, raw_path + INDEX_SUFFIX
+    records = 0
+
+    with open(raw_path, "rb") as source, open(seg_path + ".tmp", "wb") as target:
+        offset = 0
+        pending: List[bytes] = []
+        pending_bytes = 0
+        first_ts = last_ts = None
+
+        def flush_block():
+            nonlocal offset, pending, pending_bytes, first_ts, last_ts
+            data = zlib.compress(b"".join(pending), level)
+            target.write(data)
+            blocks.append({
+                "offset": offset,
+                "length": len(data),
+                "records": len(pending),
+                "first_ts": first_ts,
+                "last_ts": last_ts
+            })
+            offset += len(data)
+            pending, pending_bytes, first_ts, last_ts = [], 0, None, None
+
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            block = len(blocks)
+            ts = record.get("ts")
+            if ts:
+                first_ts = ts if first_ts is None or ts < first_ts else first_ts
+                last_ts = ts if last_ts is None or ts > last_ts else last_ts
+            for field in INDEXED_FIELDS:
+                postings[field].setdefault(_key(record.get(field)), set()).add(block)
+            pending.append(line if line.endswith(b"\n") else line + b"\n")
+            pending_bytes += len(line)
+            records += 1
+            if pending_bytes >= block_bytes:
+                flush_block()
+        if pending:
+            flush_block()
+
+    index = {
+        "version": 1,
+        "records": records,
+        "first_ts": min((b["first_ts"] for b in blocks if b["first_ts"]), default=None),
+        "last_ts": max((b["last_ts"] for b in blocks if b["last_ts"]), default=None),
+        "blocks": blocks,
+        "postings": {
+            field: {key: sorted(ids) for key, ids in values.items()}
+            for field, values in postings.items()
+        }
+    }
+    with open(idx_path + ".tmp", "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    # Index lands first: a .seg is never visible without its .idx
+    os.replace(idx_path + ".tmp", idx_path)
+    os.replace(seg_path + ".tmp", seg_path)
+    os.remove(raw_path)
+    return index
+
+
+class AuditSearch:
+    def __init__(self, log_file: str, backup_count: int = 30):
+        self.log_file = log_file
+        self.backup_count = backup_count
+        # idx path -> ((mtime, size), index)
+        self._indexes: Dict[str, Tuple[Tuple[float, int], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _load_index(self, idx_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            stat = os.stat(idx_path)
+        except FileNotFoundError:
+            return None
+        version = (stat.st_mtime, stat.st_size)
+        with self._lock:
+            cached = self._indexes.get(idx_path)
+        if cached and cached[0] == version:
+            return cached[1]
+        with open(idx_path) as f:
+            index = json.load(f)
+        with self._lock:
+            self._indexes[idx_path] = (version, index)
+        return index
+
+    def sealed_segments(self) -> List[str]:
+        """Sealed segment base paths, newest first"""
+        paths = []
+        for number in range(1, self.backup_count + 1):
+            base = f"{self.log_file}.{number}"
+            if os.path.exists(base + SEGMENT_SUFFIX):
+                paths.append(base)
+        return paths
+
+    def search(
+        self,
+        event: Optional[str] = None,
+        ip: Optional[str] = None,
+        user_id: Optional[int] = None,
+        success: Optional[bool] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        # Most selective first: the first filter drives the byte search
+        filters = {
+            field: _key(value)
+            for field, value in (("ip", ip), ("user_id", user_id), ("event", event), ("success", success))
+            if value is not None
+        }
+        since_ts = _iso(since)
+        until_ts = _iso(until)
+        scan = {"segments": 0, "blocks_total": 0, "blocks_read": 0, "compressed_bytes_read": 0, "lines_parsed": 0}
+        results: List[Dict[str, Any]] = []
+
+        def matches(record: Dict[str, Any]) -> bool:
+            ts = record.get("ts") or ""
+            if since_ts and ts < since_ts or until_ts and ts > until_ts:
+                return False
+            return all(_key(record.get(field)) == key for field, key in filters.items())
+
+        for record in self._scan_active(filters, scan):
+            if matches(record):
+                results.append(record)
+                if len(results) >= limit:
+                    return {"results": results, "truncated": True, "scan": scan}
+
+        for base in self.sealed_segments():
+            index = self._load_index(base + INDEX_SUFFIX)
+            if index is None or not index["blocks"]:
+                continue
+            if since_ts and index["last_ts"] and index["last_ts"] < since_ts:
+                # Older segments are older still
+                break
+            if until_ts and index["first_ts"] and index["first_ts"] > until_ts:
+                continue
+            scan["segments"] += 1
+            scan["blocks_total"] += len(index["blocks"])
+            for record in self._scan_sealed(base, index, filters, since_ts, until_ts, scan):
+                if matches(record):
+                    results.append(record)
+                    if len(results) >= limit:
+                        return {"results": results, "truncated": True, "scan": scan}
+
+        return {"results": results, "truncated": False, "scan": scan}
+
+    def _scan_active(self, filters: Dict[str, str], scan: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+        needles = _needles(filters)
+        try:
+            f = open(self.log_file, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            scan["segments"] += 1
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from _parse_lines(mm, size, needles, scan)
+
+    def _scan_sealed(
+        self,
+        base: str,
+        index: Dict[str, Any],
+        filters: Dict[str, str],
+        since_ts: Optional[str],
+        until_ts: Optional[str],
+        scan: Dict[str, int]
+    ) -> Iterator[Dict[str, Any]]:
+        candidates: Optional[Set[int]] = None
+        for field, key in filters.items():
+            blocks = set(index["postings"].get(field, {}).get(key, ()))
+            candidates = blocks if candidates is None else candidates & blocks
+            if not candidates:
+                return
+        if candidates is None:
+            candidates = set(range(len(index["blocks"])))
+
+        needles = _needles(filters)
+        try:
+            f = open(base + SEGMENT_SUFFIX, "rb")
+        except FileNotFoundError:
+            return
+        with f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for number in sorted(candidates, reverse=True):
+                block = index["blocks"][number]
+                if since_ts and block["last_ts"] and block["last_ts"] < since_ts:
+                    continue
+                if until_ts and block["first_ts"] and block["first_ts"] > until_ts:
+                    continue
+                try:
+                    data = zlib.decompress(mm[block["offset"]:block["offset"] + block["length"]])
+                except zlib.error:
+                    # Segment replaced under us by a rotation; its index is stale
+                    continue
+                scan["blocks_read"] += 1
+                scan["compressed_bytes_read"] += block["length"]
+                yield from _parse_lines(data, len(data), needles, scan)
+
+
+def _needles(filters: Dict[str, str]) -> List[bytes]:
+    """Raw byte fragments every matching line must contain (as json.dumps writes them)"""
+    needles = []
+    for field, key in filters.items():
+        value = key if field in ("user_id", "success") or key == "null" else json.dumps(key)
+        needles.append(f'"{field}": {value}'.encode())
+    return needles
+
+
+def _candidate_lines(buf, size: int, needles: List[bytes]) -> Iterator[bytes]:
+    """
+    Lines containing every needle, last line first. With needles, jumps
+    between occurrences of the first one instead of visiting each line.
+    """
+    if not needles:
+        end = size
+        while end > 0:
+            start = buf.rfind(b"\n", 0, end) + 1
+            if start < end:
+                yield buf[start:end]
+            end = start - 1
+        return
+
+    first, rest = needles[0], needles[1:]
+    pos = size
+    while True:
+        hit = buf.rfind(first, 0, pos)
+        if hit < 0:
+            return
+        start = buf.rfind(b"\n", 0, hit) + 1
+        end = buf.find(b"\n", hit, size)
+        line = buf[start:end if end >= 0 else size]
+        if all(needle in line for needle in rest):
+            yield line
+        pos = start
+
+
+def _parse_lines(buf, size: int, needles: List[bytes], scan: Dict[str, int]) -> Iterator[Dict[str, Any]]:
+    for line in _candidate_lines(buf, size, needles):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        scan["lines_parsed"] += 1
+        yield record
+
+
+# Global instance
+audit_search = AuditSearch(settings.AUDIT_LOG_FILE, settings.AUDIT_LOG_BACKUP_COUNT)
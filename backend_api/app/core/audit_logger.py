@@ -1,10 +1,44 @@
-import logging
-import logging.handlers
+"""
+Security Audit Log
+
+Auth handlers record security events through `audit.log(...)`, which
+only appends a tuple to a bounded in-memory queue. A dedicated writer
+thread drains the queue in batches, serializes them as JSON Lines and
+issues one write() per batch to AUDIT_LOG_FILE.
+
+    {"ts": "2024-05-01T09:30:00.123456", "level": "warning", "event": "pin_verified",
+     "success": false, "ip": "10.0.0.7", "user_id": null, "service_id": null, "details": {...}}
+
+- Durability: AUDIT_FSYNC_INTERVAL_SECONDS = 0 fsyncs every batch, > 0
+  at most that often, < 0 leaves flushing to the OS.
+- Overflow: when the queue is full the record is dropped and counted;
+  the next batch starts with an "audit_dropped" record carrying the count
+  so the gap is visible in the log itself.
+- Rotation: size-based, checked once per batch. Closed segments are
+  sealed into compressed, indexed <file>.1.seg ... <file>.N.seg for
+  searching (core/audit_index.py).
+- Several workers append to the same file. Writes hold a shared flock
+  on <file>.lock and first reopen the file if its inode changed, and
+  rotation (rename, shift, seal) holds it exclusively, so no worker
+  writes to a segment once it has been renamed for sealing.
+"""
 import json
 import os
+from contextlib import contextmanager
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.audit_index import INDEX_SUFFIX, SEGMENT_SUFFIX, seal_segment
+
+try:
+    import fcntl
+except ImportError:  # Windows: development only, a single worker
+    fcntl = None
 
 class AuditEventType(Enum):
     QR_GENERATED = "qr_generated"
@@ -18,30 +52,57 @@ class AuditEventType(Enum):
     SUSPICIOUS = "suspicious"
 
 class AuditLogger:
-    def __init__(self, log_file: str = "logs/security_audit.log"):
-        self.logger = logging.getLogger("security.audit")
-        self.logger.setLevel(logging.INFO)
-        
-        # GAP-L01: Ensure logs directory exists
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-        
-        # Handler is set up in logging_config.py usually, 
-        # but safely adding here if not configured
-        if not self.logger.handlers:
-            # GAP-L02: Use RotatingFileHandler for log rotation
-            handler = logging.handlers.RotatingFileHandler(
-                log_file,
-                maxBytes=10*1024*1024,  # 10MB per file
-                backupCount=30           # Keep 30 backup files
-            )
-            formatter = logging.Formatter(
-                '%(asctime)s | %(levelname)s | %(message)s'
-            )
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-    
+    def __init__(
+        self,
+        log_file: str = "logs/security_audit.jsonl",
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 30,
+        queue_size: int = 10000,
+        batch_size: int = 512,
+        flush_interval: float = 0.2,
+        fsync_interval: float = 1.0
+    ):
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+
+        # (time, level, event, success, ip, user_id, service_id, details)
+        self._queue: Deque[Tuple] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        # Set once everything enqueued so far is on disk (or dropped)
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._closing = False
+
+        self._fd: Optional[int] = None
+        # (st_dev, st_ino) of the file self._fd has open
+        self._inode: Optional[Tuple[int, int]] = None
+        self._lock_fd: Optional[int] = None
+        self._size = 0
+        self._last_fsync = 0.0
+        self._pending_drops = 0
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.rotations = 0
+        self.sealed = 0
+        self.write_errors = 0
+        self.peak_depth = 0
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
     def log(
         self,
         event_type: AuditEventType,
@@ -51,31 +112,244 @@ class AuditLogger:
         service_id: int = None,
         details: Dict[str, Any] = None
     ):
+        """Queue a security event; never blocks on disk"""
+        level = "info" if success else "warning"
+        self._enqueue((time.time(), level, event_type.value, success, ip_address, user_id, service_id, details))
+
+    def log_suspicious(self, ip: str, reason: str, details: dict = None):
+        """Log suspicious activity that requires attention."""
+        self._enqueue((
+            time.time(), "error", AuditEventType.SUSPICIOUS.value, False, ip, None, None,
+            dict(details or {}, reason=reason)
+        ))
+
+    def _enqueue(self, record: Tuple) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        with self._lock:
+            depth = len(self._queue)
+            if depth >= self.queue_size:
+                self.dropped += 1
+                self._pending_drops += 1
+                return
+            self._queue.append(record)
+            self.enqueued += 1
+            if depth + 1 > self.peak_depth:
+                self.peak_depth = depth + 1
+            self._idle.clear()
+        if depth + 1 >= self.batch_size:
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # First use, or a forked child that inherited a dead writer
+            self._pid = os.getpid()
+            self._fd = None
+            # flock is per open file description: a child must not share the parent's
+            self._lock_fd = None
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                    drops, self._pending_drops = self._pending_drops, 0
+                    if not batch and not drops:
+                        self._idle.set()
+                        closing = self._closing
+                        break
+                self._write_batch(batch, drops)
+            if closing:
+                self._close_file()
+                return
+
+    def _write_batch(self, batch: List[Tuple], drops: int) -> None:
+        lines = []
+        if drops:
+            lines.append(json.dumps({
+                "ts": datetime.utcnow().isoformat(),
+                "level": "error",
+                "event": "audit_dropped",
+                "success": False,
+                "details": {"count": drops}
+            }))
+        for ts, level, event, success, ip, user_id, service_id, details in batch:
+            lines.append(json.dumps({
+                "ts": datetime.utcfromtimestamp(ts).isoformat(),
+                "level": level,
+                "event": event,
+                "success": success,
+                "ip": ip or "unknown",
+                "user_id": user_id,
+                "service_id": service_id,
+                "details": details or {}
+            }, default=str))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        try:
+            with self._locked(shared=True):
+                if self._fd is None or self._rotated_elsewhere():
+                    self._close_file()
+                    self._open_file()
+                os.write(self._fd, data)
+                # Other workers append too: the file's size, not our writes
+                self._size = os.fstat(self._fd).st_size
+            self.written += len(batch)
+            self.batches += 1
+            self._maybe_fsync()
+            if self.max_bytes and self._size >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            self.write_errors += 1
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+            self._fd = None
+            print(f"Warning: audit log write failed ({len(batch)} records lost): {e}")
+
+    def _open_file(self) -> None:
+        log_dir = os.path.dirname(self.log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self._fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o640)
+        stat = os.fstat(self._fd)
+        self._inode = (stat.st_dev, stat.st_ino)
+        self._size = stat.st_size
+
+    def _rotated_elsewhere(self) -> bool:
+        """True when another worker rotated the file we have open"""
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            return True
+        return (stat.st_dev, stat.st_ino) != self._inode
+
+    @contextmanager
+    def _locked(self, shared: bool):
+        if fcntl is None:
+            yield
+            return
+        if self._lock_fd is None:
+            log_dir = os.path.dirname(self.log_file)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            self._lock_fd = os.open(self.log_file + ".lock", os.O_RDWR | os.O_CREAT, 0o640)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _close_file(self) -> None:
+        if self._fd is not None:
+            if self.fsync_interval >= 0:
+                os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def _maybe_fsync(self) -> None:
+        if self.fsync_interval < 0:
+            return
+        now = time.monotonic()
+        if now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._fd)
+            self._last_fsync = now
+            self.fsyncs += 1
+
+    def _rotate(self) -> None:
         """
-        Log a security event in a structured format.
-        Format: timestamp | LEVEL | event=... success=... ip=...
+        <file> -> <file>.1, sealed into <file>.1.seg/.idx (see audit_index);
+        older segments shift to .2 ... .N as with RotatingFileHandler.
+        Runs under the exclusive lock: writers wait, then reopen <file>.
         """
-        entry = {
-            "event": event_type.value,
-            "success": str(success).lower(),
-            "ip": ip_address or "unknown",
-            "user_id": str(user_id) if user_id else "nan",
-            "service_id": str(service_id) if service_id else "nan",
-            "details": json.dumps(details or {})
+        with self._locked(shared=False):
+            if self._rotated_elsewhere():
+                # Another worker got here first
+                self._close_file()
+                self._open_file()
+                return
+            self._close_file()
+            first = f"{self.log_file}.1"
+            if os.path.exists(first):
+                # Left over from a seal interrupted by a crash
+                self._seal(first)
+            for index in range(self.backup_count - 1, 0, -1):
+                for suffix in (INDEX_SUFFIX, SEGMENT_SUFFIX):
+                    source = f"{self.log_file}.{index}{suffix}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.log_file}.{index + 1}{suffix}")
+            if self.backup_count > 0:
+                os.replace(self.log_file, first)
+            else:
+                os.remove(self.log_file)
+            self.rotations += 1
+            self._open_file()
+            if self.backup_count > 0:
+                self._seal(first)
+
+    def _seal(self, raw_path: str) -> None:
+        try:
+            seal_segment(raw_path)
+            self.sealed += 1
+        except (OSError, ValueError) as e:
+            # Raw segment stays in place and is sealed on the next rotation
+            self.write_errors += 1
+            print(f"Warning: sealing audit segment {raw_path} failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is written; False on timeout"""
+        if self._pid != os.getpid():
+            return True
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain the queue, fsync and stop the writer (call at shutdown)"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._closing = True
+        self._wake.set()
+        thread.join(timeout)
+        # A later log() starts a fresh writer
+        self._pid = None
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth = len(self._queue)
+        return {
+            "file": self.log_file,
+            "queue_depth": depth,
+            "peak_depth": self.peak_depth,
+            "queue_size": self.queue_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "fsyncs": self.fsyncs,
+            "rotations": self.rotations,
+            "sealed_segments": self.sealed,
+            "write_errors": self.write_errors
         }
-        
-        # Create key=value string
-        log_line = " | ".join(f"{k}={v}" for k, v in entry.items())
-        
-        if success:
-            self.logger.info(log_line)
-        else:
-            self.logger.warning(log_line)
-    
-    def log_suspicious(self, ip: str, reason: str, details: dict = None):
-        """Log suspicious activity that requires attention."""
-        detail_str = json.dumps(details or {})
-        self.logger.error(f"SUSPICIOUS | ip={ip} | reason={reason} | details={detail_str}")
 
 def detect_suspicious_patterns(ip: str, db, threshold_failures: int = 10, threshold_scans: int = 50) -> bool:
     """
@@ -124,5 +398,13 @@ def detect_suspicious_patterns(ip: str, db, threshold_failures: int = 10, thresh
     return suspicious
 
 # Global instance
-audit = AuditLogger()
+audit = AuditLogger(
+    log_file=settings.AUDIT_LOG_FILE,
+    max_bytes=settings.AUDIT_LOG_MAX_BYTES,
+    backup_count=settings.AUDIT_LOG_BACKUP_COUNT,
+    queue_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    fsync_interval=settings.AUDIT_FSYNC_INTERVAL_SECONDS
+)
 
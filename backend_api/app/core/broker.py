@@ -0,0 +1,393 @@
+"""
+Cross-Worker Message Broker
+
+Pub/sub used by the WebSocket manager so a broadcast made in one uvicorn
+worker reaches subscribers connected to every worker (and host).
+
+Backends, picked from BROKER_URL:
+- local (default): in-process only; right for a single worker
+- sqlite:///path/to/broker.db: change feed in a shared SQLite file (WAL);
+  workers on one host poll `PRAGMA data_version` and read new rows
+- redis://[:password@]host:port: Redis PUBLISH/SUBSCRIBE over a small
+  built-in RESP client (no extra dependency); works across hosts
+
+Guarantees: every started broker delivers each message to its handlers
+once, in one global order (row id for SQLite, server order for Redis).
+Publishers receive their own messages through the same feed, so local
+and remote subscribers see the same order. A broker that is not started
+(scripts, unit tests) delivers to local handlers directly.
+
+Each message also gets an id that increases along that order and is the
+same on every worker (SQLite row id, a Redis counter incremented
+atomically with the PUBLISH, a process counter seeded from the clock for the local broker);
+handlers registered with subscribe_sequenced() receive it.
+"""
+import asyncio
+import functools
+import inspect
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+from app.config import settings
+from app.core.executors import run_in
+
+Handler = Callable[[str], Union[None, Awaitable[None]]]
+# (message id, payload)
+SequencedHandler = Callable[[int, str], Union[None, Awaitable[None]]]
+
+
+class Broker:
+    """Base class: handler registry, local dispatch and counters"""
+    backend = "local"
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._sequenced: Dict[str, List[SequencedHandler]] = {}
+        # Message ids of the local broker and of unstarted brokers. Starts
+        # at the clock (µs) so ids keep increasing across restarts and a
+        # client's cursor from before one still compares correctly.
+        self._sequence = time.time_ns() // 1000
+        self.running = False
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """Register a handler; call before start()"""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def subscribe_sequenced(self, channel: str, handler: SequencedHandler) -> None:
+        """Register a handler called with (message id, payload); call before start()"""
+        self._sequenced.setdefault(channel, []).append(handler)
+        self._handlers.setdefault(channel, [])
+
+    async def _dispatch(self, channel: str, payload: str, message_id: int) -> None:
+        self.received += 1
+        calls = [functools.partial(handler, payload) for handler in self._handlers.get(channel, [])]
+        calls += [functools.partial(handler, message_id, payload) for handler in self._sequenced.get(channel, [])]
+        for call in calls:
+            try:
+                result = call()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                self.errors += 1
+                print(f"Warning: broker handler for '{channel}' failed: {e}")
+
+    async def start(self) -> None:
+        self.running = True
+
+    async def stop(self) -> None:
+        self.running = False
+
+    async def publish(self, channel: str, payload: str) -> None:
+        self.published += 1
+        self._sequence += 1
+        await self._dispatch(channel, payload, self._sequence)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "running": self.running,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors
+        }
+
+
+class LocalBroker(Broker):
+    """Single-process delivery"""
+
+
+class SQLiteBroker(Broker):
+    """
+    Change feed in a shared SQLite database.
+    Rows are read in id order; each worker remembers the last id it saw.
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str, poll_interval: float = 0.05, retention_seconds: float = 300.0):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention_seconds
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self._kick: Optional[asyncio.Event] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS broker_messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "channel TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _open(self) -> None:
+        with self._conn_lock:
+            conn = self._connection()
+            row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM broker_messages").fetchone()
+            # Start at the tail: history from before this worker started is not replayed
+            self._last_id = row[0]
+            self._data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _insert(self, channel: str, payload: str) -> None:
+        with self._conn_lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO broker_messages (channel, payload, created_at) VALUES (?, ?, ?)",
+                (channel, payload, time.time())
+            )
+            if self.published % 100 == 0:
+                conn.execute("DELETE FROM broker_messages WHERE created_at < ?", (time.time() - self.retention,))
+
+    def _fetch(self, force: bool) -> List[Tuple[int, str, str]]:
+        with self._conn_lock:
+            conn = self._connection()
+            # data_version only changes on other connections' commits; own
+            # inserts set `force`
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self._data_version:
+                return []
+            self._data_version = version
+            rows = conn.execute(
+                "SELECT id, channel, payload FROM broker_messages WHERE id > ? ORDER BY id",
+                (self._last_id,)
+            ).fetchall()
+            if rows:
+                self._last_id = rows[-1][0]
+            return rows
+
+    async def start(self) -> None:
+        await run_in("io", self._open)
+        self._kick = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._poll())
+        self.running = True
+
+    async def stop(self) -> None:
+        self.running = False
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def publish(self, channel: str, payload: str) -> None:
+        if not self.running:
+            return await super().publish(channel, payload)
+        self.published += 1
+        await run_in("io", self._insert, channel, payload)
+        self._kick.set()
+
+    async def _poll(self) -> None:
+        while True:
+            force = self._kick.is_set()
+            self._kick.clear()
+            try:
+                for message_id, channel, payload in await run_in("io", self._fetch, force):
+                    await self._dispatch(channel, payload, message_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"Warning: SQLite broker poll failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._kick.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({"path": self.path, "last_id": self._last_id})
+        return stats
+
+
+class RESPError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+def encode_command(*args: Union[str, bytes]) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise RESPError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RESPError(f"Unexpected reply type: {line!r}")
+
+
+class RedisBroker(Broker):
+    """
+    Redis pub/sub. One connection publishes, one holds the subscription;
+    the subscriber reconnects with backoff. Messages published while a
+    worker is disconnected are lost for that worker (pub/sub semantics).
+    Messages go out as "<id> <payload>", the id taken from SEQUENCE_KEY
+    in the same script as the PUBLISH so ids follow delivery order.
+    """
+    backend = "redis"
+    SEQUENCE_KEY = "broker:sequence"
+    PUBLISH_SCRIPT = (
+        "local id = redis.call('INCR', KEYS[1]) "
+        "redis.call('PUBLISH', ARGV[1], id .. ' ' .. ARGV[2]) "
+        "return id"
+    )
+
+    def __init__(self, url: str, reconnect_max_seconds: float = 5.0):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.reconnect_max = reconnect_max_seconds
+
+        self._pub: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._pub_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        self.reconnects = 0
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(encode_command("AUTH", self.password))
+            await writer.drain()
+            await read_reply(reader)
+        return reader, writer
+
+    async def start(self) -> None:
+        self._pub_lock = asyncio.Lock()
+        self._subscribed = asyncio.Event()
+        self.running = True
+        self._task = asyncio.get_running_loop().create_task(self._subscribe_loop())
+        # Don't report started until messages published from now on will arrive
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), self.reconnect_max)
+        except asyncio.TimeoutError:
+            print(f"Warning: Redis broker not yet subscribed at {self.host}:{self.port}; retrying in background")
+
+    async def stop(self) -> None:
+        self.running = False
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._pub is not None:
+            self._pub[1].close()
+            self._pub = None
+
+    async def publish(self, channel: str, payload: str) -> None:
+        if not self.running:
+            return await super().publish(channel, payload)
+        self.published += 1
+        async with self._pub_lock:
+            for attempt in range(2):
+                try:
+                    if self._pub is None:
+                        self._pub = await self._open()
+                    reader, writer = self._pub
+                    writer.write(encode_command("EVAL", self.PUBLISH_SCRIPT, "1", self.SEQUENCE_KEY, channel, payload))
+                    await writer.drain()
+                    await read_reply(reader)
+                    return
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    self._pub = None
+                    if attempt:
+                        self.errors += 1
+                        raise
+
+    async def _subscribe_loop(self) -> None:
+        delay = 0.1
+        while self.running:
+            writer = None
+            try:
+                reader, writer = await self._open()
+                writer.write(encode_command("SUBSCRIBE", *self._handlers.keys()))
+                await writer.drain()
+                delay = 0.1
+                while True:
+                    reply = await read_reply(reader)
+                    if not isinstance(reply, list) or not reply:
+                        continue
+                    kind = reply[0].decode() if isinstance(reply[0], bytes) else reply[0]
+                    if kind == "subscribe":
+                        self._subscribed.set()
+                    elif kind == "message":
+                        message_id, _, payload = reply[2].decode().partition(" ")
+                        await self._dispatch(reply[1].decode(), payload, int(message_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                self.reconnects += 1
+                print(f"Warning: Redis broker subscription lost ({e}); reconnecting in {delay:.1f}s")
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update({
+            "host": f"{self.host}:{self.port}",
+            "subscribed": self._subscribed.is_set(),
+            "reconnects": self.reconnects
+        })
+        return stats
+
+
+def create_broker(url: str) -> Broker:
+    if not url or url == "local":
+        return LocalBroker()
+    if url.startswith("sqlite:///"):
+        return SQLiteBroker(url[len("sqlite:///"):], poll_interval=settings.BROKER_POLL_SECONDS)
+    if url.startswith("redis://"):
+        return RedisBroker(url)
+    raise ValueError(f"Unsupported BROKER_URL: {url}")
+
+
+# Global instance
+broker = create_broker(settings.BROKER_URL)
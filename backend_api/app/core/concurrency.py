@@ -0,0 +1,138 @@
+"""
+Concurrency Primitives
+
+Bounded concurrency gate with a bounded, time-limited waiting queue.
+Used by admission control to shed load before work reaches the
+threadpool or the database.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class GateRejected(Exception):
+    """Raised when a gate refuses admission (queue full or wait too long)"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ConcurrencyGate:
+    """
+    Async concurrency limiter with FIFO waiting and early rejection.
+
+    - At most `limit` holders at once
+    - At most `max_queue` waiters; further callers are rejected immediately
+    - Waiters that cannot be admitted within `max_wait_seconds` are rejected
+
+    Futures are created on the running loop for each wait, so one gate can
+    be shared across event loops (e.g. successive test clients).
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # Counters
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.max_queue_depth_seen = 0
+
+        # Exponentially weighted average time a holder keeps its slot
+        self.avg_service_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Estimated seconds until the current queue drains"""
+        if self.limit <= 0:
+            return 1
+        backlog = (self.queue_depth + 1) * max(self.avg_service_seconds, 0.05)
+        return max(1, math.ceil(backlog / self.limit))
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            float: Seconds spent waiting in the queue
+
+        Raises:
+            GateRejected: If the queue is full or the wait exceeds the target
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            raise GateRejected("queue_full", self.retry_after())
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth_seen = max(self.max_queue_depth_seen, len(self._waiters))
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            self.shed_timeout += 1
+            raise GateRejected("wait_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            self._forget(waiter)
+            # The slot may have been handed over just before cancellation
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+        # Slot was transferred by release(); in_flight already accounts for it
+        self.admitted += 1
+        return time.monotonic() - started
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        """Give the slot to the next live waiter, or free it"""
+        if service_seconds is not None:
+            self.avg_service_seconds = 0.8 * self.avg_service_seconds + 0.2 * service_seconds
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "max_queue_depth_seen": self.max_queue_depth_seen,
+            "max_wait_ms": int(self.max_wait_seconds * 1000),
+            "admitted": self.admitted,
+            "shed": self.shed_queue_full + self.shed_timeout,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "avg_service_ms": round(self.avg_service_seconds * 1000, 2)
+        }
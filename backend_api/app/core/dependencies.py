@@ -163,6 +163,25 @@ async def get_current_admin(
     return admin
 
 
+def get_admin_from_token(token: Optional[str], db: Session) -> Optional[Admin]:
+    """
+    Resolve an admin JWT outside the HTTP dependency chain.
+    
+    For WebSocket endpoints, where browsers can't set an Authorization
+    header and the token arrives as a query parameter. Returns None
+    instead of raising.
+    """
+    if not token:
+        return None
+    payload = decode_access_token(token)
+    if not payload or payload.get("type") != "admin" or not payload.get("id"):
+        return None
+    return db.query(Admin).filter(
+        Admin.id == payload["id"],
+        Admin.is_active == True
+    ).first()
+
+
 def require_super_admin(admin: Admin = Depends(get_current_admin)) -> Admin:
     """
     Require super admin privileges.
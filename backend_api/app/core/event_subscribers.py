@@ -0,0 +1,256 @@
+"""
+Domain Event Subscribers
+
+Side effects that used to run inline in request handlers, now fed by
+the event bus (see app/core/events.py):
+
+- metrics: heavy-hitter counters, in publish() (cheap, in-memory)
+- admin stream: events pushed to admin dashboards, in publish()
+- audit: security log records, in publish() (audit.log only enqueues;
+  the audit writer thread does the disk work)
+- suspicious-pattern checks after failed PINs on the db pool
+- notifications: emails to admins and applicants
+"""
+from app.core.admin_events import admin_events, AdminEventType
+from app.core.audit_logger import audit, AuditEventType, detect_suspicious_patterns
+from app.core.events import (
+    EventBus, event_bus,
+    QRGenerated, QRScanned, PinVerified, LoggedOut,
+    RegistrationSubmitted, UserApproved, UserInfoRequested,
+    WaitlistSubmitted, WaitlistInvited, WaitlistRejected,
+    InterestSubmitted, InterestInvited, InterestRejected, InterestInfoRequested
+)
+from app.core.heavy_hitters import heavy_hitters
+from app.services import email_service, notification_service, waitlist_service
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+def record_qr_generated(event: QRGenerated):
+    heavy_hitters.record("qr_generated", ip=event.ip, service_id=event.service_id)
+
+
+def record_qr_scanned(event: QRScanned):
+    heavy_hitters.record("qr_scanned", ip=event.ip, auth_key=event.auth_key)
+
+
+def record_pin_failed(event: PinVerified):
+    if not event.success:
+        heavy_hitters.record("pin_failed", ip=event.ip)
+
+
+# ============================================================================
+# Admin stream
+# ============================================================================
+
+def stream_registration(event: RegistrationSubmitted):
+    admin_events.emit(
+        AdminEventType.REGISTRATION_CREATED,
+        pending_user_id=event.pending_user_id,
+        username=event.username
+    )
+
+
+def stream_waitlist(event: WaitlistSubmitted):
+    admin_events.emit(AdminEventType.WAITLIST_CREATED, waitlist_request_id=event.request_id)
+
+
+def stream_interest(event: InterestSubmitted):
+    admin_events.emit(
+        AdminEventType.INTEREST_CREATED,
+        interest_request_id=event.request_id,
+        source=event.source
+    )
+
+
+# ============================================================================
+# Audit
+# ============================================================================
+
+def audit_qr_generated(event: QRGenerated):
+    details = {"token": event.token} if event.success else {"error": event.error}
+    audit.log(
+        AuditEventType.QR_GENERATED,
+        success=event.success,
+        service_id=event.service_id,
+        ip_address=event.ip,
+        details=details
+    )
+
+
+def audit_qr_scanned(event: QRScanned):
+    if event.success:
+        details = {"auth_key": event.auth_key, "device_info": event.device_info}
+    else:
+        details = {"error": event.error, "auth_key": event.auth_key}
+    audit.log(AuditEventType.QR_SCANNED, success=event.success, ip_address=event.ip, details=details)
+
+
+def audit_pin_verified(event: PinVerified):
+    if event.success:
+        details = {"qr_token": event.qr_token}
+    else:
+        details = {"error": event.error, "qr_token": event.qr_token}
+    audit.log(
+        AuditEventType.PIN_VERIFIED,
+        success=event.success,
+        ip_address=event.ip,
+        user_id=event.user_id,
+        details=details
+    )
+
+
+def audit_logout(event: LoggedOut):
+    audit.log(AuditEventType.LOGOUT, success=True, ip_address=event.ip)
+
+
+def check_suspicious_patterns(event: PinVerified):
+    """GAP-M03: Check for suspicious patterns on failure"""
+    if event.success or not event.ip:
+        return
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        detect_suspicious_patterns(event.ip, db)
+    finally:
+        db.close()
+
+
+# ============================================================================
+# Notifications
+# ============================================================================
+
+async def notify_admin_registration(event: RegistrationSubmitted):
+    await notification_service.send_admin_notification(
+        subject="New User Registration",
+        message=(
+            f"New user {event.username} ({event.email}) has registered "
+            "and is awaiting approval."
+        )
+    )
+
+
+async def notify_user_approved(event: UserApproved):
+    await notification_service.notify_user_approval(email=event.email, username=event.username)
+
+
+async def notify_user_info_requested(event: UserInfoRequested):
+    message = f"""
+        <h2>Hello {event.username},</h2>
+        <p>We are reviewing your registration. The administrator has requested the following information:</p>
+        <blockquote style="background-color: #f9f9f9; padding: 10px; border-left: 5px solid #ccc;">
+            {event.question}
+        </blockquote>
+        <p>Please reply to this email or contact support with the requested details.</p>
+        """
+    await notification_service.send_user_notification(
+        email=event.email,
+        subject="Action Required: Additional Information Needed for Registration",
+        message=message
+    )
+
+
+async def notify_admin_waitlist(event: WaitlistSubmitted):
+    await notification_service.send_admin_notification(
+        subject="New Waitlist Request",
+        message=f"""
+A new user has submitted an interest request:
+
+Name: {event.full_name}
+Email: {event.email}
+Phone: {event.phone or 'Not provided'}
+Company: {event.company or 'Not provided'}
+Role: {event.role or 'Not provided'}
+
+Please log in to the admin panel to review and approve/reject this request.
+        """
+    )
+
+
+async def notify_waitlist_invited(event: WaitlistInvited):
+    await waitlist_service.send_invitation_notification(
+        email=event.email,
+        full_name=event.full_name,
+        phone=event.phone,
+        invitation_code=event.invitation_code,
+        pin=event.pin,
+        expires_at=event.expires_at
+    )
+
+
+async def notify_waitlist_rejected(event: WaitlistRejected):
+    await waitlist_service.send_rejection_notification(
+        email=event.email,
+        full_name=event.full_name,
+        reason=event.reason
+    )
+
+
+async def notify_interest_invited(event: InterestInvited):
+    await email_service.send_invitation_email(
+        email=event.email,
+        name=event.name,
+        code=event.code,
+        pin=event.pin,
+        url_token=event.url_token,
+        expires_at=event.expires_at
+    )
+
+
+async def notify_interest_rejected(event: InterestRejected):
+    await email_service.send_rejection_email(email=event.email, name=event.name, reason=event.reason)
+
+
+async def notify_interest_info_requested(event: InterestInfoRequested):
+    await email_service.send_info_request_email(
+        email=event.email,
+        name=event.name,
+        message=event.message,
+        request_id=event.request_id
+    )
+
+
+_registered = False
+
+
+def register_subscribers(bus: EventBus = event_bus) -> None:
+    """Wire the application's subscribers to the bus (idempotent)"""
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    for event_type, handler in (
+        (QRGenerated, record_qr_generated),
+        (QRScanned, record_qr_scanned),
+        (PinVerified, record_pin_failed),
+        (RegistrationSubmitted, stream_registration),
+        (WaitlistSubmitted, stream_waitlist),
+        (InterestSubmitted, stream_interest),
+    ):
+        bus.subscribe(event_type, handler, background=False)
+
+    for event_type, handler in (
+        (QRGenerated, audit_qr_generated),
+        (QRScanned, audit_qr_scanned),
+        (PinVerified, audit_pin_verified),
+        (LoggedOut, audit_logout),
+    ):
+        bus.subscribe(event_type, handler, background=False)
+    bus.subscribe(PinVerified, check_suspicious_patterns, pool="db")
+
+    for event_type, handler in (
+        (RegistrationSubmitted, notify_admin_registration),
+        (UserApproved, notify_user_approved),
+        (UserInfoRequested, notify_user_info_requested),
+        (WaitlistSubmitted, notify_admin_waitlist),
+        (WaitlistInvited, notify_waitlist_invited),
+        (WaitlistRejected, notify_waitlist_rejected),
+        (InterestInvited, notify_interest_invited),
+        (InterestRejected, notify_interest_rejected),
+        (InterestInfoRequested, notify_interest_info_requested),
+    ):
+        bus.subscribe(event_type, handler, overflow="inline")
@@ -0,0 +1,428 @@
+"""
+Domain Event Bus
+
+Request handlers publish what happened; audit logging, abuse metrics,
+admin stream updates and emails are subscribers that run off the
+request path.
+
+    event_bus.publish(PinVerified(ip=ip, qr_token=token, success=False, error=str(e)))
+
+    event_bus.subscribe(PinVerified, record_pin_metrics, background=False)
+    event_bus.subscribe(PinVerified, check_patterns, pool="db")
+    event_bus.subscribe(UserApproved, send_approval_email, overflow="inline")
+
+- publish() never blocks and is safe from the event loop and from
+  executor threads (sync routes, services run via run_in).
+- background=False subscribers run inside publish(); keep them to cheap
+  in-memory work (counters, ring buffers).
+- Background subscribers each get a bounded queue and one worker task,
+  so a slow SMTP send never delays audit lines and every subscriber sees
+  events in publish order. Sync handlers run on the named executor pool
+  (or on the loop when pool is None); coroutine handlers are awaited.
+- Back-pressure when a subscriber's queue is full: "drop" discards the
+  event and counts it; "inline" hands it to the handler immediately,
+  outside the queue (the publisher pays for sync handlers), so nothing
+  is lost. Notifications use "inline".
+- A bus that is not started (scripts, unit tests) delivers directly.
+"""
+import asyncio
+import inspect
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Type
+
+from app.config import settings
+from app.core.executors import run_in
+from app.core.tracing import tracer
+
+OVERFLOW_POLICIES = ("drop", "inline")
+
+
+# ============================================================================
+# Events
+# ============================================================================
+
+@dataclass(frozen=True, kw_only=True)
+class DomainEvent:
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass(frozen=True, kw_only=True)
+class QRGenerated(DomainEvent):
+    ip: Optional[str]
+    service_id: int
+    success: bool
+    token: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class QRScanned(DomainEvent):
+    ip: Optional[str]
+    auth_key: str
+    success: bool
+    device_info: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class PinVerified(DomainEvent):
+    ip: Optional[str]
+    qr_token: str
+    success: bool
+    user_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class LoggedOut(DomainEvent):
+    ip: Optional[str]
+
+
+@dataclass(frozen=True, kw_only=True)
+class RegistrationSubmitted(DomainEvent):
+    pending_user_id: int
+    username: str
+    email: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class UserApproved(DomainEvent):
+    user_id: int
+    username: str
+    email: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class UserInfoRequested(DomainEvent):
+    pending_user_id: int
+    username: str
+    email: str
+    question: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class WaitlistSubmitted(DomainEvent):
+    request_id: int
+    full_name: str
+    email: str
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    role: Optional[str] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class WaitlistInvited(DomainEvent):
+    request_id: int
+    email: str
+    full_name: str
+    phone: Optional[str]
+    invitation_code: str
+    pin: str
+    expires_at: Optional[datetime]
+
+
+@dataclass(frozen=True, kw_only=True)
+class WaitlistRejected(DomainEvent):
+    request_id: int
+    email: str
+    full_name: str
+    reason: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class InterestSubmitted(DomainEvent):
+    request_id: int
+    source: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class InterestInvited(DomainEvent):
+    request_id: int
+    email: str
+    name: str
+    code: str
+    pin: str
+    url_token: str
+    expires_at: datetime
+
+
+@dataclass(frozen=True, kw_only=True)
+class InterestRejected(DomainEvent):
+    request_id: int
+    email: str
+    name: str
+    reason: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class InterestInfoRequested(DomainEvent):
+    request_id: int
+    email: str
+    name: str
+    message: str
+
+
+# ============================================================================
+# Bus
+# ============================================================================
+
+Handler = Callable[[DomainEvent], Any]
+
+
+class Subscription:
+    def __init__(
+        self,
+        event_type: Type[DomainEvent],
+        handler: Handler,
+        name: str,
+        background: bool,
+        pool: Optional[str],
+        overflow: str,
+        queue_size: int
+    ):
+        self.event_type = event_type
+        self.handler = handler
+        self.name = name
+        self.background = background
+        self.pool = pool
+        self.overflow = overflow
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+        self.queue: Deque[DomainEvent] = deque()
+        self.queue_size = queue_size
+        self.wake: Optional[asyncio.Event] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.busy = False
+
+        self.delivered = 0
+        self.failed = 0
+        self.dropped = 0
+        self.overflowed = 0
+        self.peak_depth = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "event": self.event_type.__name__,
+            "background": self.background,
+            "pool": self.pool,
+            "overflow": self.overflow,
+            "depth": len(self.queue),
+            "peak_depth": self.peak_depth,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "overflowed": self.overflowed
+        }
+
+
+class EventBus:
+    def __init__(self, queue_size: int = 1000, drain_seconds: float = 5.0):
+        self.queue_size = queue_size
+        self.drain_seconds = drain_seconds
+
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Out-of-queue coroutine deliveries, referenced until they finish
+        self._detached: set = set()
+
+        self.published = 0
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def subscribe(
+        self,
+        event_type: Type[DomainEvent],
+        handler: Handler,
+        *,
+        name: Optional[str] = None,
+        background: bool = True,
+        pool: Optional[str] = None,
+        overflow: str = "drop",
+        queue_size: Optional[int] = None
+    ) -> Subscription:
+        """Register a handler for event_type (and its subclasses); call before start()"""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if not background and inspect.iscoroutinefunction(handler):
+            raise ValueError("Coroutine handlers must be background subscribers")
+
+        subscription = Subscription(
+            event_type,
+            handler,
+            name or getattr(handler, "__qualname__", repr(handler)),
+            background,
+            pool,
+            overflow,
+            queue_size or self.queue_size
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def publish(self, event: DomainEvent) -> None:
+        self.published += 1
+        with tracer.span("events.publish", event=type(event).__name__):
+            for subscription in self._subscriptions:
+                if not isinstance(event, subscription.event_type):
+                    continue
+                if not subscription.background or not self.running:
+                    self._deliver_now(subscription, event)
+                else:
+                    self._enqueue(subscription, event)
+
+    def _enqueue(self, subscription: Subscription, event: DomainEvent) -> None:
+        with self._lock:
+            depth = len(subscription.queue)
+            if depth < subscription.queue_size:
+                subscription.queue.append(event)
+                subscription.peak_depth = max(subscription.peak_depth, depth + 1)
+                accepted = True
+            else:
+                accepted = False
+
+        if not accepted:
+            if subscription.overflow == "inline":
+                subscription.overflowed += 1
+                self._deliver_now(subscription, event)
+            else:
+                subscription.dropped += 1
+            return
+
+        if depth == 0:
+            # Worker may be idle; later events find it already awake
+            self._wake(subscription)
+
+    def _wake(self, subscription: Subscription) -> None:
+        loop, wake = self._loop, subscription.wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        if _running_loop() is loop:
+            wake.set()
+        else:
+            loop.call_soon_threadsafe(wake.set)
+
+    def _deliver_now(self, subscription: Subscription, event: DomainEvent) -> None:
+        """Run a handler outside any queue"""
+        loop = _running_loop()
+        # Pool handlers never run on the event loop thread itself
+        if not subscription.is_async and (subscription.pool is None or loop is None):
+            self._call_sync(subscription, event)
+            return
+
+        coroutine = self._call_async(subscription, event)
+        if loop is not None:
+            task = loop.create_task(coroutine)
+            self._detached.add(task)
+            task.add_done_callback(self._detached.discard)
+        elif self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        else:
+            # No loop anywhere (scripts): finish it here
+            asyncio.run(coroutine)
+
+    def _call_sync(self, subscription: Subscription, event: DomainEvent) -> None:
+        try:
+            subscription.handler(event)
+            subscription.delivered += 1
+        except Exception as e:
+            subscription.failed += 1
+            print(f"Warning: event handler '{subscription.name}' failed: {e}")
+
+    async def _call_async(self, subscription: Subscription, event: DomainEvent) -> None:
+        try:
+            if subscription.is_async:
+                await subscription.handler(event)
+            elif subscription.pool is not None:
+                await run_in(subscription.pool, subscription.handler, event)
+            else:
+                subscription.handler(event)
+            subscription.delivered += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            subscription.failed += 1
+            print(f"Warning: event handler '{subscription.name}' failed: {e}")
+
+    async def _worker(self, subscription: Subscription) -> None:
+        while True:
+            await subscription.wake.wait()
+            subscription.wake.clear()
+            while True:
+                with self._lock:
+                    if not subscription.queue:
+                        break
+                    event = subscription.queue.popleft()
+                    subscription.busy = True
+                try:
+                    await self._call_async(subscription, event)
+                finally:
+                    subscription.busy = False
+
+    async def start(self) -> None:
+        """Start one worker per background subscription on the running loop"""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        for subscription in self._subscriptions:
+            if not subscription.background:
+                continue
+            subscription.wake = asyncio.Event()
+            subscription.worker = loop.create_task(self._worker(subscription))
+            if subscription.queue:
+                subscription.wake.set()
+        self._loop = loop
+
+    async def stop(self) -> None:
+        """Give queued events up to drain_seconds, then cancel the workers"""
+        if not self.running:
+            return
+        self._loop = None
+        workers = [s for s in self._subscriptions if s.worker is not None]
+        for subscription in workers:
+            subscription.wake.set()
+
+        deadline = asyncio.get_running_loop().time() + self.drain_seconds
+        while any(s.queue or s.busy for s in workers) and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.01)
+        if self._detached:
+            await asyncio.wait(list(self._detached), timeout=max(0.0, deadline - asyncio.get_running_loop().time()))
+
+        for subscription in workers:
+            subscription.worker.cancel()
+            try:
+                await subscription.worker
+            except asyncio.CancelledError:
+                pass
+            subscription.worker = None
+            subscription.wake = None
+            if subscription.queue:
+                print(f"Warning: {len(subscription.queue)} events for '{subscription.name}' not delivered at shutdown")
+                subscription.dropped += len(subscription.queue)
+                subscription.queue.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "published": self.published,
+            "subscribers": [s.stats() for s in self._subscriptions]
+        }
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# Global instance
+event_bus = EventBus(
+    queue_size=settings.EVENT_BUS_QUEUE_SIZE,
+    drain_seconds=settings.EVENT_BUS_DRAIN_SECONDS
+)
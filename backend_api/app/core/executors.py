@@ -0,0 +1,109 @@
+"""
+Workload Executors
+
+Named, sized thread pools so one class of blocking work cannot starve
+another. Routes and services dispatch explicitly:
+
+    result = await run_in("db", pin_service.verify_pin_and_create_session, ...)
+    image = await run_in("render", create_qr_image, pattern)
+
+Pools:
+- db: SQLAlchemy queries and commits
+- crypto: bcrypt hashing / verification
+- render: QR code PNG rendering (PIL)
+- io: SMTP sends and file copies
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.config import settings
+from app.core.slow_requests import run_bound
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that tracks queueing and saturation"""
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self.name = name
+        self.size = max_workers
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+        self.peak_active = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        queued_at = time.monotonic()
+        with self._stats_lock:
+            self.submitted += 1
+
+        def tracked():
+            started = time.monotonic()
+            with self._stats_lock:
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                self.total_wait_seconds += started - queued_at
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                with self._stats_lock:
+                    self.failed += 1
+                raise
+            finally:
+                with self._stats_lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run_seconds += time.monotonic() - started
+            return result
+
+        return super().submit(tracked)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            queued = self.submitted - self.completed - self.active
+            finished = max(self.completed, 1)
+            return {
+                "max_workers": self.size,
+                "active": self.active,
+                "queued": max(0, queued),
+                "saturation": round(self.active / self.size, 3) if self.size else 0.0,
+                "peak_active": self.peak_active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.total_wait_seconds / finished * 1000, 3),
+                "avg_run_ms": round(self.total_run_seconds / finished * 1000, 3)
+            }
+
+
+executors: Dict[str, InstrumentedExecutor] = {
+    "db": InstrumentedExecutor("db", settings.EXECUTOR_DB_WORKERS),
+    "crypto": InstrumentedExecutor("crypto", settings.EXECUTOR_CRYPTO_WORKERS),
+    "render": InstrumentedExecutor("render", settings.EXECUTOR_RENDER_WORKERS),
+    "io": InstrumentedExecutor("io", settings.EXECUTOR_IO_WORKERS),
+}
+
+
+async def run_in(pool: str, fn: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking callable on a named pool and await its result.
+    Context variables are copied so request-scoped state follows the call,
+    and the slow-request watchdog follows the request onto the pool thread.
+    """
+    executor = executors[pool]
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, run_bound, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+def get_executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: executor.stats() for name, executor in executors.items()}
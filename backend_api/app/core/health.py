@@ -0,0 +1,294 @@
+"""
+Health Probing
+
+Background task that checks this worker's dependencies every
+HEALTH_PROBE_INTERVAL_SECONDS and caches the results, so orchestrator
+probes are answered from memory however often they poll:
+
+    database   SELECT 1 on a pooled connection            (critical)
+    disk       free space where uploads/ and logs/ live   (critical)
+    smtp       TCP connect to SMTP_HOST:SMTP_PORT         (reported only)
+
+The three probe endpoints mean different things:
+
+- liveness: the process is up and its probe loop has not crashed.
+  Never depends on the database, so a database outage does not get
+  every worker restarted at once.
+- startup: the application finished starting and every critical probe
+  has passed at least once. Latched; stays true afterwards.
+- readiness: every critical probe passed recently. A probe fails the
+  check after HEALTH_FAILURE_THRESHOLD consecutive failures (one blip
+  does not pull the worker out of rotation), and results older than
+  three intervals count as failed, since a stuck probe loop says
+  nothing about the dependency.
+
+Probes run in the db / io executors with HEALTH_PROBE_TIMEOUT_SECONDS.
+A timed-out probe keeps its thread until the call returns; it is not
+started again while still running, so a hung dependency holds at most
+one thread per probe.
+"""
+import asyncio
+import os
+import shutil
+import socket
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.core.executors import run_in
+from app.core.metrics import registry
+
+probe_up = registry.gauge(
+    "health_probe_up", "1 if the last run of the health probe passed", ["probe"]
+)
+probe_latency = registry.gauge(
+    "health_probe_latency_seconds", "Duration of the last run of the health probe", ["probe"]
+)
+
+
+def probe_database() -> Dict[str, Any]:
+    from sqlalchemy import text
+    from app.database import engine
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    pool = engine.pool
+    return {"pool_checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None}
+
+
+def _existing(path: str) -> str:
+    """Nearest existing directory: the disk a missing directory would be created on"""
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    return path
+
+
+def probe_disk(paths: Sequence[str], min_free_mb: float) -> Callable[[], Dict[str, Any]]:
+    def probe() -> Dict[str, Any]:
+        detail = {}
+        low = []
+        for path in paths:
+            usage = shutil.disk_usage(_existing(path))
+            free_mb = usage.free / (1024 * 1024)
+            detail[path] = {
+                "free_mb": round(free_mb, 1),
+                "used_percent": round(usage.used / usage.total * 100, 1) if usage.total else 0.0
+            }
+            if free_mb < min_free_mb:
+                low.append(path)
+        if low:
+            raise OSError(f"less than {min_free_mb:g} MB free for {', '.join(low)}")
+        return detail
+    return probe
+
+
+def probe_smtp(host: str, port: int, timeout: float) -> Callable[[], Dict[str, Any]]:
+    def probe() -> Dict[str, Any]:
+        # Reachability only: no EHLO, no login
+        with socket.create_connection((host, port), timeout=timeout):
+            pass
+        return {"host": host, "port": port}
+    return probe
+
+
+class Probe:
+    def __init__(self, name: str, fn: Callable[[], Any], pool: str, critical: bool):
+        self.name = name
+        self.fn = fn
+        self.pool = pool
+        self.critical = critical
+        self.running = False
+        self.passed_once = False
+        self.consecutive_failures = 0
+        self.checked_at: Optional[float] = None
+        self.result: Dict[str, Any] = {"name": name, "critical": critical, "status": "pending"}
+
+
+def _finished(probe: Probe, future: "asyncio.Future") -> None:
+    probe.running = False
+    if not future.cancelled():
+        # Retrieved here so a late failure after a timeout is not reported as unhandled
+        future.exception()
+
+
+class HealthMonitor:
+    def __init__(
+        self,
+        interval_seconds: float = 10.0,
+        timeout_seconds: float = 5.0,
+        failure_threshold: int = 2
+    ):
+        self.interval = interval_seconds
+        self.timeout = timeout_seconds
+        self.failure_threshold = max(1, failure_threshold)
+        # Results older than this count as failed
+        self.stale_after = interval_seconds * 3 + timeout_seconds
+
+        self.probes: Dict[str, Probe] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._startup_complete = False
+        self.rounds = 0
+        self.last_round_at: Optional[float] = None
+
+    def add_probe(self, name: str, fn: Callable[[], Any], pool: str = "io", critical: bool = True) -> None:
+        self.probes[name] = Probe(name, fn, pool, critical)
+
+    # ------------------------------------------------------------------
+    # Probe loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start on the running loop (call at the end of the async startup hook)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._started_at = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> None:
+        """Run every probe not still busy from an earlier round, concurrently"""
+        await asyncio.gather(*(self._check(probe) for probe in self.probes.values() if not probe.running))
+        self.rounds += 1
+        self.last_round_at = time.monotonic()
+        if not self._startup_complete:
+            self._startup_complete = all(
+                probe.passed_once for probe in self.probes.values() if probe.critical
+            )
+
+    async def _check(self, probe: Probe) -> None:
+        probe.running = True
+        started = time.monotonic()
+        error = None
+        detail = None
+        call = asyncio.ensure_future(run_in(probe.pool, probe.fn))
+        call.add_done_callback(lambda future: _finished(probe, future))
+        try:
+            # Shielded: on timeout the call keeps its thread until it returns
+            detail = await asyncio.wait_for(asyncio.shield(call), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout:g}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        latency = time.monotonic() - started
+
+        if error is None:
+            probe.passed_once = True
+            probe.consecutive_failures = 0
+        else:
+            probe.consecutive_failures += 1
+        probe.checked_at = time.monotonic()
+        probe.result = {
+            "name": probe.name,
+            "critical": probe.critical,
+            "status": "pass" if error is None else "fail",
+            "latency_ms": round(latency * 1000, 2),
+            "checked_at": datetime.utcnow().isoformat(),
+            "consecutive_failures": probe.consecutive_failures,
+            "error": error,
+            "detail": detail
+        }
+        probe_up.set(1 if error is None else 0, probe=probe.name)
+        probe_latency.set(latency, probe=probe.name)
+
+    # ------------------------------------------------------------------
+    # Probe endpoints (cached, no I/O)
+    # ------------------------------------------------------------------
+
+    def _healthy(self, probe: Probe, now: float) -> bool:
+        if probe.checked_at is None or not probe.passed_once:
+            return False
+        if now - probe.checked_at > self.stale_after:
+            return False
+        return probe.consecutive_failures < self.failure_threshold
+
+    def liveness(self) -> Dict[str, Any]:
+        task = self._task
+        crashed = task is not None and task.done() and not task.cancelled()
+        return {
+            "alive": not crashed,
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.monotonic() - self._started_at, 1) if self._started_at else 0.0
+        }
+
+    def startup(self) -> Dict[str, Any]:
+        return {
+            "started": self._startup_complete,
+            "pending": [
+                probe.name for probe in self.probes.values() if probe.critical and not probe.passed_once
+            ]
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        failing = [
+            probe.name for probe in self.probes.values() if probe.critical and not self._healthy(probe, now)
+        ]
+        ready = self._startup_complete and not failing
+        return {
+            "ready": ready,
+            "status": "ready" if ready else ("starting" if not self._startup_complete else "unavailable"),
+            "failing": failing,
+            "checks": self.checks()
+        }
+
+    def checks(self) -> List[Dict[str, Any]]:
+        return [probe.result for probe in self.probes.values()]
+
+    def status(self, readiness: Optional[Dict[str, Any]] = None) -> str:
+        """
+        healthy, degraded (a non-critical probe fails) or unhealthy; pass
+        a readiness() result already at hand to avoid building another
+        """
+        if not (readiness or self.readiness())["ready"]:
+            return "unhealthy"
+        now = time.monotonic()
+        if any(not self._healthy(probe, now) for probe in self.probes.values()):
+            return "degraded"
+        return "healthy"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "rounds": self.rounds,
+            "last_round_age_seconds": (
+                round(time.monotonic() - self.last_round_at, 1) if self.last_round_at is not None else None
+            ),
+            "startup_complete": self._startup_complete
+        }
+
+
+# Global instance
+health = HealthMonitor(
+    interval_seconds=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout_seconds=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+    failure_threshold=settings.HEALTH_FAILURE_THRESHOLD
+)
+health.add_probe("database", probe_database, pool="db")
+health.add_probe(
+    "disk",
+    probe_disk([path.strip() for path in settings.HEALTH_DISK_PATHS.split(",") if path.strip()], settings.HEALTH_DISK_MIN_FREE_MB)
+)
+if settings.HEALTH_SMTP_PROBE:
+    health.add_probe(
+        "smtp",
+        probe_smtp(settings.SMTP_HOST, settings.SMTP_PORT, settings.HEALTH_PROBE_TIMEOUT_SECONDS),
+        critical=False
+    )
@@ -0,0 +1,233 @@
+"""
+Heavy-Hitter Tracking
+
+Streaming "top offenders" view for auth abuse across IPs, user auth keys
+and service IDs without keeping a counter per key.
+
+Each tracked stream (e.g. "pin_failed" by "ip") owns:
+- A ring of count-min sketches, one per time window. Old windows are
+  dropped as the ring rotates and recent windows weigh more (decay).
+- A bounded top-K table holding only the current heaviest keys.
+
+Memory per stream is fixed: depth * width counters per window plus K
+entries, no matter how many distinct keys are seen.
+"""
+import hashlib
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+
+class CountMinSketch:
+    """
+    Count-min sketch with `depth` hash rows of `width` counters.
+
+    Estimates never undercount; overcount is bounded by
+    total / width with probability 1 - (1/2)^depth.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows: List[List[float]] = [[0.0] * width for _ in range(depth)]
+        self.total = 0.0
+
+    def _indexes(self, key: str) -> List[int]:
+        # One blake2b digest, split into `depth` independent 64-bit slices
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8 * self.depth).digest()
+        return [
+            int.from_bytes(digest[i * 8:(i + 1) * 8], "little") % self.width
+            for i in range(self.depth)
+        ]
+
+    def add(self, key: str, count: float = 1.0) -> None:
+        for row, idx in zip(self.rows, self._indexes(key)):
+            row[idx] += count
+        self.total += count
+
+    def estimate(self, key: str) -> float:
+        return min(row[idx] for row, idx in zip(self.rows, self._indexes(key)))
+
+
+class HeavyHitterStream:
+    """
+    Time-decayed heavy hitters for a single (event, dimension) stream.
+
+    Args:
+        window_seconds: Length of one sketch window
+        num_windows: Number of windows kept in the ring
+        decay: Weight multiplier applied per window of age (0 < decay <= 1)
+        top_k: Number of heavy hitters kept
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = 60,
+        num_windows: int = 10,
+        decay: float = 0.7,
+        top_k: int = 20,
+        width: int = 2048,
+        depth: int = 4
+    ):
+        self.window_seconds = window_seconds
+        self.num_windows = num_windows
+        self.decay = decay
+        self.top_k = top_k
+        self.width = width
+        self.depth = depth
+
+        self._windows: List[CountMinSketch] = [CountMinSketch(width, depth)]
+        self._window_start: Optional[int] = None
+
+        # key -> decayed estimate, plus a min-heap with lazy invalidation
+        self._top: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def _current_window(self, now: float) -> int:
+        return int(now // self.window_seconds)
+
+    def _rotate(self, now: float) -> None:
+        """Advance the ring to the current window and re-score the top-K"""
+        current = self._current_window(now)
+        if self._window_start is None:
+            self._window_start = current
+            return
+        elapsed = current - self._window_start
+        if elapsed <= 0:
+            return
+
+        for _ in range(min(elapsed, self.num_windows)):
+            self._windows.insert(0, CountMinSketch(self.width, self.depth))
+        del self._windows[self.num_windows:]
+        self._window_start = current
+
+        # Decay changed every score: rebuild the bounded table
+        rescored = {key: self._estimate(key) for key in self._top}
+        self._top = {key: score for key, score in rescored.items() if score > 0}
+        self._heap = [(score, key) for key, score in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def _estimate(self, key: str) -> float:
+        weight = 1.0
+        total = 0.0
+        for sketch in self._windows:
+            total += weight * sketch.estimate(key)
+            weight *= self.decay
+        return total
+
+    def _min_entry(self) -> Optional[Tuple[float, str]]:
+        # Drop stale heap entries until the top matches the live table
+        while self._heap:
+            score, key = self._heap[0]
+            if self._top.get(key) == score:
+                return score, key
+            heapq.heappop(self._heap)
+        return None
+
+    def add(self, key: str, count: float = 1.0, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._rotate(now)
+            self._windows[0].add(key, count)
+            score = self._estimate(key)
+
+            if key in self._top or len(self._top) < self.top_k:
+                self._top[key] = score
+                heapq.heappush(self._heap, (score, key))
+            else:
+                smallest = self._min_entry()
+                if smallest and score > smallest[0]:
+                    heapq.heappop(self._heap)
+                    del self._top[smallest[1]]
+                    self._top[key] = score
+                    heapq.heappush(self._heap, (score, key))
+
+            # Keep the lazy heap from growing without bound
+            if len(self._heap) > 4 * self.top_k:
+                self._heap = [(s, k) for k, s in self._top.items()]
+                heapq.heapify(self._heap)
+
+    def top(self, now: Optional[float] = None) -> List[Dict[str, object]]:
+        """Current heavy hitters, heaviest first. Cost depends only on K."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._rotate(now)
+            ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return [{"key": key, "score": round(score, 2)} for key, score in ranked]
+
+
+class HeavyHitterTracker:
+    """
+    Registry of heavy-hitter streams keyed by event and dimension.
+
+    Usage:
+        heavy_hitters.record("pin_failed", ip="1.2.3.4")
+        heavy_hitters.top("pin_failed", "ip")
+    """
+
+    DIMENSIONS = ("ip", "auth_key", "service_id")
+
+    def __init__(
+        self,
+        window_seconds: int = 60,
+        num_windows: int = 10,
+        decay: float = 0.7,
+        top_k: int = 20
+    ):
+        self.window_seconds = window_seconds
+        self.num_windows = num_windows
+        self.decay = decay
+        self.top_k = top_k
+        self._streams: Dict[Tuple[str, str], HeavyHitterStream] = {}
+        self._lock = threading.Lock()
+
+    def _stream(self, event: str, dimension: str) -> HeavyHitterStream:
+        stream = self._streams.get((event, dimension))
+        if stream is None:
+            with self._lock:
+                stream = self._streams.get((event, dimension))
+                if stream is None:
+                    stream = HeavyHitterStream(
+                        window_seconds=self.window_seconds,
+                        num_windows=self.num_windows,
+                        decay=self.decay,
+                        top_k=self.top_k
+                    )
+                    self._streams[(event, dimension)] = stream
+        return stream
+
+    def record(
+        self,
+        event: str,
+        ip: Optional[str] = None,
+        auth_key: Optional[str] = None,
+        service_id: Optional[int] = None
+    ) -> None:
+        """Count one occurrence of `event` against every provided key"""
+        for dimension, key in (("ip", ip), ("auth_key", auth_key), ("service_id", service_id)):
+            if key is not None and key != "":
+                self._stream(event, dimension).add(str(key))
+
+    def top(self, event: str, dimension: str) -> List[Dict[str, object]]:
+        stream = self._streams.get((event, dimension))
+        return stream.top() if stream else []
+
+    def snapshot(self) -> Dict[str, Dict[str, List[Dict[str, object]]]]:
+        """Top-K for every tracked stream, grouped by event"""
+        result: Dict[str, Dict[str, List[Dict[str, object]]]] = {}
+        for (event, dimension), stream in list(self._streams.items()):
+            result.setdefault(event, {})[dimension] = stream.top()
+        return result
+
+
+# Global instance
+heavy_hitters = HeavyHitterTracker(
+    window_seconds=settings.HEAVY_HITTER_WINDOW_SECONDS,
+    num_windows=settings.HEAVY_HITTER_WINDOWS,
+    decay=settings.HEAVY_HITTER_DECAY,
+    top_k=settings.HEAVY_HITTER_TOP_K
+)
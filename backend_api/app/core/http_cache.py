@@ -0,0 +1,129 @@
+"""
+HTTP Caching for Schedule-Derived Responses
+
+Validator-based caching for the most-polled public endpoints
+(/api/system/status, /api/system/operating-hours, /):
+
+- ETag: weak, from the schedule snapshot version, the current phase and
+  (during the closing warning) the minutes-left bucket, so it changes
+  exactly when the body does. Bodies therefore carry no clock: no
+  `server_time` (clients use the Date header, which caches keep current
+  through Age and 304s refresh)
+- Last-Modified: when the current phase began, or the last schedule edit
+- Cache-Control: public max-age that ends at the next transition, capped
+  at HTTP_CACHE_MAX_AGE_SECONDS because admin edits cannot reach
+  caches that already hold a copy
+
+Conditional requests (If-None-Match, else If-Modified-Since) get a 304
+without building the body.
+"""
+import hashlib
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.core.schedule_cache import ScheduleSnapshot
+
+
+def representation_window(snapshot: ScheduleSnapshot, now: datetime) -> Tuple[str, Optional[datetime], Optional[datetime]]:
+    """
+    (key, since, until) for the status representation at `now`.
+    The body is identical for every instant in [since, until).
+    """
+    key = snapshot.phase(now)
+    since = snapshot.phase_started(now)
+    until = snapshot.next_transition(now)
+
+    if key == "warning":
+        # minutes_until_close is in the body and steps once a minute
+        closing = snapshot.closing_at(now)
+        minutes_left = int((closing - now).total_seconds() / 60)
+        key = f"warning-{minutes_left}"
+        bucket_end = closing - timedelta(minutes=minutes_left)
+        bucket_start = closing - timedelta(minutes=minutes_left + 1)
+        until = min(until, bucket_end) if until and bucket_end > now else until
+        since = max(since, bucket_start) if since else bucket_start
+
+    return key, since, until
+
+
+def make_etag(snapshot: ScheduleSnapshot, key: str, salt: str = "") -> str:
+    digest = hashlib.blake2b(f"{salt}|{snapshot.version}|{key}".encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=dt_timezone.utc, microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes on both sides
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """RFC 9110 evaluation order: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=dt_timezone.utc)
+        return last_modified.replace(tzinfo=dt_timezone.utc, microsecond=0) <= since
+    return False
+
+
+def cache_headers(snapshot: ScheduleSnapshot, now: datetime, salt: str = "") -> Dict[str, str]:
+    key, since, until = representation_window(snapshot, now)
+    max_age = settings.HTTP_CACHE_MAX_AGE_SECONDS
+    if until is not None:
+        max_age = min(max_age, max(0, math.floor((until - now).total_seconds())))
+
+    headers = {
+        "ETag": make_etag(snapshot, key, salt),
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+    if since is not None:
+        headers["Last-Modified"] = _http_date(since)
+    return headers
+
+
+def cached_json(
+    request: Request,
+    snapshot: ScheduleSnapshot,
+    build: Callable[[datetime], Any],
+    salt: str = "",
+    now: Optional[datetime] = None
+) -> Response:
+    """
+    Return a 304 if the client's validators match, else the JSON built by
+    `build(now)`. `salt` separates endpoints that share a snapshot.
+    """
+    now = now or datetime.utcnow()
+    headers = cache_headers(snapshot, now, salt)
+    last_modified = parsedate_to_datetime(headers["Last-Modified"]).replace(tzinfo=None) if "Last-Modified" in headers else None
+
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=jsonable_encoder(build(now)), headers=headers)
@@ -3,7 +3,10 @@ from logging.handlers import RotatingFileHandler
 import os
 
 def setup_logging():
-    """Configure application and audit logging with rotation."""
+    """
+    Configure application logging with rotation.
+    The security audit log has its own batched writer (core/audit_logger.py).
+    """
     # Ensure logs directory exists
     os.makedirs("logs", exist_ok=True)
     
@@ -12,21 +15,7 @@ def setup_logging():
         '%(asctime)s | %(levelname)s | %(name)s | %(message)s'
     )
     
-    # 1. Security Audit Log (Rotated daily/size)
-    audit_logger = logging.getLogger("security.audit")
-    audit_logger.setLevel(logging.INFO)
-    audit_logger.propagate = False # value dependent on root logger config, usually safe to separate
-    
-    if not audit_logger.handlers:
-        audit_handler = RotatingFileHandler(
-            "logs/security_audit.log",
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=30          # Keep 30 backup files
-        )
-        audit_handler.setFormatter(formatter)
-        audit_logger.addHandler(audit_handler)
-    
-    # 2. General Application Log
+    # General Application Log
     app_logger = logging.getLogger("app")
     app_logger.setLevel(logging.INFO)
     
@@ -0,0 +1,272 @@
+"""
+Memory Diagnostics
+
+Tooling for "worker RSS creeps up over the day":
+
+1. Sizes of the in-process structures that can grow with traffic
+   (rate-limiter IP tables, WebSocket connections, SQLAlchemy sessions
+   and identity maps, caches and buffers), next to RSS and gc counts.
+   Cheap; no tracing needed.
+2. tracemalloc: start tracing, take named snapshots some hours apart,
+   then diff them grouped by file and line (or file) to see which code
+   holds the new memory.
+
+    memory.start(frames=1)
+    memory.take_snapshot("morning")
+    ...
+    memory.diff("morning", "evening", group_by="lineno", limit=20)
+
+Everything is per worker: the endpoints return the worker's pid and
+take it back as ?pid=, and a worker refuses requests naming another
+pid, so one start/snapshot/diff session stays on one worker.
+
+tracemalloc itself costs CPU on every allocation and memory per traced
+block, so it is off until started. stop() discards the snapshots and
+stops tracing, unless PYTHONTRACEMALLOC started it. At most
+MEMORY_MAX_SNAPSHOTS are kept; the oldest is dropped first.
+"""
+import gc
+import os
+import threading
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+# Allocations made by tracemalloc and the import system are noise
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SnapshotNotFound(KeyError):
+    pass
+
+
+class TracingNotStarted(RuntimeError):
+    pass
+
+
+def process_memory() -> Dict[str, Any]:
+    """RSS/VMS from /proc (Linux), peak RSS from getrusage elsewhere"""
+    memory: Dict[str, Any] = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/statm") as statm:
+            size, resident = statm.read().split()[:2]
+        page = os.sysconf("SC_PAGE_SIZE")
+        memory["rss_bytes"] = int(resident) * page
+        memory["vms_bytes"] = int(size) * page
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+        # kilobytes on Linux
+        memory["peak_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+    memory["gc_objects"] = len(gc.get_objects())
+    memory["gc_counts"] = list(gc.get_count())
+    return memory
+
+
+def _session_stats() -> Dict[str, Any]:
+    """Live SQLAlchemy sessions and their identity maps (objects held per session)"""
+    from sqlalchemy.orm import session as orm_session
+
+    sizes = [len(session.identity_map) for session in list(orm_session._sessions.values())]
+    return {
+        "sessions": len(sizes),
+        "identity_map_objects": sum(sizes),
+        "largest_identity_map": max(sizes, default=0)
+    }
+
+
+def structure_sizes() -> Dict[str, Any]:
+    """Sizes of known long-lived structures of this worker"""
+    # Imported here: these modules are application globals, and the
+    # endpoint must work whatever imported this module first
+    from app.core.admin_events import admin_events
+    from app.core.audit_logger import audit
+    from app.core.events import event_bus
+    from app.core.metrics import registry
+    from app.core.profiler import profiler
+    from app.core.single_flight import get_single_flight_stats
+    from app.core.slow_requests import slow_requests
+    from app.core.sql_telemetry import sql_telemetry
+    from app.core.tracing import tracer
+    from app.core.websocket_manager import manager
+    from app.middleware.rate_limiter import get_rate_limiter_stats
+
+    websocket = manager.stats()
+    admin_stream = admin_events.stats()
+    return {
+        "rate_limiters": get_rate_limiter_stats(),
+        "websockets": {
+            "connections": websocket["connections"],
+            "queued_messages": websocket["queued_messages"],
+            "admin_event_connections": admin_stream["subscribers"]["connections"],
+        },
+        "sqlalchemy": _session_stats(),
+        "caches": {
+            "sql_statements": len(sql_telemetry._statements),
+            "sql_statement_texts": len(sql_telemetry._normalized),
+            "metric_series": sum(len(getattr(metric, "_values", ())) for metric in registry.metrics.values()),
+            "single_flights_in_flight": sum(flight["in_flight"] for flight in get_single_flight_stats().values()),
+            "profiler_labels": len(profiler._labels),
+        },
+        "buffers": {
+            "audit_queue": audit.stats()["queue_depth"],
+            "event_bus_queued": sum(subscriber["depth"] for subscriber in event_bus.stats()["subscribers"]),
+            "trace_queue": tracer.exporter.stats()["queue_depth"],
+            "slow_request_captures": slow_requests.stats()["buffered"],
+            "admin_event_ring": admin_stream["buffered"],
+        }
+    }
+
+
+class MemoryDiagnostics:
+    def __init__(self, max_snapshots: int = 5, default_frames: int = 1):
+        self.max_snapshots = max_snapshots
+        self.default_frames = default_frames
+        self._snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+        self._taken_at: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # True when tracing was started here (not by PYTHONTRACEMALLOC)
+        self._started_here = False
+
+    def start(self, frames: Optional[int] = None) -> Dict[str, Any]:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames or self.default_frames)
+                self._started_here = True
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        with self._lock:
+            # Tracing from PYTHONTRACEMALLOC was asked for at launch; leave it on
+            if self._started_here and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._started_here = False
+            self._snapshots.clear()
+            self._taken_at.clear()
+        return self.status()
+
+    def take_snapshot(self, name: Optional[str] = None) -> Dict[str, Any]:
+        if not tracemalloc.is_tracing():
+            raise TracingNotStarted("tracemalloc is not running; start it first")
+        taken_at = datetime.utcnow().isoformat()
+        name = name or taken_at
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        with self._lock:
+            self._snapshots.pop(name, None)
+            self._snapshots[name] = snapshot
+            self._taken_at[name] = taken_at
+            while len(self._snapshots) > self.max_snapshots:
+                evicted, _ = self._snapshots.popitem(last=False)
+                self._taken_at.pop(evicted, None)
+        return self._describe(name, snapshot)
+
+    def _get(self, name: str) -> "tracemalloc.Snapshot":
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            raise SnapshotNotFound(name)
+        return snapshot
+
+    def _describe(self, name: str, snapshot: "tracemalloc.Snapshot") -> Dict[str, Any]:
+        stats = snapshot.statistics("filename")
+        return {
+            "name": name,
+            "taken_at": self._taken_at.get(name),
+            "traced_bytes": sum(stat.size for stat in stats),
+            "traced_blocks": sum(stat.count for stat in stats),
+            "frames": snapshot.traceback_limit
+        }
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._snapshots.items())
+        return [self._describe(name, snapshot) for name, snapshot in items]
+
+    def top(self, name: str, group_by: str = "lineno", limit: int = 20) -> List[Dict[str, Any]]:
+        """Largest allocation sites of one snapshot"""
+        stats = self._get(name).statistics(group_by)
+        return [
+            {"site": _site(stat.traceback, group_by), "size_bytes": stat.size, "count": stat.count}
+            for stat in stats[:limit]
+        ]
+
+    def diff(
+        self,
+        base: str,
+        target: Optional[str] = None,
+        group_by: str = "lineno",
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Allocation sites that grew most from `base` to `target` (a new
+        snapshot when omitted), by size difference
+        """
+        base_snapshot = self._get(base)
+        if target is None:
+            if not tracemalloc.is_tracing():
+                raise TracingNotStarted("tracemalloc is not running; name a target snapshot")
+            target_snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        else:
+            target_snapshot = self._get(target)
+
+        stats = target_snapshot.compare_to(base_snapshot, group_by)
+        return {
+            "base": base,
+            "target": target or "now",
+            "group_by": group_by,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "count_diff": sum(stat.count_diff for stat in stats),
+            "top": [
+                {
+                    "site": _site(stat.traceback, group_by),
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff
+                }
+                for stat in stats[:limit]
+            ]
+        }
+
+    def status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "started_here": self._started_here,
+            "frames": tracemalloc.get_traceback_limit() if tracing else None,
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            # Memory tracemalloc itself uses for its traces
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            "snapshots": list(self._snapshots)
+        }
+
+
+def _site(traceback: "tracemalloc.Traceback", group_by: str) -> str:
+    if group_by == "filename":
+        return traceback[0].filename
+    if group_by == "traceback":
+        # Most recent call first
+        return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in reversed(traceback))
+    return f"{traceback[0].filename}:{traceback[0].lineno}"
+
+
+# Global instance
+memory = MemoryDiagnostics(
+    max_snapshots=settings.MEMORY_MAX_SNAPSHOTS,
+    default_frames=settings.MEMORY_TRACEMALLOC_FRAMES
+)
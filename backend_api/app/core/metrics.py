@@ -0,0 +1,698 @@
+"""
+Metrics Registry
+
+Counters, gauges and histograms updated where things happen (QR
+generation, scans, PIN checks, rate limiting), so a scrape reads a
+fixed amount of in-memory state instead of counting table rows.
+
+    qr_sessions_created.inc()
+    pin_verifications.inc(result="invalid_pin")
+    time_to_scan.observe(seconds)
+    pending_qr_sessions.add(tracking_key(token), expires_at)
+
+- Windowed counters also keep per-minute buckets for the last 24 hours,
+  which is what the JSON /api/monitoring/metrics "last hour / 24h"
+  figures are built from.
+- Tracked gauges count live keys with an expiry (pending QR sessions,
+  locked sessions): keys drop out on their own when they expire, and a
+  discard() in any worker removes a key added in another. Keys end up in
+  the METRICS_DIR snapshots, so secrets such as session tokens are
+  tracked by tracking_key(token), never as themselves.
+- Across workers: with METRICS_DIR set, each process writes its snapshot
+  to <METRICS_DIR>/<pid>.json every METRICS_FLUSH_SECONDS and a scrape
+  merges its live values with the other workers' files. When a worker
+  has exited (or a new one reuses its pid), its counters and histograms
+  are folded into <METRICS_DIR>/retired.json and its file is removed,
+  so merged totals never go down and Prometheus sees no counter reset;
+  its gauges stop immediately. Folding and reading hold a flock on
+  <METRICS_DIR>/.lock, so no scrape sees a worker both in its own file
+  and in retired.json.
+"""
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: development only, a single worker
+    fcntl = None
+
+WINDOW_MINUTES = 24 * 60
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+Expiry = Union[float, datetime]
+
+
+def _epoch(value: Expiry) -> float:
+    """Epoch seconds; naive datetimes are UTC, as stored by the models"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def tracking_key(secret: str) -> str:
+    """Short digest of a token, for tracked-gauge keys"""
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+# Counters and histograms of exited workers, summed
+RETIRED_FILE = "retired.json"
+
+# Joins label values into the series keys of snapshots and collect()
+LABEL_SEPARATOR = "\x1f"
+
+
+def _series_key(values: LabelValues) -> str:
+    return LABEL_SEPARATOR.join(values)
+
+
+def _series_values(key: str, count: int) -> LabelValues:
+    return tuple(key.split(LABEL_SEPARATOR)) if count else ()
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), single_writer: bool = False):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # Only ever updated from one thread (the event loop): series skip
+        # the lock; readers may see an update half applied, never a lost one
+        self._series_lock = None if single_writer else self._lock
+
+    def _labels(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def labels(self, **labels):
+        """
+        One series with its label values resolved and its storage
+        allocated up front, for hot paths (see middleware/instrumentation.py)
+        """
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class _Value:
+    """Storage of one counter/gauge series"""
+    __slots__ = ("value", "lock")
+
+    def __init__(self, lock: Optional[threading.Lock]):
+        self.value = 0.0
+        self.lock = lock
+
+    def inc(self, amount: float = 1.0) -> None:
+        if self.lock is None:
+            self.value += amount
+            return
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class _WindowedValue:
+    __slots__ = ("counter", "key")
+
+    def __init__(self, counter: "Counter", key: LabelValues):
+        self.counter = counter
+        self.key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.counter._inc(self.key, amount)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        windowed: bool = False,
+        single_writer: bool = False
+    ):
+        super().__init__(name, help, labelnames, single_writer)
+        self.windowed = windowed
+        self._values: Dict[LabelValues, _Value] = {}
+        # label values -> {epoch minute: count}
+        self._minutes: Dict[LabelValues, Dict[int, float]] = {}
+
+    def _series(self, key: LabelValues) -> _Value:
+        series = self._values.get(key)
+        if series is None:
+            with self._lock:
+                series = self._values.setdefault(key, _Value(self._series_lock))
+        return series
+
+    def labels(self, **labels):
+        key = self._labels(labels)
+        return _WindowedValue(self, key) if self.windowed else self._series(key)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self._inc(self._labels(labels), amount)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        series = self._series(key)
+        with self._lock:
+            series.value += amount
+            if self.windowed:
+                minute = int(time.time() // 60)
+                buckets = self._minutes.setdefault(key, {})
+                buckets[minute] = buckets.get(minute, 0.0) + amount
+                if len(buckets) > WINDOW_MINUTES + 1:
+                    for old in [m for m in buckets if m <= minute - WINDOW_MINUTES]:
+                        del buckets[old]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {"series": {_series_key(k): v.value for k, v in self._values.items()}}
+            if self.windowed:
+                floor = int(time.time() // 60) - WINDOW_MINUTES
+                snapshot["minutes"] = {
+                    _series_key(k): {str(m): c for m, c in buckets.items() if m > floor}
+                    for k, buckets in self._minutes.items()
+                }
+        return snapshot
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), single_writer: bool = False):
+        super().__init__(name, help, labelnames, single_writer)
+        self._values: Dict[LabelValues, _Value] = {}
+
+    def labels(self, **labels) -> _Value:
+        key = self._labels(labels)
+        series = self._values.get(key)
+        if series is None:
+            with self._lock:
+                series = self._values.setdefault(key, _Value(self._series_lock))
+        return series
+
+    def set(self, value: float, **labels) -> None:
+        self.labels(**labels).set(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        self.labels(**labels).inc(amount)
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.labels(**labels).dec(amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"series": {_series_key(k): v.value for k, v in self._values.items()}}
+
+
+class _HistogramValue:
+    """Preallocated bucket array of one histogram series (+Inf last)"""
+    __slots__ = ("buckets", "counts", "sum", "count", "lock")
+
+    def __init__(self, buckets: Tuple[float, ...], lock: Optional[threading.Lock]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = lock
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if self.lock is None:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            return
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        single_writer: bool = False
+    ):
+        super().__init__(name, help, labelnames, single_writer)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, _HistogramValue] = {}
+
+    def labels(self, **labels) -> _HistogramValue:
+        key = self._labels(labels)
+        series = self._values.get(key)
+        if series is None:
+            with self._lock:
+                series = self._values.setdefault(key, _HistogramValue(self.buckets, self._series_lock))
+        return series
+
+    def observe(self, value: float, **labels) -> None:
+        self.labels(**labels).observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "series": {
+                    _series_key(k): {"counts": list(v.counts), "sum": v.sum, "count": v.count}
+                    for k, v in self._values.items()
+                }
+            }
+
+
+class TrackedGauge(Metric):
+    """Number of live keys; each key expires on its own"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._active: Dict[str, float] = {}
+        # Keys removed here that another worker may have added
+        self._discarded: Dict[str, float] = {}
+
+    def add(self, key: Any, expires_at: Expiry) -> None:
+        with self._lock:
+            self._active[str(key)] = _epoch(expires_at)
+            self._discarded.pop(str(key), None)
+            self._prune(time.time())
+
+    def discard(self, key: Any, expires_at: Optional[Expiry] = None) -> None:
+        key = str(key)
+        with self._lock:
+            known = self._active.pop(key, None)
+            horizon = _epoch(expires_at) if expires_at is not None else known
+            if horizon and horizon > time.time():
+                self._discarded[key] = horizon
+
+    def _prune(self, now: float) -> None:
+        for table in (self._active, self._discarded):
+            if len(table) > 64:
+                for key in [k for k, expiry in table.items() if expiry <= now]:
+                    del table[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            return {
+                "active": {k: v for k, v in self._active.items() if v > now},
+                "discarded": {k: v for k, v in self._discarded.items() if v > now}
+            }
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+class MetricsRegistry:
+    def __init__(self, directory: str = "", flush_interval: float = 1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.metrics: Dict[str, Metric] = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = (), windowed: bool = False, single_writer: bool = False) -> Counter:
+        return self.register(Counter(name, help, labelnames, windowed, single_writer))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), single_writer: bool = False) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, single_writer))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+        single_writer: bool = False
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets, single_writer))
+
+    def tracked_gauge(self, name: str, help: str) -> TrackedGauge:
+        return self.register(TrackedGauge(name, help))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    # ------------------------------------------------------------------
+    # Cross-worker files
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start writing this worker's snapshot to METRICS_DIR (no-op without one)"""
+        if not self.directory or self._pid == os.getpid():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._pid = os.getpid()
+        # A file under this pid is from an earlier process: keep its totals
+        self._retire(own=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(self.flush_interval + 1)
+        self._thread = None
+        self._pid = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Warning: metrics flush failed: {e}")
+
+    def flush(self) -> None:
+        if not self.directory:
+            return
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump({"pid": os.getpid(), "metrics": self.snapshot()}, f, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @contextmanager
+    def _locked(self, shared: bool):
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(os.path.join(self.directory, ".lock"), os.O_RDWR | os.O_CREAT, 0o640)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _worker_files(self, include_own: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+        """(filename, contents) of the worker files, by default except this process's own"""
+        own = f"{os.getpid()}.json"
+        files = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json") or filename == RETIRED_FILE or (filename == own and not include_own):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    files.append((filename, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return files
+
+    def _read_retired(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.directory, RETIRED_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _retire(self, own: bool = False) -> None:
+        """
+        Fold the files of exited workers into retired.json and remove
+        them; with `own`, also a file left under this pid by an earlier
+        process (called before this process first flushes)
+        """
+        def gone(filename: str, data: Dict[str, Any]) -> bool:
+            return not _pid_alive(data.get("pid")) or filename == f"{os.getpid()}.json"
+
+        if not any(gone(*entry) for entry in self._worker_files(include_own=own)):
+            return
+        with self._locked(shared=False):
+            # Again under the lock: another worker may have folded them meanwhile
+            retiring = [(filename, data) for filename, data in self._worker_files(include_own=own) if gone(filename, data)]
+            if not retiring:
+                return
+            retired = self._read_retired()
+            for _, data in retiring:
+                self._fold(retired, data.get("metrics", {}))
+            path = os.path.join(self.directory, RETIRED_FILE)
+            with open(path + ".tmp", "w") as f:
+                json.dump(retired, f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+            for filename, _ in retiring:
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except FileNotFoundError:
+                    pass
+
+    def _fold(self, retired: Dict[str, Any], metrics: Dict[str, Any]) -> None:
+        """Add an exited worker's counters and histograms to `retired`"""
+        floor = int(time.time() // 60) - WINDOW_MINUTES
+        for name, part in metrics.items():
+            metric = self.metrics.get(name)
+            if not isinstance(metric, (Counter, Histogram)):
+                continue
+            target = retired.setdefault(name, {"series": {}})
+            if isinstance(metric, Histogram):
+                for key, value in part["series"].items():
+                    entry = target["series"].setdefault(key, {"counts": [0] * len(value["counts"]), "sum": 0.0, "count": 0})
+                    entry["counts"] = [a + b for a, b in zip(entry["counts"], value["counts"])]
+                    entry["sum"] += value["sum"]
+                    entry["count"] += value["count"]
+                continue
+            for key, value in part["series"].items():
+                target["series"][key] = target["series"].get(key, 0.0) + value
+            if "minutes" in part:
+                minutes = target.setdefault("minutes", {})
+                for key, buckets in part["minutes"].items():
+                    merged = minutes.setdefault(key, {})
+                    for minute, count in buckets.items():
+                        merged[minute] = merged.get(minute, 0.0) + count
+                    for minute in [m for m in merged if int(m) <= floor]:
+                        del merged[minute]
+
+    def _worker_snapshots(self) -> List[Tuple[bool, Dict[str, Any]]]:
+        """(is_live, metrics) for this process, every other worker file and the retired totals"""
+        snapshots = [(True, self.snapshot())]
+        if not self.directory or not os.path.isdir(self.directory):
+            return snapshots
+        self._retire()
+        with self._locked(shared=True):
+            snapshots.extend((True, data.get("metrics", {})) for _, data in self._worker_files())
+            snapshots.append((False, self._read_retired()))
+        return snapshots
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """All workers merged: {name: {"metric": Metric, ...merged values}}"""
+        snapshots = self._worker_snapshots()
+        merged: Dict[str, Dict[str, Any]] = {}
+        now = time.time()
+        for name, metric in self.metrics.items():
+            parts = [(live, snap[name]) for live, snap in snapshots if name in snap]
+            if isinstance(metric, TrackedGauge):
+                active: Dict[str, float] = {}
+                discarded = set()
+                for live, part in parts:
+                    active.update({k: v for k, v in part["active"].items() if v > now})
+                    discarded.update(k for k, v in part["discarded"].items() if v > now)
+                merged[name] = {"series": {"": float(len(set(active) - discarded))}}
+            elif isinstance(metric, Histogram):
+                series: Dict[str, Dict[str, Any]] = {}
+                for _, part in parts:
+                    for key, value in part["series"].items():
+                        entry = series.setdefault(key, {"counts": [0] * len(value["counts"]), "sum": 0.0, "count": 0})
+                        entry["counts"] = [a + b for a, b in zip(entry["counts"], value["counts"])]
+                        entry["sum"] += value["sum"]
+                        entry["count"] += value["count"]
+                merged[name] = {"series": series}
+            else:
+                series = {}
+                minutes: Dict[str, Dict[int, float]] = {}
+                for live, part in parts:
+                    if isinstance(metric, Gauge) and not live:
+                        continue
+                    for key, value in part["series"].items():
+                        series[key] = series.get(key, 0.0) + value
+                    for key, buckets in part.get("minutes", {}).items():
+                        target = minutes.setdefault(key, {})
+                        for minute, count in buckets.items():
+                            target[int(minute)] = target.get(int(minute), 0.0) + count
+                merged[name] = {"series": series, "minutes": minutes}
+        return merged
+
+    def windowed_total(self, merged: Dict[str, Dict[str, Any]], name: str, seconds: int, **labels) -> float:
+        """Sum of a windowed counter over the last `seconds` (minute resolution)"""
+        metric = self.metrics[name]
+        wanted = _series_key(metric._labels(labels)) if labels else None
+        floor = int(time.time() // 60) - seconds // 60
+        total = 0.0
+        for key, buckets in merged[name]["minutes"].items():
+            if wanted is not None and key != wanted:
+                continue
+            total += sum(count for minute, count in buckets.items() if minute > floor)
+        return total
+
+    def value(self, merged: Dict[str, Dict[str, Any]], name: str, **labels) -> float:
+        metric = self.metrics[name]
+        key = _series_key(metric._labels(labels)) if metric.labelnames else ""
+        return merged[name]["series"].get(key, 0.0)
+
+    # ------------------------------------------------------------------
+    # Prometheus text format 0.0.4
+    # ------------------------------------------------------------------
+
+    def render_prometheus(self) -> str:
+        merged = self.collect()
+        lines: List[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            series = merged[name]["series"]
+            if isinstance(metric, Histogram):
+                for key, value in sorted(series.items()):
+                    labels = _label_pairs(metric.labelnames, key)
+                    cumulative = 0
+                    for bound, count in zip(list(metric.buckets) + ["+Inf"], value["counts"]):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else _format_value(bound)
+                        lines.append(f"{name}_bucket{_render_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_render_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_render_labels(labels)} {value['count']}")
+            else:
+                if not series and not metric.labelnames:
+                    series = {"": 0.0}
+                for key, value in sorted(series.items()):
+                    labels = _label_pairs(metric.labelnames, key)
+                    lines.append(f"{name}{_render_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _label_pairs(labelnames: Tuple[str, ...], key: str) -> List[Tuple[str, str]]:
+    return list(zip(labelnames, _series_values(key, len(labelnames))))
+
+
+def _render_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    rendered = []
+    for name, value in pairs:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        rendered.append(f'{name}="{value}"')
+    return "{" + ",".join(rendered) + "}"
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def histogram_quantile(buckets: Sequence[float], counts: Sequence[int], q: float) -> Optional[float]:
+    """
+    Estimate the q-quantile from per-bucket (non-cumulative) counts, +Inf
+    last, interpolating linearly inside the bucket as Prometheus does
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        if cumulative + count >= rank and count:
+            if index == len(buckets):
+                # +Inf bucket: the best bound we have is the largest finite one
+                return float(buckets[-1]) if buckets else None
+            lower = buckets[index - 1] if index else 0.0
+            return lower + (buckets[index] - lower) * (rank - cumulative) / count
+        cumulative += count
+    return None
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global instance
+registry = MetricsRegistry(directory=settings.METRICS_DIR, flush_interval=settings.METRICS_FLUSH_SECONDS)
+
+# ============================================================================
+# Application metrics
+# ============================================================================
+
+qr_sessions_created = registry.counter(
+    "auth_qr_sessions_created_total", "QR login sessions generated", windowed=True
+)
+qr_scans = registry.counter(
+    "auth_qr_scans_total", "QR scans by outcome", ["result"]
+)
+pin_verifications = registry.counter(
+    "auth_pin_verifications_total", "PIN verifications by outcome", ["result"]
+)
+qr_sessions_failed = registry.counter(
+    "auth_qr_sessions_failed_total", "QR sessions with at least one failed PIN attempt", windowed=True
+)
+lockouts = registry.counter(
+    "auth_lockouts_total", "QR sessions locked after too many failed PIN attempts"
+)
+logins = registry.counter(
+    "auth_logins_total", "Successful logins (sessions created)", windowed=True
+)
+logouts = registry.counter(
+    "auth_logouts_total", "Sessions logged out"
+)
+session_validations = registry.counter(
+    "auth_session_validations_total", "Session token validations by outcome", ["result"]
+)
+rate_limit_decisions = registry.counter(
+    "rate_limit_requests_total", "Rate-limited route requests by limiter and decision", ["limiter", "decision"]
+)
+time_to_scan = registry.histogram(
+    "auth_qr_time_to_scan_seconds", "Seconds from QR generation to scan"
+)
+time_to_login = registry.histogram(
+    "auth_qr_time_to_login_seconds", "Seconds from QR generation to successful PIN verification"
+)
+pending_qr_sessions = registry.tracked_gauge(
+    "auth_qr_sessions_pending", "QR sessions generated, not yet scanned and not expired"
+)
+locked_qr_sessions = registry.tracked_gauge(
+    "auth_qr_sessions_locked", "QR sessions currently locked out"
+)
@@ -0,0 +1,188 @@
+"""
+Password Hashing Service
+
+Runs bcrypt work in a bounded process pool so hashing never holds a
+request thread's share of the GIL and can't take over every core.
+
+- hash / verify: blocking submission, for sync services and scripts
+- hash_async / verify_async: awaitable submission, for async routes
+- verify_and_update(_async): verify and return an upgraded hash if the
+  stored one uses an outdated scheme or cost
+- hash_many: batch hashing for bulk imports; waits for capacity
+  instead of failing, and never holds more than half of it, so logins
+  keep headroom while an import runs
+
+At most PASSWORD_HASH_MAX_PENDING jobs may be queued or running; beyond
+that callers get HashingBusy immediately instead of queueing forever.
+With PASSWORD_HASH_WORKERS=0 hashing runs inline (async calls use the
+crypto thread executor).
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.core import security
+from app.core.executors import run_in
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is at capacity"""
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, start_method: str = "spawn"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Signalled whenever jobs finish (hash_many waits on it)
+        self._capacity = threading.Condition(self._lock)
+        self.pending = 0
+        # Of pending, jobs submitted by hash_many
+        self.bulk_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self._pool
+
+    def _reserve(self, count: int = 1) -> None:
+        with self._lock:
+            if self.pending + count > self.max_pending:
+                self.rejected += count
+                raise HashingBusy("Password hashing capacity exceeded. Please retry shortly.")
+            self.pending += count
+
+    @property
+    def bulk_limit(self) -> int:
+        """Slots hash_many may hold at once; the rest stay free for single calls"""
+        return max(1, self.max_pending // 2)
+
+    def _reserve_bulk(self, timeout: float) -> None:
+        """Wait until hash_many is below its share and a slot is free, then take one"""
+        def free() -> bool:
+            return self.bulk_pending < self.bulk_limit and self.pending < self.max_pending
+
+        with self._capacity:
+            if not self._capacity.wait_for(free, timeout):
+                self.rejected += 1
+                raise HashingBusy("Password hashing capacity exceeded. Please retry shortly.")
+            self.pending += 1
+            self.bulk_pending += 1
+
+    def _finish(self, count: int = 1, bulk: bool = False) -> None:
+        with self._lock:
+            self.pending -= count
+            if bulk:
+                self.bulk_pending -= count
+            self.completed += count
+            self._capacity.notify_all()
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        self._reserve()
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._finish()
+            raise
+        future.add_done_callback(lambda _: self._finish())
+        return future
+
+    @property
+    def inline(self) -> bool:
+        return self.workers <= 0
+
+    def hash(self, password: str) -> str:
+        if self.inline:
+            return security.hash_password(password)
+        return self._submit(security.hash_password, password).result()
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        if self.inline:
+            return security.verify_password(password, hashed_password)
+        return self._submit(security.verify_password, password, hashed_password).result()
+
+    async def hash_async(self, password: str) -> str:
+        if self.inline:
+            return await run_in("crypto", security.hash_password, password)
+        return await asyncio.wrap_future(self._submit(security.hash_password, password))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        if self.inline:
+            return await run_in("crypto", security.verify_password, password, hashed_password)
+        return await asyncio.wrap_future(
+            self._submit(security.verify_password, password, hashed_password)
+        )
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        if self.inline:
+            return security.verify_and_update_password(password, hashed_password)
+        return self._submit(security.verify_and_update_password, password, hashed_password).result()
+
+    async def verify_and_update_async(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        if self.inline:
+            return await run_in("crypto", security.verify_and_update_password, password, hashed_password)
+        return await asyncio.wrap_future(
+            self._submit(security.verify_and_update_password, password, hashed_password)
+        )
+
+    def hash_many(self, passwords: Iterable[str], timeout: float = 60.0) -> List[str]:
+        """
+        Hash a batch across all workers, keeping at most bulk_limit
+        passwords in flight. Each slot is released as its hash finishes;
+        the next password waits up to `timeout` for one, so neither the
+        import nor concurrent logins are turned away.
+        """
+        passwords = list(passwords)
+        if self.inline:
+            return [security.hash_password(password) for password in passwords]
+
+        pool = self._get_pool()
+        futures: List[Future] = []
+        for password in passwords:
+            self._reserve_bulk(timeout)
+            try:
+                future = pool.submit(security.hash_password, password)
+            except Exception:
+                self._finish(bulk=True)
+                raise
+            future.add_done_callback(lambda _: self._finish(bulk=True))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "bulk_pending": self.bulk_pending,
+            "bulk_limit": self.bulk_limit,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "running": self._pool is not None
+        }
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    start_method=settings.PASSWORD_HASH_START_METHOD
+)
@@ -0,0 +1,222 @@
+"""
+Sampling CPU Profiler
+
+Answers "why is this worker pegging a core" on a live process:
+
+    profile = await profiler.profile(seconds=10)
+    profile.collapsed()          # "MainThread;main (uvicorn/main.py:...);... 42\\n..."
+
+A daemon thread wakes every `interval` seconds, reads every other
+thread's current Python stack (sys._current_frames()) and counts it.
+The output is the collapsed-stack format read by flamegraph.pl,
+speedscope and inferno: one line per distinct stack, frames root-first
+separated by ";", then the sample count. Each stack starts with its
+thread name (pool threads grouped: "db-pool", "AnyIO worker thread").
+
+Why a thread and not SIGPROF: signal handlers only run in the main
+thread between bytecodes, so a profile would miss the executor and
+threadpool threads where the blocking work runs, and a stray signal
+could interrupt a syscall in the middle of a request.
+
+Safe under load:
+- one profile at a time per worker (ProfilerBusy otherwise)
+- duration capped by PROFILER_MAX_SECONDS, interval at least 1 ms
+- the sleep is measured from the end of each sample, so the sampler
+  never takes more than about half a core even when walking stacks is slow
+- labels are cached per code object and the stack table is bounded
+  (PROFILER_MAX_STACKS); further distinct stacks are counted as "<other>"
+- idle threads (blocked waiting for work) are skipped unless asked for
+"""
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from app.config import settings
+
+MAX_DEPTH = 128
+OTHER_STACKS = "<other>"
+
+# (file name, function) of leaf frames meaning "blocked waiting for work"
+IDLE_FRAMES: FrozenSet[Tuple[str, str]] = frozenset((
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),           # ThreadPoolExecutor worker between tasks
+    ("_asyncio.py", "run"),             # AnyIO worker thread between tasks
+    ("connection.py", "wait"),          # multiprocessing result pipes
+))
+
+_POOL_SUFFIX = re.compile(r"[_-]\d+$")
+
+
+class ProfilerBusy(Exception):
+    """A profile is already running on this worker"""
+
+
+class Profile:
+    def __init__(self, interval: float, include_idle: bool):
+        self.pid = os.getpid()
+        self.interval = interval
+        self.include_idle = include_idle
+        self.started = time.time()
+        self.seconds = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.truncated = 0
+        # Thread time spent walking stacks: the profiler's own cost
+        self.sampler_seconds = 0.0
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 20) -> Dict[str, Any]:
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return {
+            "pid": self.pid,
+            "seconds": round(self.seconds, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "truncated_stacks": self.truncated,
+            "include_idle": self.include_idle,
+            "sampler_cpu_ms": round(self.sampler_seconds * 1000, 3),
+            "sampler_cpu_share": round(self.sampler_seconds / self.seconds, 4) if self.seconds else 0.0,
+            "top_frames": [
+                {"frame": frame, "samples": count, "share": round(count / total, 3)}
+                for frame, count in leaves.most_common(top)
+            ]
+        }
+
+
+class StackSampler:
+    def __init__(self, max_seconds: float = 60, max_stacks: int = 10000):
+        self.max_seconds = max_seconds
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._running = False
+        # code object -> "function (path:first line)"
+        self._labels: Dict[Any, str] = {}
+
+        self.profiles = 0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            # Shortest readable path: relative to the longest sys.path entry
+            prefixes = [prefix for prefix in sys.path if prefix and filename.startswith(prefix)]
+            if prefixes:
+                filename = filename[len(max(prefixes, key=len)):].lstrip(os.sep)
+            label = self._labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self, profile: Profile, own_ident: int, names: Dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            if not profile.include_idle:
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+            labels = []
+            while frame is not None and len(labels) < MAX_DEPTH:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            name = names.get(ident)
+            if name is None:
+                names.clear()
+                for thread in threading.enumerate():
+                    names[thread.ident] = _POOL_SUFFIX.sub("", thread.name)
+                name = names.get(ident, f"thread-{ident}")
+            labels.append(name)
+            labels.reverse()
+            stack = ";".join(labels)
+            if stack not in profile.stacks and len(profile.stacks) >= self.max_stacks:
+                stack = f"{name};{OTHER_STACKS}"
+                profile.truncated += 1
+            profile.stacks[stack] += 1
+        profile.samples += 1
+
+    def _run(self, profile: Profile, stop: threading.Event) -> None:
+        own_ident = threading.get_ident()
+        names: Dict[int, str] = {}
+        deadline = time.monotonic() + profile.seconds
+        while not stop.is_set():
+            started = time.thread_time()
+            self._sample(profile, own_ident, names)
+            cost = time.thread_time() - started
+            profile.sampler_seconds += cost
+            if time.monotonic() >= deadline:
+                break
+            # Sleep at least as long as the sample took: bounded to ~50% of a core
+            stop.wait(max(profile.interval, cost))
+
+    def _start(self, seconds: float, interval: float, include_idle: bool) -> Tuple[Profile, threading.Thread, threading.Event]:
+        with self._lock:
+            if self._running:
+                raise ProfilerBusy("A profile is already running on this worker")
+            self._running = True
+        profile = Profile(max(interval, 0.001), include_idle)
+        profile.seconds = max(0.0, min(seconds, self.max_seconds))
+        stop = threading.Event()
+        thread = threading.Thread(target=self._run, args=(profile, stop), name="stack-sampler", daemon=True)
+        thread.start()
+        return profile, thread, stop
+
+    def _finish(self, profile: Profile, thread: threading.Thread, stop: threading.Event, started: float) -> Profile:
+        stop.set()
+        # At most one sample in progress
+        thread.join()
+        profile.seconds = time.monotonic() - started
+        self.profiles += 1
+        self.last = profile.summary(top=5)
+        # Code objects of unloaded modules must not stay alive
+        self._labels.clear()
+        with self._lock:
+            self._running = False
+        return profile
+
+    def run(self, seconds: float, interval: float = 0.01, include_idle: bool = False) -> Profile:
+        """Sample for `seconds`, blocking the calling thread"""
+        started = time.monotonic()
+        profile, thread, stop = self._start(seconds, interval, include_idle)
+        try:
+            thread.join(profile.seconds)
+        finally:
+            self._finish(profile, thread, stop, started)
+        return profile
+
+    async def profile(self, seconds: float, interval: float = 0.01, include_idle: bool = False) -> Profile:
+        """Sample for `seconds` while the event loop (itself sampled) keeps serving"""
+        started = time.monotonic()
+        profile, thread, stop = self._start(seconds, interval, include_idle)
+        try:
+            await asyncio.sleep(profile.seconds)
+        finally:
+            self._finish(profile, thread, stop, started)
+        return profile
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "profiles": self.profiles,
+            "max_seconds": self.max_seconds,
+            "last": self.last
+        }
+
+
+# Global instance
+profiler = StackSampler(
+    max_seconds=settings.PROFILER_MAX_SECONDS,
+    max_stacks=settings.PROFILER_MAX_STACKS
+)
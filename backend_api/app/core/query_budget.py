@@ -0,0 +1,124 @@
+"""
+Per-Request Query Accounting
+
+Counts the SQL statements, ORM rows loaded and database time of each
+HTTP request, to catch N+1 patterns (a list endpoint lazy-loading a
+relationship per row, a dashboard issuing one COUNT per status).
+
+    with track() as usage:              # per request, InstrumentationMiddleware uses begin()/end()
+        ...
+    usage.queries, usage.rows, usage.db_time, usage.top_repeated()
+
+The current request's usage lives in a context variable, so statements
+executed in the threadpool or a workload executor (both copy the
+context) are charged to the request that issued them. Statements outside
+a tracked request cost one ContextVar lookup.
+
+Tests pin endpoint budgets with the `query_budget` fixture:
+
+    with query_budget(max_queries=3):
+        client.get("/api/admin/pending/1", headers=headers)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper
+
+
+class QueryUsage:
+    __slots__ = ("queries", "rows", "db_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        # normalised statement -> executions
+        self.statements: Dict[str, int] = {}
+
+    def top_repeated(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """Statements run more than once, most repeated first"""
+        repeated = [(statement, count) for statement, count in self.statements.items() if count > 1]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)[:limit]
+
+
+_current: ContextVar[Optional[QueryUsage]] = ContextVar("query_usage", default=None)
+
+# Called with (method, route, usage) when a tracked request finishes
+_listeners: List[Callable[[str, str, QueryUsage], None]] = []
+
+
+def begin() -> Tuple[QueryUsage, Token]:
+    """Start charging statements to a new usage; pass the token to end()"""
+    usage = QueryUsage()
+    return usage, _current.set(usage)
+
+
+def end(token: Token) -> None:
+    _current.reset(token)
+
+
+@contextmanager
+def track() -> Iterator[QueryUsage]:
+    usage, token = begin()
+    try:
+        yield usage
+    finally:
+        end(token)
+
+
+def current() -> Optional[QueryUsage]:
+    return _current.get()
+
+
+def record_query(statement: str, elapsed: float) -> None:
+    """Charge one executed statement to the current request (sql_telemetry hook)"""
+    usage = _current.get()
+    if usage is None:
+        return
+    usage.queries += 1
+    usage.db_time += elapsed
+    usage.statements[statement] = usage.statements.get(statement, 0) + 1
+
+
+@event.listens_for(Mapper, "load")
+def _on_load(target, context):
+    usage = _current.get()
+    if usage is not None:
+        usage.rows += 1
+
+
+def request_finished(method: str, route: str, usage: QueryUsage) -> None:
+    if not _listeners:
+        return
+    for listener in list(_listeners):
+        listener(method, route, usage)
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, max_rows: Optional[int] = None) -> Iterator[List[Tuple[str, str, QueryUsage]]]:
+    """
+    Fail if any request finished inside the block ran more than
+    `max_queries` statements (or loaded more than `max_rows` ORM rows)
+    """
+    finished: List[Tuple[str, str, QueryUsage]] = []
+
+    def collect(method: str, route: str, usage: QueryUsage) -> None:
+        finished.append((method, route, usage))
+
+    _listeners.append(collect)
+    try:
+        yield finished
+    finally:
+        _listeners.remove(collect)
+
+    for method, route, usage in finished:
+        over_queries = usage.queries > max_queries
+        over_rows = max_rows is not None and usage.rows > max_rows
+        if over_queries or over_rows:
+            repeated = "".join(f"\n    {count} x {statement}" for statement, count in usage.top_repeated())
+            raise AssertionError(
+                f"{method} {route} ran {usage.queries} queries (budget {max_queries}) "
+                f"and loaded {usage.rows} rows (budget {max_rows}){repeated}"
+            )
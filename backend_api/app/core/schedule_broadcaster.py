@@ -0,0 +1,137 @@
+"""
+Schedule Transition Broadcaster
+
+Background task that sleeps until the next schedule transition (opening,
+closing warning, closing, override expiry) and pushes the new status to
+every /api/system/ws subscriber at that instant. Each payload carries
+`next_transition_at` and `server_time`, so clients can count down
+locally instead of polling /api/system/status.
+
+- Only phase changes are pushed; admin edits already broadcast from
+  routes/admin.py, and wake the broadcaster to re-plan its timer.
+- Every worker runs its own broadcaster on the same clock and pushes to
+  its own subscribers only (broadcast_local, not via the broker), so a
+  client gets each transition once whatever the worker count.
+- Sleeps are capped at SCHEDULE_BROADCAST_MAX_SLEEP_SECONDS, which also
+  bounds how long a schedule edit made by another worker goes unnoticed.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.executors import run_in
+from app.core.schedule_cache import schedule_cache
+from app.core.websocket_manager import manager
+
+
+def _load_status() -> Dict[str, Any]:
+    from app.database import SessionLocal
+    from app.services import schedule_service
+
+    db = SessionLocal()
+    try:
+        return schedule_service.get_system_status(db)
+    finally:
+        db.close()
+
+
+def _phase_key(status: Dict[str, Any]) -> Tuple:
+    return (status.get("status"), status.get("warning"), status.get("is_manual_override"))
+
+
+class ScheduleBroadcaster:
+    def __init__(
+        self,
+        max_sleep_seconds: float = 60.0,
+        status_provider: Callable[[], Dict[str, Any]] = _load_status,
+        publish: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ):
+        self.max_sleep = max_sleep_seconds
+        self.status_provider = status_provider
+        self.publish = publish or manager.broadcast_local
+
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._last_phase: Optional[Tuple] = None
+
+        self.broadcasts = 0
+        self.wakeups = 0
+        self.next_transition_at: Optional[str] = None
+
+    def start(self) -> None:
+        """Start on the running loop (call from an async startup hook)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._last_phase = None
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def wake(self) -> None:
+        """Re-plan the timer now; safe to call from any thread"""
+        loop, event = self._loop, self._wake
+        if loop is None or event is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(event.set)
+
+    def _seconds_until(self, status: Dict[str, Any]) -> float:
+        next_at = status.get("next_transition_at")
+        if not next_at:
+            return self.max_sleep
+        delay = (datetime.fromisoformat(next_at) - datetime.utcnow()).total_seconds()
+        # Floor keeps an early timer wake-up from spinning
+        return min(self.max_sleep, max(delay, 0.01))
+
+    async def tick(self) -> float:
+        """Publish if the phase changed; return seconds until the next check"""
+        status = await run_in("db", self.status_provider)
+        phase = _phase_key(status)
+        if self._last_phase is not None and phase != self._last_phase:
+            await self.publish(status)
+            self.broadcasts += 1
+        self._last_phase = phase
+        self.next_transition_at = status.get("next_transition_at")
+        return self._seconds_until(status)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delay = await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warning: schedule broadcaster tick failed: {e}")
+                delay = self.max_sleep
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                self.wakeups += 1
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "broadcasts": self.broadcasts,
+            "wakeups": self.wakeups,
+            "next_transition_at": self.next_transition_at,
+            "subscribers": len(manager.connections)
+        }
+
+
+# Global instance
+schedule_broadcaster = ScheduleBroadcaster(max_sleep_seconds=settings.SCHEDULE_BROADCAST_MAX_SLEEP_SECONDS)
+schedule_cache.add_listener(schedule_broadcaster.wake)
@@ -0,0 +1,351 @@
+"""
+Schedule Snapshot Cache
+
+Keeps an immutable snapshot of the current system schedule in process so
+open/closed checks on every auth request are a clock comparison instead
+of a `system_schedule` query (and possibly a write).
+
+- The snapshot carries a compiled transition table (see schedule_engine)
+  and precomputes the next transition instant; until then the current
+  phase is reused as-is. The table is recompiled on reload once `now`
+  leaves its horizon.
+- Expired manual overrides are ignored by the snapshot immediately and
+  cleared in the database once, on the next reload.
+- Schedule writes call `schedule_cache.invalidate()`, which drops the local
+  snapshot and touches a shared version file. Other workers stat that
+  file at most once per SCHEDULE_VERSION_CHECK_SECONDS and reload when
+  it changes.
+"""
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.schedule_engine import ScheduleRules, TransitionTable, load_timezone
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """Immutable copy of a SystemSchedule row plus its compiled transition table"""
+    schedule_id: int
+    opening_hour: int
+    opening_minute: int
+    closing_hour: int
+    closing_minute: int
+    warning_minutes: int
+    timezone: str
+    is_manually_overridden: bool
+    manual_status: Optional[str]
+    override_reason: Optional[str]
+    override_expires_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    rules: ScheduleRules
+    table: TransitionTable
+    weekly_windows: Optional[Dict[str, Any]] = None
+    exceptions: Optional[Dict[str, Any]] = None
+    version: str = field(default="")
+
+    @classmethod
+    def from_schedule(cls, schedule, now: Optional[datetime] = None) -> "ScheduleSnapshot":
+        updated_at = schedule.updated_at
+        weekly_windows = getattr(schedule, "weekly_windows", None)
+        exceptions = getattr(schedule, "exceptions", None)
+        if weekly_windows:
+            rules = ScheduleRules.from_config(schedule.timezone, weekly_windows, exceptions)
+        else:
+            rules = ScheduleRules.daily(
+                schedule.timezone,
+                schedule.opening_hour * 60 + schedule.opening_minute,
+                schedule.closing_hour * 60 + schedule.closing_minute
+            )
+            if exceptions:
+                rules = replace(
+                    rules, exceptions=ScheduleRules.from_config(schedule.timezone, {}, exceptions).exceptions
+                )
+
+        return cls(
+            schedule_id=schedule.id,
+            opening_hour=schedule.opening_hour,
+            opening_minute=schedule.opening_minute,
+            closing_hour=schedule.closing_hour,
+            closing_minute=schedule.closing_minute,
+            warning_minutes=schedule.warning_minutes,
+            timezone=schedule.timezone,
+            is_manually_overridden=bool(schedule.is_manually_overridden),
+            manual_status=schedule.manual_status,
+            override_reason=schedule.override_reason,
+            override_expires_at=schedule.override_expires_at,
+            updated_at=updated_at,
+            rules=rules,
+            table=rules.compile(now or datetime.utcnow(), settings.SCHEDULE_HORIZON_DAYS),
+            weekly_windows=weekly_windows,
+            exceptions=exceptions,
+            version=f"{schedule.id}-{updated_at.timestamp() if updated_at else 0:.6f}"
+        )
+
+    def _table_for(self, now: datetime) -> TransitionTable:
+        # Only callers asking about instants outside the horizon pay for a compile
+        if self.table.covers(now):
+            return self.table
+        return self.rules.compile(now, settings.SCHEDULE_HORIZON_DAYS)
+
+    def override_active(self, now: datetime) -> bool:
+        if not self.is_manually_overridden:
+            return False
+        return self.override_expires_at is None or now <= self.override_expires_at
+
+    def closing_at(self, now: datetime) -> Optional[datetime]:
+        """Scheduled close of the current open period (None when closed)"""
+        return self._table_for(now).closing_at(now)
+
+    def next_opening(self, now: datetime) -> Optional[datetime]:
+        return self._table_for(now).next_opening(now)
+
+    def is_open(self, now: datetime) -> bool:
+        if self.override_active(now):
+            return self.manual_status == "open"
+        return self._table_for(now).is_open(now)
+
+    def in_warning(self, now: datetime) -> bool:
+        if self.override_active(now):
+            return False
+        closing = self.closing_at(now)
+        return closing is not None and now >= closing - timedelta(minutes=self.warning_minutes)
+
+    def phase(self, now: datetime) -> str:
+        """One of: override_open, override_closed, warning, open, closed"""
+        if self.override_active(now):
+            return f"override_{self.manual_status}"
+        if self._table_for(now).is_open(now):
+            return "warning" if self.in_warning(now) else "open"
+        return "closed"
+
+    def next_transition(self, now: datetime) -> Optional[datetime]:
+        """First instant after `now` at which the phase can change (None = never)"""
+        if self.override_active(now):
+            return self.override_expires_at + timedelta(microseconds=1) if self.override_expires_at else None
+        return self._table_for(now).next_transition(now, self.warning_minutes)
+
+    def phase_started(self, now: datetime) -> Optional[datetime]:
+        """When the current phase began (or the schedule last changed, if later)"""
+        started = None
+        if not self.override_active(now):
+            started = self._table_for(now).previous_transition(now, self.warning_minutes)
+        if self.updated_at and (started is None or self.updated_at > started):
+            started = self.updated_at
+        return started
+
+    def local_time(self, instant: datetime) -> datetime:
+        """Naive UTC -> aware datetime in the schedule's timezone"""
+        return instant.replace(tzinfo=dt_timezone.utc).astimezone(load_timezone(self.timezone))
+
+    def status(self, now: datetime, server_time: bool = True) -> Dict[str, Any]:
+        """
+        Detailed status, same shape as schedule_service.get_system_status.
+        HTTP-cacheable representations pass server_time=False: a cached
+        copy would carry a stale clock (clients use the Date header there).
+        """
+        next_transition = self.next_transition(now)
+        status_info: Dict[str, Any] = {
+            "schedule_id": self.schedule_id,
+            "timezone": self.timezone,
+            "currently_open": self.is_open(now),
+            "next_transition_at": next_transition.isoformat() if next_transition else None
+        }
+        if server_time:
+            status_info["server_time"] = now.isoformat()
+
+        if self.override_active(now):
+            status_info.update({
+                "status": self.manual_status,
+                "warning": False,
+                "message": f"System is manually {self.manual_status}",
+                "is_manual_override": True,
+                "override_reason": self.override_reason,
+                "override_expires_at": self.override_expires_at.isoformat() if self.override_expires_at else None
+            })
+            return status_info
+
+        status_info["is_manual_override"] = False
+
+        if self._table_for(now).is_open(now):
+            if self.in_warning(now):
+                minutes_left = int((self.closing_at(now) - now).total_seconds() / 60)
+                status_info.update({
+                    "status": "open",
+                    "warning": True,
+                    "message": f"System closing in {minutes_left} minutes. Please save your work.",
+                    "minutes_until_close": minutes_left
+                })
+            else:
+                status_info.update({
+                    "status": "open",
+                    "warning": False,
+                    "message": "System is operating normally"
+                })
+        else:
+            next_opening = self.next_opening(now)
+            if self.weekly_windows and next_opening:
+                opens_local = self.local_time(next_opening)
+                message = f"System is closed. Opens {opens_local:%a %d %b %H:%M} {self.timezone}"
+            else:
+                message = (
+                    f"System is closed. Hours: {self.opening_hour:02d}:{self.opening_minute:02d} - "
+                    f"{self.closing_hour:02d}:{self.closing_minute:02d} {self.timezone}"
+                )
+            status_info.update({
+                "status": "closed",
+                "warning": False,
+                "message": message,
+                "next_opening": next_opening.isoformat() if next_opening else None
+            })
+
+        return status_info
+
+
+class ScheduleCache:
+    """Process-wide holder of the current ScheduleSnapshot"""
+
+    def __init__(self, version_file: str, check_interval_seconds: float = 1.0):
+        self.version_file = version_file
+        self.check_interval = check_interval_seconds
+
+        self._snapshot: Optional[ScheduleSnapshot] = None
+        # (snapshot, phase, valid_until) for the most recent phase lookup
+        self._phase: Optional[Tuple[ScheduleSnapshot, str, Optional[datetime]]] = None
+        # Reentrant: a reload may clear an expired override, which invalidates
+        self._lock = threading.RLock()
+
+        self._seen_version: Optional[int] = None
+        self._next_version_check = 0.0
+
+        self._listeners: List[Callable[[], None]] = []
+
+        self.loads = 0
+        self.hits = 0
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Call `callback` (from the invalidating thread) after each local invalidation"""
+        self._listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # Cross-worker version file
+    # ------------------------------------------------------------------
+
+    def _read_version(self) -> Optional[int]:
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _external_change(self) -> bool:
+        monotonic_now = time.monotonic()
+        if monotonic_now < self._next_version_check:
+            return False
+        self._next_version_check = monotonic_now + self.check_interval
+        version = self._read_version()
+        changed = version != self._seen_version
+        self._seen_version = version
+        return changed
+
+    def invalidate(self) -> None:
+        """Drop the local snapshot and signal other workers to reload"""
+        with self._lock:
+            self._snapshot = None
+            self._phase = None
+        try:
+            directory = os.path.dirname(self.version_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.version_file, "w") as handle:
+                handle.write(uuid.uuid4().hex)
+            self._seen_version = self._read_version()
+        except OSError as e:
+            print(f"Warning: could not publish schedule version: {e}")
+        for callback in self._listeners:
+            callback()
+
+    # ------------------------------------------------------------------
+    # Snapshot access
+    # ------------------------------------------------------------------
+
+    def _load(self, db) -> ScheduleSnapshot:
+        # Lazy import: schedule_service invalidates this cache on writes
+        from app.services import schedule_service
+
+        schedule = schedule_service.get_current_schedule(db)
+        if (
+            schedule.is_manually_overridden
+            and schedule.override_expires_at
+            and datetime.utcnow() > schedule.override_expires_at
+        ):
+            schedule = schedule_service.clear_manual_override(db, schedule)
+
+        self.loads += 1
+        return ScheduleSnapshot.from_schedule(schedule)
+
+    def get(self, db) -> ScheduleSnapshot:
+        """Current snapshot; touches the database only after invalidation"""
+        snapshot = self._snapshot
+        now = datetime.utcnow()
+        stale = (
+            snapshot is None
+            or self._external_change()
+            or not snapshot.table.covers(now)
+            or (
+                snapshot.is_manually_overridden
+                and snapshot.override_expires_at is not None
+                and now > snapshot.override_expires_at
+            )
+        )
+        if not stale:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current is not snapshot and current.table.covers(now):
+                # Another thread reloaded while this one waited for the lock
+                return current
+            snapshot = self._load(db)
+            self._snapshot = snapshot
+            self._phase = None
+        return snapshot
+
+    def phase(self, db, now: Optional[datetime] = None) -> Tuple[str, Optional[datetime]]:
+        """(phase, valid_until) for `now`, reusing the precomputed transition"""
+        snapshot = self.get(db)
+        now = now or datetime.utcnow()
+        cached = self._phase
+        if cached is not None and cached[0] is snapshot and (cached[2] is None or now < cached[2]):
+            return cached[1], cached[2]
+        phase, valid_until = snapshot.phase(now), snapshot.next_transition(now)
+        self._phase = (snapshot, phase, valid_until)
+        return phase, valid_until
+
+    def is_open(self, db) -> bool:
+        phase, _ = self.phase(db)
+        return phase in ("open", "warning", "override_open")
+
+    def status(self, db) -> Dict[str, Any]:
+        return self.get(db).status(datetime.utcnow())
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "loaded": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "loads": self.loads,
+            "hits": self.hits
+        }
+
+
+# Global instance
+schedule_cache = ScheduleCache(
+    version_file=settings.SCHEDULE_VERSION_FILE,
+    check_interval_seconds=settings.SCHEDULE_VERSION_CHECK_SECONDS
+)
@@ -0,0 +1,224 @@
+"""
+Schedule Engine
+
+Turns weekly opening windows, date-specific exceptions and a timezone
+into a sorted table of UTC open/close instants, so schedule questions are
+bisect lookups instead of rule evaluation:
+
+    rules = ScheduleRules.from_config(
+        "Europe/Berlin",
+        {"mon": [["09:00", "12:00"], ["13:00", "17:00"]], "sat": [["10:00", "14:00"]]},
+        {"2026-12-25": [], "2026-12-24": [["09:00", "12:00"]]},
+    )
+    table = rules.compile(datetime.utcnow())
+    table.is_open(now), table.closing_at(now), table.next_opening(now)
+
+- Windows are local wall-clock times ("HH:MM", end may be "24:00").
+- An exception replaces the weekly windows for that local date; an empty
+  list closes the whole day.
+- Adjacent windows (including across midnight) merge into one interval.
+- All instants in and out of the table are naive UTC, like the rest of
+  the app. Wall times skipped by a DST change resolve to the
+  pre-transition offset; repeated wall times use their first occurrence.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# (start_minute, end_minute) within a local day, end exclusive
+Window = Tuple[int, int]
+
+
+def load_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def parse_clock(value: str) -> int:
+    """'HH:MM' -> minutes since midnight ('24:00' allowed as an end time)"""
+    try:
+        hours, minutes = (int(part) for part in value.split(":"))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time '{value}', expected HH:MM")
+    if not (0 <= hours <= 24 and 0 <= minutes <= 59) or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time '{value}', expected HH:MM")
+    return hours * 60 + minutes
+
+
+def format_clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def parse_windows(raw: List[Any]) -> Tuple[Window, ...]:
+    """Validate a list of [start, end] pairs into sorted, non-overlapping windows"""
+    windows = []
+    for entry in raw or []:
+        if isinstance(entry, dict):
+            start, end = entry.get("start"), entry.get("end")
+        else:
+            start, end = entry
+        window = (parse_clock(start), parse_clock(end))
+        if window[0] >= window[1]:
+            raise ValueError(f"Window {start}-{end} must end after it starts")
+        windows.append(window)
+
+    windows.sort()
+    for previous, current in zip(windows, windows[1:]):
+        if current[0] < previous[1]:
+            raise ValueError(
+                f"Windows {format_clock(previous[0])}-{format_clock(previous[1])} and "
+                f"{format_clock(current[0])}-{format_clock(current[1])} overlap"
+            )
+    return tuple(windows)
+
+
+def _to_utc(day: date, minute: int, zone: ZoneInfo) -> datetime:
+    local = datetime.combine(day, time()) + timedelta(minutes=minute)
+    local = local.replace(tzinfo=zone)
+    return local.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class TransitionTable:
+    """Sorted, non-overlapping UTC open intervals covering [horizon_start, horizon_end)"""
+    opens: Tuple[datetime, ...]
+    closes: Tuple[datetime, ...]
+    horizon_start: datetime
+    horizon_end: datetime
+
+    def _interval(self, now: datetime) -> int:
+        """Index of the last interval opening at or before `now` (-1 if none)"""
+        return bisect_right(self.opens, now) - 1
+
+    def covers(self, now: datetime) -> bool:
+        return self.horizon_start <= now < self.horizon_end
+
+    def is_open(self, now: datetime) -> bool:
+        index = self._interval(now)
+        return index >= 0 and now < self.closes[index]
+
+    def closing_at(self, now: datetime) -> Optional[datetime]:
+        """Close instant of the interval containing `now`, or None when closed"""
+        index = self._interval(now)
+        if index >= 0 and now < self.closes[index]:
+            return self.closes[index]
+        return None
+
+    def next_opening(self, now: datetime) -> Optional[datetime]:
+        """First opening strictly after `now` within the horizon"""
+        index = self._interval(now) + 1
+        return self.opens[index] if index < len(self.opens) else None
+
+    def previous_transition(self, now: datetime, warning_minutes: int = 0) -> Optional[datetime]:
+        """Latest open, warning-start or close instant at or before `now`"""
+        index = self._interval(now)
+        if index < 0:
+            return None
+        if now < self.closes[index]:
+            warning_start = self.closes[index] - timedelta(minutes=warning_minutes)
+            return max(warning_start, self.opens[index]) if warning_start <= now else self.opens[index]
+        return self.closes[index]
+
+    def next_transition(self, now: datetime, warning_minutes: int = 0) -> Optional[datetime]:
+        """Next open, warning-start or close instant after `now`"""
+        closing = self.closing_at(now)
+        if closing is not None:
+            warning_start = closing - timedelta(minutes=warning_minutes)
+            return warning_start if warning_start > now else closing
+        return self.next_opening(now)
+
+
+@dataclass(frozen=True)
+class ScheduleRules:
+    """Validated weekly windows and date exceptions in one timezone"""
+    timezone: str
+    weekly: Tuple[Tuple[Window, ...], ...]
+    exceptions: Dict[date, Tuple[Window, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(
+        cls,
+        timezone: str,
+        weekly_windows: Dict[str, List[Any]],
+        exceptions: Optional[Dict[str, List[Any]]] = None
+    ) -> "ScheduleRules":
+        """Build from the JSON shape stored on SystemSchedule; raises ValueError"""
+        load_timezone(timezone)
+
+        unknown = set(weekly_windows or {}) - set(WEEKDAYS)
+        if unknown:
+            raise ValueError(f"Unknown weekday(s): {', '.join(sorted(unknown))}")
+        weekly = tuple(parse_windows((weekly_windows or {}).get(day, [])) for day in WEEKDAYS)
+
+        parsed_exceptions = {}
+        for raw_date, windows in (exceptions or {}).items():
+            try:
+                day = date.fromisoformat(raw_date)
+            except ValueError:
+                raise ValueError(f"Invalid exception date '{raw_date}', expected YYYY-MM-DD")
+            parsed_exceptions[day] = parse_windows(windows)
+
+        return cls(timezone=timezone, weekly=weekly, exceptions=parsed_exceptions)
+
+    @classmethod
+    def daily(cls, timezone: str, opening_minute: int, closing_minute: int) -> "ScheduleRules":
+        """Same window every day (the legacy opening/closing hour columns)"""
+        load_timezone(timezone)
+        window = ((opening_minute, closing_minute),)
+        return cls(timezone=timezone, weekly=(window,) * 7)
+
+    def windows_for(self, day: date) -> Tuple[Window, ...]:
+        if day in self.exceptions:
+            return self.exceptions[day]
+        return self.weekly[day.weekday()]
+
+    def compile(self, start: datetime, horizon_days: int = 14) -> TransitionTable:
+        """
+        Build the transition table for [start - 1 day, start + horizon_days).
+        Adjacent intervals are merged so a window ending at 24:00 followed
+        by one starting at 00:00 reads as a single open period.
+        """
+        zone = load_timezone(self.timezone)
+        horizon_start = start - timedelta(days=1)
+        horizon_end = start + timedelta(days=horizon_days)
+
+        # One extra local day each side absorbs any UTC offset
+        first_day = horizon_start.date() - timedelta(days=1)
+        last_day = horizon_end.date() + timedelta(days=1)
+
+        intervals: List[List[datetime]] = []
+        day = first_day
+        while day <= last_day:
+            for start_minute, end_minute in self.windows_for(day):
+                opens_at = _to_utc(day, start_minute, zone)
+                closes_at = _to_utc(day, end_minute, zone)
+                if closes_at <= opens_at:
+                    continue
+                if intervals and opens_at <= intervals[-1][1]:
+                    intervals[-1][1] = max(intervals[-1][1], closes_at)
+                else:
+                    intervals.append([opens_at, closes_at])
+            day += timedelta(days=1)
+
+        return TransitionTable(
+            opens=tuple(interval[0] for interval in intervals),
+            closes=tuple(interval[1] for interval in intervals),
+            horizon_start=horizon_start,
+            horizon_end=horizon_end
+        )
+
+    def to_config(self) -> Dict[str, Any]:
+        """Inverse of from_config, for API responses"""
+        def dump(windows):
+            return [[format_clock(start), format_clock(end)] for start, end in windows]
+
+        return {
+            "weekly_windows": {day: dump(self.weekly[index]) for index, day in enumerate(WEEKDAYS)},
+            "exceptions": {day.isoformat(): dump(windows) for day, windows in sorted(self.exceptions.items())}
+        }
@@ -1,18 +1,52 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(
+    scheme: str = settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = settings.BCRYPT_ROUNDS
+) -> CryptContext:
+    """
+    Build the password context from configured cost parameters.
+    
+    New hashes use `scheme`. Hashes made with another scheme, or with
+    fewer bcrypt rounds than configured, are reported as needing an
+    update so they can be rehashed on the next successful login.
+    Use scripts/calibrate_password_hash.py to pick the parameters.
+    """
+    schemes = [scheme] if scheme == "bcrypt" else [scheme, "bcrypt"]
+    options = {
+        "bcrypt__rounds": bcrypt_rounds,
+        "bcrypt__min_rounds": bcrypt_rounds,
+    }
+    if scheme == "argon2":
+        # Requires the optional argon2-cffi package
+        options.update({
+            "argon2__time_cost": settings.ARGON2_TIME_COST,
+            "argon2__memory_cost": settings.ARGON2_MEMORY_KIB,
+            "argon2__parallelism": settings.ARGON2_PARALLELISM,
+        })
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+pwd_context = build_password_context()
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
+    """Hash a password with the configured scheme and cost"""
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one
+    uses an outdated scheme or cost. The new hash is None when current.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -0,0 +1,152 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent identical reads in one worker share one in-flight computation:
+the first caller for a key (the leader) runs it, callers arriving while
+it runs wait for and receive the same result or exception.
+
+    services = services_flight.do_sync(f"list:{include_inactive}", load, db)
+    status = await status_flight.do("status", compute_status)
+
+- Results are shared between requests: return immutable values (dicts
+  or pydantic models), never ORM objects bound to the leader's session.
+- A follower that waits longer than the timeout gets SingleFlightTimeout;
+  the leader's computation keeps running and still serves later callers.
+- Nothing is cached: the key is released as soon as the leader finishes.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.config import settings
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised to a follower whose wait exceeded the flight timeout"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._sync_calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------------
+    # Sync (def routes running in the threadpool)
+    # ------------------------------------------------------------------
+
+    def do_sync(self, key: Hashable, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._sync_calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.followers += 1
+                self.shared += 1
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+                with self._lock:
+                    self.errors += 1
+            finally:
+                with self._lock:
+                    del self._sync_calls[key]
+                call.done.set()
+        else:
+            wait = timeout if timeout is not None else self.timeout
+            if not call.done.wait(wait):
+                with self._lock:
+                    self.timeouts += 1
+                raise SingleFlightTimeout(f"{self.name}: timed out waiting for in-flight '{key}'")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    # ------------------------------------------------------------------
+    # Async (async def routes on the event loop)
+    # ------------------------------------------------------------------
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        # Tasks belong to one loop; never hand one to a caller on another
+        flight_key = (id(loop), key)
+
+        with self._lock:
+            self.calls += 1
+            task = self._async_calls.get(flight_key)
+            if task is None:
+                task = loop.create_task(fn(*args, **kwargs))
+                self._async_calls[flight_key] = task
+                self.executions += 1
+                task.add_done_callback(lambda finished: self._finish_async(flight_key, finished))
+            else:
+                self.shared += 1
+
+        wait = timeout if timeout is not None else self.timeout
+        try:
+            # shield: a caller timing out or disconnecting must not cancel the shared work
+            return await asyncio.wait_for(asyncio.shield(task), wait)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise SingleFlightTimeout(f"{self.name}: timed out waiting for in-flight '{key}'")
+
+    def _finish_async(self, flight_key: Hashable, task: asyncio.Task) -> None:
+        with self._lock:
+            if self._async_calls.get(flight_key) is task:
+                del self._async_calls[flight_key]
+            if not task.cancelled() and task.exception() is not None:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "shared": self.shared,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._sync_calls) + len(self._async_calls),
+                # Share of calls answered by someone else's computation
+                "coalescing_ratio": round(self.shared / self.calls, 4) if self.calls else 0.0
+            }
+
+
+flights: Dict[str, SingleFlight] = {}
+
+
+def get_flight(name: str, timeout: Optional[float] = None) -> SingleFlight:
+    """Named flight group, created on first use and listed in stats"""
+    if name not in flights:
+        flights[name] = SingleFlight(name, timeout if timeout is not None else settings.SINGLE_FLIGHT_TIMEOUT_SECONDS)
+    return flights[name]
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: flight.stats() for name, flight in flights.items()}
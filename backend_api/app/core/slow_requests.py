@@ -0,0 +1,324 @@
+"""
+Slow Request Watchdog
+
+Captures what a request is doing while it is slow, for latency spikes
+that are gone before anyone can attach a profiler:
+
+    record, token = slow_requests.begin(method, route, path)     # InstrumentationMiddleware
+    ...
+    slow_requests.end(record, token, status, usage)
+
+A watchdog thread wakes every SLOW_REQUEST_CHECK_MS and looks at the
+requests in flight. Once one runs past its route's threshold it grabs
+the stack of the thread currently working for it (sys._current_frames)
+on every tick, up to SLOW_REQUEST_MAX_SAMPLES, noting the SQL statement
+executing at that moment. When the request finishes the capture (request
+metadata, status, query counts, samples) goes into a bounded ring buffer
+browsed at GET /api/admin/slow-requests. Capture ids are "<pid>-<n>", so
+they are unique across workers and name the worker holding the capture.
+
+Which thread works for a request: the event loop thread to begin with;
+run_in() rebinds the record to the executor thread for the duration of
+the call, and every SQL statement binds the thread executing it (covers
+sync endpoints in the threadpool). A pool thread is sampled only while
+the record is still its latest owner, so a thread that has moved on to
+another request is not attributed to this one; the event loop thread is
+always sampled, since a blocked loop stalls every request on it.
+
+When nothing is slow the request path costs a dict insert and delete
+plus one ContextVar set/reset; the watchdog scans the in-flight dict.
+
+Thresholds: SLOW_REQUEST_THRESHOLD_MS, overridden per route with
+SLOW_REQUEST_ROUTES="POST /api/auth/pin/verify=500,/api/admin/audit=5000"
+(method optional).
+"""
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import registry
+
+MAX_DEPTH = 64
+_WHITESPACE = re.compile(r"\s+")
+
+slow_requests_total = registry.counter(
+    "http_slow_requests_total", "Requests that ran past their slow-request threshold",
+    ["method", "route"]
+)
+
+
+def parse_route_thresholds(spec: str) -> Dict[str, float]:
+    """"POST /api/auth/pin/verify=500,/api/admin/audit=5000" -> {route key: seconds}"""
+    thresholds = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        route, ms = item.rsplit("=", 1)
+        try:
+            thresholds[route.strip()] = float(ms) / 1000
+        except ValueError:
+            continue
+    return thresholds
+
+
+class RequestRecord:
+    __slots__ = (
+        "id", "method", "route", "path", "started", "deadline", "home", "thread",
+        "statement", "samples", "slow"
+    )
+
+    def __init__(self, id: int, method: str, route: str, path: str, threshold: float):
+        self.id = id
+        self.method = method
+        self.route = route
+        self.path = path
+        self.started = time.monotonic()
+        self.deadline = self.started + threshold
+        # Event loop thread; `thread` is wherever the request's work runs now
+        self.home = self.thread = threading.get_ident()
+        # Raw text of the statement executing right now (placeholders, no values)
+        self.statement: Optional[str] = None
+        self.samples: List[Dict[str, Any]] = []
+        self.slow = False
+
+
+_current: ContextVar[Optional[RequestRecord]] = ContextVar("slow_request", default=None)
+
+# thread ident -> the record that thread last worked for
+_owners: Dict[int, RequestRecord] = {}
+
+
+def bind_thread(record: RequestRecord) -> None:
+    ident = threading.get_ident()
+    record.thread = ident
+    _owners[ident] = record
+
+
+def run_bound(fn: Callable, *args, **kwargs) -> Any:
+    """Call fn on this thread on behalf of the current request (used by run_in)"""
+    record = _current.get()
+    if record is None:
+        return fn(*args, **kwargs)
+    previous = record.thread
+    bind_thread(record)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        if _owners.get(record.thread) is record:
+            del _owners[record.thread]
+        # Back to the thread awaiting the call
+        record.thread = previous
+
+
+def statement_started(statement: str) -> None:
+    """sql_telemetry hook: this thread now runs `statement` for the current request"""
+    record = _current.get()
+    if record is not None:
+        bind_thread(record)
+        record.statement = statement
+
+
+def statement_finished() -> None:
+    record = _current.get()
+    if record is not None:
+        record.statement = None
+
+
+class SlowRequestWatchdog:
+    def __init__(
+        self,
+        threshold_ms: float = 1000,
+        route_thresholds: Optional[Dict[str, float]] = None,
+        check_interval_ms: float = 100,
+        max_samples: int = 20,
+        buffer_size: int = 100,
+        enabled: bool = True
+    ):
+        self.threshold = threshold_ms / 1000
+        self.route_thresholds = route_thresholds or {}
+        self.check_interval = check_interval_ms / 1000
+        self.max_samples = max_samples
+        self.enabled = enabled
+
+        self._thresholds: Dict[Tuple[str, str], float] = {}
+        self._ids = itertools.count(1)
+        self._active: Dict[int, RequestRecord] = {}
+        self._captures: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+        self.requests = 0
+        self.slow = 0
+        self.samples = 0
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    def threshold_for(self, method: str, route: str) -> float:
+        threshold = self._thresholds.get((method, route))
+        if threshold is None:
+            thresholds = self.route_thresholds
+            threshold = thresholds.get(f"{method} {route}") or thresholds.get(route) or self.threshold
+            # Keys come from the route table, so this stays small
+            self._thresholds[(method, route)] = threshold
+        return threshold
+
+    def begin(self, method: str, route: str, path: str) -> Tuple[Optional[RequestRecord], Any]:
+        """Register a request in flight; pass both values to end()"""
+        if not self.enabled:
+            return None, None
+        if self._pid != os.getpid():
+            self._start()
+        record = RequestRecord(next(self._ids), method, route, path, self.threshold_for(method, route))
+        self._active[record.id] = record
+        self.requests += 1
+        return record, _current.set(record)
+
+    def end(self, record: Optional[RequestRecord], token: Any, status: int, usage=None) -> None:
+        if record is None:
+            return
+        _current.reset(token)
+        del self._active[record.id]
+        if _owners.get(record.thread) is record:
+            del _owners[record.thread]
+        if not record.slow:
+            return
+
+        duration = time.monotonic() - record.started
+        pid = os.getpid()
+        capture = {
+            "id": f"{pid}-{record.id}",
+            "pid": pid,
+            "method": record.method,
+            "route": record.route,
+            "path": record.path,
+            "started_at": datetime.utcfromtimestamp(time.time() - duration).isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "threshold_ms": round((record.deadline - record.started) * 1000, 2),
+            "status": status,
+            "queries": usage.queries if usage is not None else None,
+            "db_ms": round(usage.db_time * 1000, 2) if usage is not None else None,
+            "statements": (
+                sorted(usage.statements.items(), key=lambda item: item[1], reverse=True)
+                if usage is not None else []
+            ),
+            "samples": record.samples
+        }
+        with self._lock:
+            self._captures.append(capture)
+
+    # ------------------------------------------------------------------
+    # Watchdog thread
+    # ------------------------------------------------------------------
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # First use, or a forked child that inherited a dead watchdog
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="slow-request-watchdog", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            now = time.monotonic()
+            overdue = [record for record in list(self._active.values()) if now >= record.deadline]
+            if overdue:
+                self._sample(overdue, now)
+
+    def _sample(self, records: List[RequestRecord], now: float) -> None:
+        frames = sys._current_frames()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for record in records:
+            if not record.slow:
+                record.slow = True
+                self.slow += 1
+                slow_requests_total.inc(method=record.method, route=record.route)
+            if len(record.samples) >= self.max_samples:
+                continue
+            ident = record.thread
+            owner = _owners.get(ident)
+            frame = frames.get(ident) if ident == record.home or owner is None or owner is record else None
+            statement = record.statement
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.reverse()
+            record.samples.append({
+                "elapsed_ms": round((now - record.started) * 1000, 1),
+                "thread": names.get(ident, f"thread-{ident}"),
+                "sql": _WHITESPACE.sub(" ", statement).strip() if statement else None,
+                "stack": stack
+            })
+            self.samples += 1
+        del frames
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(self.check_interval + 1)
+        self._thread = None
+        self._pid = None
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def captures(self, route: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent first, without samples"""
+        with self._lock:
+            captures = list(self._captures)
+        captures.reverse()
+        if route:
+            captures = [capture for capture in captures if route in capture["route"]]
+        return [
+            {key: value for key, value in capture.items() if key not in ("samples", "statements")}
+            | {"samples": len(capture["samples"])}
+            for capture in captures[:limit]
+        ]
+
+    def capture(self, capture_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for capture in self._captures:
+                if capture["id"] == capture_id:
+                    return capture
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "route_thresholds_ms": {route: seconds * 1000 for route, seconds in self.route_thresholds.items()},
+            "in_flight": len(self._active),
+            "requests": self.requests,
+            "slow": self.slow,
+            "samples": self.samples,
+            "buffered": len(self._captures)
+        }
+
+
+# Global instance
+slow_requests = SlowRequestWatchdog(
+    threshold_ms=settings.SLOW_REQUEST_THRESHOLD_MS,
+    route_thresholds=parse_route_thresholds(settings.SLOW_REQUEST_ROUTES),
+    check_interval_ms=settings.SLOW_REQUEST_CHECK_MS,
+    max_samples=settings.SLOW_REQUEST_MAX_SAMPLES,
+    buffer_size=settings.SLOW_REQUEST_BUFFER_SIZE,
+    enabled=settings.SLOW_REQUEST_WATCHDOG_ENABLED
+)
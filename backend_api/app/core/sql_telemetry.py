@@ -0,0 +1,370 @@
+"""
+SQL Telemetry
+
+SQLAlchemy event hooks on the application engine:
+
+- Per-statement stats: every executed statement is normalised (literals
+  and placeholder lists collapsed, whitespace squeezed) and counted with
+  a latency histogram, so "which query made the dashboard slow" is one
+  sorted table (GET /api/admin/database/statements).
+- Slow-query log: statements slower than SQL_SLOW_QUERY_MS are logged to
+  the "app.sql" logger and kept in a small ring buffer. Bound parameters
+  are redacted to their type and length; values never leave the process.
+- Pool: time spent waiting for a pooled connection, waiters, timeouts
+  and connections in use vs. pool capacity (InstrumentedQueuePool).
+- Slow requests: the statement running right now is noted for the
+  watchdog's stack samples (core/slow_requests.py).
+- Tracing: inside a sampled request trace each statement is also
+  exported as a "db <OPERATION> <table>" span (core/tracing.py).
+
+Prometheus series are labelled by operation and table only; the full
+statement text stays in this worker's table.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+from app.core.metrics import registry, histogram_quantile
+from app.core.query_budget import record_query
+from app.core.slow_requests import statement_started, statement_finished
+from app.core.tracing import tracer
+
+logger = logging.getLogger("app.sql")
+
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+OTHER_STATEMENTS = "<other statements>"
+
+query_duration = registry.histogram(
+    "db_query_duration_seconds", "SQL statement latency by operation and table",
+    ["operation", "table"], buckets=QUERY_BUCKETS
+)
+query_errors = registry.counter(
+    "db_query_errors_total", "SQL statements that raised, by operation and table",
+    ["operation", "table"]
+)
+slow_queries = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than SQL_SLOW_QUERY_MS"
+)
+pool_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", buckets=WAIT_BUCKETS
+)
+pool_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total", "Pool checkouts that gave up after DB_POOL_TIMEOUT_SECONDS"
+)
+pool_in_use = registry.gauge(
+    "db_pool_connections_in_use", "Connections checked out of the pool"
+)
+pool_waiters = registry.gauge(
+    "db_pool_waiters", "Threads waiting for a pooled connection"
+)
+
+# ============================================================================
+# Statement normalisation
+# ============================================================================
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|(?<![:\w]):\w+|\$\d+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+[\"`\[]?(\w+)", re.IGNORECASE)
+
+
+def normalize_statement(statement: str) -> str:
+    """SELECT ... WHERE id IN (?, ?, ?) AND name = 'x' -> ... id IN (?...) AND name = ?"""
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def classify_statement(normalized: str) -> Tuple[str, str]:
+    """(operation, table) for metric labels, e.g. ("SELECT", "qr_sessions")"""
+    operation = normalized.split(" ", 1)[0].upper() if normalized else "UNKNOWN"
+    match = _TABLE.search(normalized)
+    return operation, match.group(1).lower() if match else "-"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Bound parameters reduced to type (and length), e.g. {"token_1": "<str:36>"}"""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: _describe(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_describe(value) for value in parameters]
+    return _describe(parameters)
+
+
+def _describe(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    if isinstance(value, (datetime, date)):
+        return "<datetime>"
+    return f"<{type(value).__name__}>"
+
+
+# ============================================================================
+# Telemetry
+# ============================================================================
+
+class StatementStats:
+    __slots__ = ("statement", "operation", "table", "count", "errors", "total", "max", "counts")
+
+    def __init__(self, statement: str, operation: str, table: str):
+        self.statement = statement
+        self.operation = operation
+        self.table = table
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.counts = [0] * (len(QUERY_BUCKETS) + 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "statement": self.statement,
+            "operation": self.operation,
+            "table": self.table,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": _ms(self.total),
+            "mean_ms": _ms(self.total / self.count) if self.count else 0.0,
+            "max_ms": _ms(self.max),
+            "p95_ms": _ms(histogram_quantile(QUERY_BUCKETS, self.counts, 0.95))
+        }
+
+
+class SQLTelemetry:
+    ORDERINGS = {
+        "total": lambda s: s.total,
+        "mean": lambda s: s.total / s.count if s.count else 0.0,
+        "max": lambda s: s.max,
+        "count": lambda s: s.count,
+        "errors": lambda s: s.errors
+    }
+
+    def __init__(self, slow_query_ms: float = 200, max_statements: int = 500, slow_log_size: int = 100):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements: Dict[str, StatementStats] = {}
+        # raw statement -> normalised text, (operation, table) label series, span name
+        self._normalized: Dict[str, Tuple[str, Any, Any, str]] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self._engines: List[Any] = []
+        self.peak_waiters = 0
+        self._waiting = 0
+
+    def instrument(self, engine) -> None:
+        """Attach the execution and pool hooks to an engine (once)"""
+        if engine in self._engines:
+            return
+        self._engines.append(engine)
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._on_error)
+        event.listen(engine, "checkout", lambda *args: self._pool_changed(engine))
+        event.listen(engine, "checkin", lambda *args: self._pool_changed(engine))
+
+    # ------------------------------------------------------------------
+    # Execution hooks
+    # ------------------------------------------------------------------
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        statement_started(statement)
+        conn.info.setdefault("telemetry_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        statement_finished()
+        started = conn.info["telemetry_started"].pop()
+        self._record(statement, time.perf_counter() - started, parameters, executemany)
+
+    def _on_error(self, exception_context):
+        statement_finished()
+        conn = exception_context.connection
+        statement = exception_context.statement
+        if conn is None or statement is None:
+            return
+        stack = conn.info.get("telemetry_started")
+        if stack:
+            context = exception_context.execution_context
+            executemany = bool(context is not None and context.executemany)
+            self._record(
+                statement, time.perf_counter() - stack.pop(), exception_context.parameters, executemany, failed=True
+            )
+
+    def _resolve(self, statement: str) -> Tuple[str, Any, Any, str]:
+        resolved = self._normalized.get(statement)
+        if resolved is None:
+            normalized = normalize_statement(statement)
+            operation, table = classify_statement(normalized)
+            resolved = (
+                normalized,
+                query_duration.labels(operation=operation, table=table),
+                query_errors.labels(operation=operation, table=table),
+                f"db {operation} {table}"
+            )
+            with self._lock:
+                if len(self._normalized) >= self.max_statements * 4:
+                    self._normalized.clear()
+                self._normalized[statement] = resolved
+        return resolved
+
+    def _record(self, statement: str, elapsed: float, parameters: Any, executemany: bool, failed: bool = False) -> None:
+        normalized, duration, errors, span_name = self._resolve(statement)
+        duration.observe(elapsed)
+        record_query(normalized, elapsed)
+        if tracer.current() is not None:
+            tracer.record_span(span_name, elapsed, error="failed" if failed else None, statement=normalized)
+        if failed:
+            errors.inc()
+
+        with self._lock:
+            stats = self._statements.get(normalized)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    normalized = OTHER_STATEMENTS
+                    stats = self._statements.get(normalized)
+                if stats is None:
+                    operation, table = classify_statement(normalized)
+                    stats = self._statements[normalized] = StatementStats(normalized, operation, table)
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+            stats.counts[bisect.bisect_left(QUERY_BUCKETS, elapsed)] += 1
+            if failed:
+                stats.errors += 1
+
+        if elapsed >= self.slow_query_seconds:
+            self._log_slow(normalized, elapsed, parameters, executemany, failed)
+
+    def _log_slow(self, normalized: str, elapsed: float, parameters: Any, executemany: bool, failed: bool) -> None:
+        slow_queries.inc()
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "duration_ms": round(elapsed * 1000, 3),
+            "statement": normalized,
+            "parameters": redact_parameters(parameters, executemany) if parameters is not None else None,
+            "failed": failed
+        }
+        self._slow.append(entry)
+        logger.warning(
+            f"Slow query {entry['duration_ms']} ms: {normalized} | params={entry['parameters']}"
+        )
+
+    # ------------------------------------------------------------------
+    # Pool hooks
+    # ------------------------------------------------------------------
+
+    def checkout_waiting(self, delta: int) -> None:
+        with self._lock:
+            self._waiting += delta
+            if self._waiting > self.peak_waiters:
+                self.peak_waiters = self._waiting
+            waiting = self._waiting
+        pool_waiters.set(waiting)
+
+    def _pool_changed(self, engine) -> None:
+        checkedout = getattr(engine.pool, "checkedout", None)
+        if checkedout is not None:
+            pool_in_use.set(checkedout())
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def top_statements(self, limit: int = 20, order_by: str = "total") -> List[Dict[str, Any]]:
+        key = self.ORDERINGS[order_by]
+        with self._lock:
+            ranked = sorted(self._statements.values(), key=key, reverse=True)[:limit]
+            return [stats.as_dict() for stats in ranked]
+
+    def slow_log(self) -> List[Dict[str, Any]]:
+        """Recent slow queries, newest first"""
+        return list(reversed(self._slow))
+
+    def pool_stats(self) -> Dict[str, Any]:
+        wait = pool_wait.labels()
+        stats: Dict[str, Any] = {
+            "waiting": self._waiting,
+            "peak_waiting": self.peak_waiters,
+            "checkouts": wait.count,
+            "wait_p50_ms": _ms(histogram_quantile(WAIT_BUCKETS, wait.counts, 0.5)),
+            "wait_p99_ms": _ms(histogram_quantile(WAIT_BUCKETS, wait.counts, 0.99)),
+            "timeouts": int(pool_timeouts.labels().value)
+        }
+        if self._engines:
+            pool = self._engines[0].pool
+            stats["pool"] = type(pool).__name__
+            if isinstance(pool, QueuePool):
+                capacity = pool.size() + max(pool._max_overflow, 0)
+                stats.update({
+                    "size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(pool.overflow(), 0),
+                    "saturation": round(pool.checkedout() / capacity, 3) if capacity else None
+                })
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statements = len(self._statements)
+            executions = sum(s.count for s in self._statements.values())
+            errors = sum(s.errors for s in self._statements.values())
+        return {
+            "statements": statements,
+            "executions": executions,
+            "errors": errors,
+            "slow_queries": int(slow_queries.labels().value),
+            "slow_query_ms": self.slow_query_seconds * 1000,
+            "pool": self.pool_stats()
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._slow.clear()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        sql_telemetry.checkout_waiting(1)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait.observe(time.perf_counter() - started)
+            sql_telemetry.checkout_waiting(-1)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+# Global instance
+sql_telemetry = SQLTelemetry(
+    slow_query_ms=settings.SQL_SLOW_QUERY_MS,
+    max_statements=settings.SQL_TELEMETRY_MAX_STATEMENTS
+)
@@ -0,0 +1,553 @@
+"""
+Request Tracing
+
+Spans show where the time goes inside one request (rate limiter,
+schedule check, service call, QR render, each SQL statement, commits):
+
+    with tracer.span("qr.render", size=len(pattern)):
+        ...
+
+    @tracer.traced()                    # span named "qr_service.generate_qr_session"
+    def generate_qr_session(...):
+
+TracingMiddleware opens the root span ("POST /api/auth/pin/verify") and
+the current span lives in a context variable, so work handed to the
+threadpool or a workload executor (both copy the context) nests under
+the request. SQL statements and ORM commits are recorded as spans by the
+engine/session hooks.
+
+- Sampling: a request is traced when the caller sent a sampled W3C
+  `traceparent` (the trace continues under the caller's trace id), or
+  else with probability TRACE_SAMPLE_RATE; at most TRACE_MAX_PER_SECOND
+  traces start per worker either way. Outside a sampled trace span()
+  returns a shared no-op span (one ContextVar lookup).
+- Propagation: traced responses carry `traceresponse` (W3C Trace Context
+  level 2) naming the server span, so a registered service can link its
+  own trace to ours; `tracer.traceparent()` is the header for outbound calls.
+- Export: finished spans are queued and a writer thread appends them as
+  JSON Lines to TRACE_FILE, rotated by size to <file>.1 ... <file>.N.
+  All workers append to the same file; writes hold a shared and
+  rotation an exclusive flock on <file>.lock, and a worker rotates only
+  if the file is still over the limit once it holds the lock:
+
+    {"trace_id": "4bf9...", "span_id": "00f0...", "parent_id": null, "name": "POST /api/auth/pin/verify",
+     "start": 1714555800.123456, "duration_ms": 41.2, "pid": 812, "error": null, "attributes": {...}}
+
+scripts/trace_report.py summarises the critical path per endpoint.
+"""
+import functools
+import inspect
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: development only, a single worker
+    fcntl = None
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header, None if invalid"""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    __slots__ = (
+        "tracer", "trace_id", "span_id", "parent_id", "name", "start", "duration",
+        "attributes", "error", "_started", "_token"
+    )
+
+    def __init__(self, tracer: "Tracer", trace_id: str, parent_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = 0.0
+        self.duration = 0.0
+        self.error: Optional[str] = None
+        self._started = 0.0
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self) -> "Span":
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self._started
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer.exporter.export(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "pid": os.getpid(),
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Returned outside a sampled trace; records nothing"""
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+class SpanExporter:
+    """Bounded queue drained by a writer thread into a size-rotated JSON Lines file"""
+
+    def __init__(
+        self,
+        path: str = "logs/traces.jsonl",
+        max_bytes: int = 20 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+        flush_interval: float = 1.0
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+
+        self._queue: Deque[Span] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._closing = False
+
+        self.exported = 0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.write_errors = 0
+
+    def export(self, span: Span) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        with self._lock:
+            if len(self._queue) >= self.queue_size:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+            self.exported += 1
+            self._idle.clear()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # First use, or a forked child that inherited a dead writer
+            self._pid = os.getpid()
+            # flock is per open file description: a child must not share the parent's
+            self._lock_fd = None
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                batch = list(self._queue)
+                self._queue.clear()
+                closing = self._closing
+            if batch:
+                self._write(batch)
+            with self._lock:
+                if not self._queue:
+                    self._idle.set()
+            if closing:
+                return
+
+    @contextmanager
+    def _locked(self, shared: bool):
+        if fcntl is None:
+            yield
+            return
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o640)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _write(self, batch: List[Span]) -> None:
+        data = "".join(json.dumps(span.as_dict(), default=str) + "\n" for span in batch).encode("utf-8")
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._locked(shared=True):
+                with open(self.path, "ab") as handle:
+                    handle.write(data)
+                    # End of the file, other workers' spans included
+                    size = handle.tell()
+        except OSError as e:
+            self.write_errors += 1
+            print(f"Warning: trace export failed ({len(batch)} spans lost): {e}")
+            return
+        self.written += len(batch)
+        if self.max_bytes and size >= self.max_bytes:
+            try:
+                self._rotate()
+            except OSError as e:
+                # The spans are written; only the rotation is retried on the next batch
+                print(f"Warning: trace file rotation failed: {e}")
+
+    def _rotate(self) -> None:
+        with self._locked(shared=False):
+            try:
+                if os.path.getsize(self.path) < self.max_bytes:
+                    # Another worker rotated it first
+                    return
+            except FileNotFoundError:
+                return
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            if self.backup_count > 0:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+        self.rotations += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything exported so far is written; False on timeout"""
+        if self._pid != os.getpid():
+            return True
+        self._wake.set()
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._closing = True
+        self._wake.set()
+        thread.join(timeout)
+        self._pid = None
+        self._thread = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth = len(self._queue)
+        return {
+            "file": self.path,
+            "queue_depth": depth,
+            "exported": self.exported,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors
+        }
+
+
+class Tracer:
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        enabled: bool = True,
+        sample_rate: float = 0.01,
+        max_traces_per_second: int = 20
+    ):
+        self.exporter = exporter
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_traces_per_second = max_traces_per_second
+        self._window = 0
+        self._window_traces = 0
+
+        self.requests = 0
+        self.sampled = 0
+        self.continued = 0
+        self.throttled = 0
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, **attributes) -> Optional[Span]:
+        """
+        Root span for an incoming request, or None when it is not sampled.
+        Enter the returned span to make it current.
+        """
+        if not self.enabled:
+            return None
+        self.requests += 1
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            if not parent[2]:
+                return None
+        elif random.random() >= self.sample_rate:
+            return None
+
+        if self.max_traces_per_second:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window = window
+                self._window_traces = 0
+            if self._window_traces >= self.max_traces_per_second:
+                self.throttled += 1
+                return None
+            self._window_traces += 1
+
+        self.sampled += 1
+        if parent is None:
+            return Span(self, _new_trace_id(), None, name, attributes)
+        self.continued += 1
+        return Span(self, parent[0], parent[1], name, attributes)
+
+    def span(self, name: str, **attributes):
+        """Child of the current span; a no-op outside a sampled trace"""
+        parent = _current.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, parent.trace_id, parent.span_id, name, attributes)
+
+    def record_span(self, name: str, duration: float, error: Optional[str] = None, **attributes) -> None:
+        """Export a child span for an interval that just ended (SQL hooks)"""
+        parent = _current.get()
+        if parent is None:
+            return
+        span = Span(self, parent.trace_id, parent.span_id, name, attributes)
+        span.start = time.time() - duration
+        span.duration = duration
+        span.error = error
+        self.exporter.export(span)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Decorator wrapping each call in a span (default name: module.function)"""
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if _current.get() is None:
+                        return await fn(*args, **kwargs)
+                    with self.span(span_name):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if _current.get() is None:
+                    return fn(*args, **kwargs)
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current(self) -> Optional[Span]:
+        return _current.get()
+
+    def traceparent(self) -> Optional[str]:
+        """traceparent header for an outbound call made inside the current span"""
+        span = _current.get()
+        return span.traceparent() if span is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "max_traces_per_second": self.max_traces_per_second,
+            "requests": self.requests,
+            "sampled": self.sampled,
+            "continued": self.continued,
+            "throttled": self.throttled,
+            "exporter": self.exporter.stats()
+        }
+
+
+# ============================================================================
+# ORM commits
+# ============================================================================
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    if _current.get() is not None:
+        session.info["trace_commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    started = session.info.pop("trace_commit_started", None)
+    if started is not None:
+        tracer.record_span("db.commit", time.perf_counter() - started)
+
+
+# ============================================================================
+# Critical path report (scripts/trace_report.py)
+# ============================================================================
+
+def read_spans(path: str, backup_count: int = 5) -> Iterator[Dict[str, Any]]:
+    """Spans from the rotated segments (oldest first) and the live file"""
+    paths = [f"{path}.{index}" for index in range(backup_count, 0, -1)] + [path]
+    for segment in paths:
+        if not os.path.exists(segment):
+            continue
+        with open(segment, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Torn line from a crash mid-write
+                    continue
+
+
+def _walk(span: Dict[str, Any], hi: float, children: Dict[str, List[Dict[str, Any]]], totals: Dict[str, float]) -> None:
+    """
+    Charge [span.start, hi] to the span's critical path: walking back from
+    `hi`, the child that finished last is what the span was waiting on;
+    time not covered by such a child is the span's own.
+    """
+    start = span["start"]
+    cursor = hi
+    own = 0.0
+    for child in children.get(span["span_id"], ()):
+        if child["start"] >= cursor:
+            # Overlapped by a child that finished later
+            continue
+        child_hi = min(child["start"] + child["duration_ms"] / 1000, cursor)
+        own += cursor - child_hi
+        _walk(child, child_hi, children, totals)
+        cursor = max(child["start"], start)
+    own += max(cursor - start, 0.0)
+    totals[span["name"]] += own
+
+
+def summarize_traces(spans: Iterable[Dict[str, Any]], endpoint: Optional[str] = None, top: int = 8) -> Dict[str, Any]:
+    """
+    Per endpoint (root span name): trace count, latency percentiles and the
+    spans the critical path spent most time in, with their share of it.
+    """
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for span in spans:
+        traces[span["trace_id"]].append(span)
+
+    endpoints: Dict[str, Dict[str, Any]] = {}
+    for trace in traces.values():
+        ids = {span["span_id"] for span in trace}
+        # Root: parent absent from this process's spans (none, or the caller's)
+        roots = [span for span in trace if span["parent_id"] not in ids]
+        if not roots:
+            continue
+        root = max(roots, key=lambda span: span["duration_ms"])
+        if endpoint and endpoint not in root["name"]:
+            continue
+
+        children: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for span in trace:
+            if span is not root and span["parent_id"] in ids:
+                children[span["parent_id"]].append(span)
+        for siblings in children.values():
+            siblings.sort(key=lambda span: span["start"] + span["duration_ms"] / 1000, reverse=True)
+
+        totals: Dict[str, float] = defaultdict(float)
+        _walk(root, root["start"] + root["duration_ms"] / 1000, children, totals)
+
+        summary = endpoints.setdefault(root["name"], {"durations": [], "path": defaultdict(float)})
+        summary["durations"].append(root["duration_ms"])
+        for name, seconds in totals.items():
+            summary["path"][name] += seconds
+
+    report = {}
+    for name, summary in sorted(endpoints.items(), key=lambda item: -len(item[1]["durations"])):
+        durations = sorted(summary["durations"])
+        count = len(durations)
+        total = sum(summary["path"].values()) or 1.0
+        path = sorted(summary["path"].items(), key=lambda item: item[1], reverse=True)[:top]
+        report[name] = {
+            "traces": count,
+            "p50_ms": durations[int(0.5 * (count - 1))],
+            "p95_ms": durations[int(0.95 * (count - 1))],
+            "max_ms": durations[-1],
+            "critical_path": [
+                {"name": span_name, "mean_ms": round(seconds / count * 1000, 3), "share": round(seconds / total, 3)}
+                for span_name, seconds in path
+            ]
+        }
+    return report
+
+
+# Global instance
+tracer = Tracer(
+    SpanExporter(
+        path=settings.TRACE_FILE,
+        max_bytes=settings.TRACE_MAX_BYTES,
+        backup_count=settings.TRACE_BACKUP_COUNT,
+        queue_size=settings.TRACE_QUEUE_SIZE
+    ),
+    enabled=settings.TRACING_ENABLED,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    max_traces_per_second=settings.TRACE_MAX_PER_SECOND
+)
@@ -1,26 +1,228 @@
-from fastapi import WebSocket
-from typing import List
+"""
+WebSocket Fan-out
+
+Each subscriber gets a bounded outbound queue drained by its own writer
+task, so broadcast() only serializes once and enqueues; one slow or
+stalled client never delays delivery to the others.
+
+- Slow consumers: a full queue, or a send that takes longer than
+  WS_SEND_TIMEOUT_SECONDS, evicts the connection (clients reconnect).
+- Heartbeat: after WS_HEARTBEAT_SECONDS without traffic the writer sends
+  {"type": "ping"}; clients answer "pong" (or any message). Connections
+  silent for WS_IDLE_TIMEOUT_SECONDS are closed (0 disables).
+- Connections beyond WS_MAX_CONNECTIONS are refused with close code 1013.
+- With a broker attached, broadcast() publishes to it and every worker
+  (this one included) fans out on receipt, so all subscribers on all
+  workers get each message once and in the same order.
+  broadcast_local() skips the broker, for messages every worker
+  produces itself.
+"""
+import asyncio
 import json
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import WebSocket
+
+from app.config import settings
+from app.core.broker import Broker, broker
+
+# RFC 6455 close codes
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013
+
+PING_MESSAGE = json.dumps({"type": "ping"})
+
+# Broker channel carrying system status broadcasts
+STATUS_CHANNEL = "system_status"
+
+
+def serialize(message: dict) -> str:
+    """Same encoding as WebSocket.send_json, done once per broadcast"""
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class Subscriber:
+    __slots__ = ("websocket", "queue", "writer", "last_seen", "connected_at", "sent")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+        self.connected_at = self.last_seen
+        self.sent = 0
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(
+        self,
+        max_connections: int = 10000,
+        queue_size: int = 16,
+        send_timeout: float = 5.0,
+        heartbeat_interval: float = 30.0,
+        idle_timeout: float = 90.0,
+        broker: Optional[Broker] = None
+    ):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.broker = broker
+        if broker is not None:
+            broker.subscribe(STATUS_CHANNEL, self.deliver)
+
+        self.connections: Dict[WebSocket, Subscriber] = {}
+
+        self.broadcasts = 0
+        self.refused = 0
+        self.evicted_slow = 0
+        self.evicted_idle = 0
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket, subprotocol: Optional[str] = None) -> bool:
+        """Accept and start the writer; False if the connection cap is reached"""
+        if len(self.connections) >= self.max_connections:
+            self.refused += 1
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+            return False
+
+        await websocket.accept(subprotocol=subprotocol)
+        subscriber = Subscriber(websocket, self.queue_size)
+        self.connections[websocket] = subscriber
+        subscriber.writer = asyncio.get_running_loop().create_task(self._writer(subscriber))
+        return True
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        # Broadcast message to all connected clients
-        # Removes dead connections automatically
-        for connection in self.active_connections[:]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                self.disconnect(connection)
-
-manager = ConnectionManager()
+        subscriber = self.connections.pop(websocket, None)
+        if subscriber is None:
+            return
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        if subscriber.writer is not None and subscriber.writer is not current:
+            subscriber.writer.cancel()
+
+    def touch(self, websocket: WebSocket):
+        """Record inbound traffic (pong or any client message)"""
+        subscriber = self.connections.get(websocket)
+        if subscriber is not None:
+            subscriber.last_seen = time.monotonic()
+
+    def send_to(self, websocket: WebSocket, message: dict) -> bool:
+        return self.deliver_to(websocket, serialize(message))
+
+    def deliver_to(self, websocket: WebSocket, text: str) -> bool:
+        subscriber = self.connections.get(websocket)
+        return subscriber is not None and self._enqueue(subscriber, text)
+
+    async def broadcast(self, message: dict) -> None:
+        """Serialize once and deliver to subscribers on every worker"""
+        self.broadcasts += 1
+        text = serialize(message)
+        if self.broker is not None:
+            await self.broker.publish(STATUS_CHANNEL, text)
+        else:
+            self.deliver(text)
+
+    async def broadcast_local(self, message: dict) -> None:
+        """
+        Deliver to this worker's subscribers only, for messages every
+        worker produces on its own (schedule transitions)
+        """
+        self.broadcasts += 1
+        self.deliver(serialize(message))
+
+    def deliver(self, text: str) -> int:
+        """Enqueue an already-serialized message for this worker's subscribers"""
+        delivered = 0
+        for subscriber in list(self.connections.values()):
+            if self._enqueue(subscriber, text):
+                delivered += 1
+        return delivered
+
+    def _enqueue(self, subscriber: Subscriber, text: str) -> bool:
+        try:
+            subscriber.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            self.evicted_slow += 1
+            self._evict(subscriber, CLOSE_POLICY_VIOLATION)
+            return False
+
+    def _evict(self, subscriber: Subscriber, code: int):
+        if self.connections.get(subscriber.websocket) is not subscriber:
+            return
+        self.disconnect(subscriber.websocket)
+        asyncio.get_running_loop().create_task(self._close(subscriber.websocket, code))
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), self.send_timeout)
+        except Exception:
+            pass
+
+    async def _writer(self, subscriber: Subscriber):
+        websocket = subscriber.websocket
+        try:
+            while True:
+                if subscriber.queue.empty():
+                    try:
+                        async with asyncio.timeout(self.heartbeat_interval):
+                            text = await subscriber.queue.get()
+                    except TimeoutError:
+                        text = None
+                else:
+                    # Backlog: no timer needed
+                    text = subscriber.queue.get_nowait()
+
+                if text is None:
+                    if self.idle_timeout and time.monotonic() - subscriber.last_seen > self.idle_timeout:
+                        self.evicted_idle += 1
+                        self._evict(subscriber, CLOSE_GOING_AWAY)
+                        return
+                    text = PING_MESSAGE
+
+                try:
+                    # asyncio.timeout, unlike wait_for, doesn't wrap the send in a new task
+                    async with asyncio.timeout(self.send_timeout):
+                        await websocket.send_text(text)
+                except TimeoutError:
+                    self.evicted_slow += 1
+                    self._evict(subscriber, CLOSE_POLICY_VIOLATION)
+                    return
+                subscriber.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Socket already gone; the receive loop will also notice
+            self.disconnect(websocket)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = [subscriber.queue.qsize() for subscriber in self.connections.values()]
+        return {
+            "connections": len(self.connections),
+            "max_connections": self.max_connections,
+            "queued_messages": sum(queued),
+            "max_queue_depth": max(queued, default=0),
+            "broadcasts": self.broadcasts,
+            "refused": self.refused,
+            "evicted_slow": self.evicted_slow,
+            "evicted_idle": self.evicted_idle
+        }
+
+
+manager = ConnectionManager(
+    max_connections=settings.WS_MAX_CONNECTIONS,
+    queue_size=settings.WS_QUEUE_SIZE,
+    send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+    heartbeat_interval=settings.WS_HEARTBEAT_SECONDS,
+    idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS,
+    broker=broker
+)
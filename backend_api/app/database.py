@@ -2,12 +2,25 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.core.sql_telemetry import InstrumentedQueuePool, sql_telemetry
+
+# In-memory SQLite keeps its single-connection pool
+_in_memory = settings.DATABASE_URL in ("sqlite://", "sqlite:///:memory:")
+_pool_args = {} if _in_memory else {
+    "poolclass": InstrumentedQueuePool,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS
+}
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    **_pool_args
 )
+# Per-statement stats, slow-query log, pool wait times
+sql_telemetry.instrument(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -3,13 +3,30 @@
 # PURPOSE: Complete FastAPI application with all routes integrated 
 # ============================================================================ 
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from app.config import settings
-from app.database import engine, Base
+from sqlalchemy.orm import Session
+from app.database import engine, Base, get_db
 from app.core.system_status import get_system_status
+from app.core.http_cache import cached_json
+from app.services.schedule_service import get_schedule_snapshot
+from app.middleware.admission_control import AdmissionControlMiddleware
+from app.middleware.instrumentation import InstrumentationMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.core.password_hasher import password_hasher
+from app.core.schedule_broadcaster import schedule_broadcaster
+from app.core.broker import broker
+from app.core.admin_events import admin_events
+from app.core.events import event_bus
+from app.core.audit_logger import audit
+from app.core.metrics import registry as metrics_registry
+from app.core.tracing import tracer
+from app.core.slow_requests import slow_requests
+from app.core.health import health
+from app.core.event_subscribers import register_subscribers
 
 # Import all route modules
 from app.routes import registration, admin, auth, services, system, invitation, waitlist, upload, monitoring, interest_request
@@ -17,6 +34,9 @@ from app.routes import registration, admin, auth, services, system, invitation,
 # Import all models to ensure they're registered with SQLAlchemy
 from app.models import interest_request as interest_request_model  # noqa: F401
 
+# Audit, metrics, admin stream and email subscribers for domain events
+register_subscribers(event_bus)
+
 # Create all database tables
 try:
     Base.metadata.create_all(bind=engine)
@@ -50,7 +70,10 @@ app = FastAPI(
     debug=settings.DEBUG_MODE
 )
 
-# Configure CORS to allow web and mobile apps to connect
+# Shed load per route class before it reaches the threadpool.
+# Added before CORS so shed responses still carry CORS headers.
+app.add_middleware(AdmissionControlMiddleware)
+
 # Configure CORS to allow web and mobile apps to connect
 app.add_middleware(
     CORSMiddleware,
@@ -58,9 +81,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
-    expose_headers=["X-Total-Count"],
+    expose_headers=["X-Total-Count", "ETag", "Last-Modified"],
 )
 
+# Root span of sampled requests (honours incoming W3C traceparent)
+app.add_middleware(TracingMiddleware)
+
+# Per-route latency, size and status metrics. Added last so it is
+# outermost and also times shed requests and CORS preflights.
+app.add_middleware(InstrumentationMiddleware)
+
 # Mount uploads directory to serve images/audio
 # Ensure the directory exists to avoid startup errors
 import os
@@ -157,7 +187,7 @@ def seed_default_admin():
     """Create default admin user if none exists"""
     from app.database import SessionLocal
     from app.models.admin import Admin
-    from app.core.security import hash_password
+    from app.core.password_hasher import password_hasher
     
     db = SessionLocal()
     try:
@@ -172,7 +202,7 @@ def seed_default_admin():
             username="admin",
             email="admin@system.local",
             full_name="System Administrator",
-            hashed_password=hash_password("Admin@123456"),
+            hashed_password=password_hasher.hash("Admin@123456"),
             is_super_admin=True,
             is_active=True
         )
@@ -209,9 +239,23 @@ async def startup_event():
     print(f"📊 System Status: {status['status'].upper()}")
     print(f"💬 {status['message']}")
     
+    await broker.start()
+    admin_events.start()
+    await event_bus.start()
+    metrics_registry.start()
+    print(f"📨 Message broker: {broker.backend}")
+    
+    if settings.SCHEDULE_BROADCASTER_ENABLED:
+        schedule_broadcaster.start()
+        print("📡 Schedule transition broadcaster started")
+    
     if settings.DEBUG_MODE:
         print("⚠️  DEBUG MODE IS ENABLED")
     
+    # Last: startup probe passes once this has run and the first probes pass
+    health.start()
+    print(f"🩺 Health probes: {', '.join(health.probes)} every {health.interval:g}s")
+    
     print(f"🌐 API Documentation: http://localhost:8000/docs")
     print(f"📖 Alternative Docs: http://localhost:8000/redoc")
     print("=" * 60)
@@ -223,17 +267,20 @@ async def shutdown_event():
     print("\n" + "=" * 60)
     print("🛑 Shutting down Central Auth API...")
     print("💾 Closing database connections...")
+    await health.stop()
+    await schedule_broadcaster.stop()
+    await event_bus.stop()
+    admin_events.stop()
+    await broker.stop()
+    password_hasher.shutdown()
+    audit.close()
+    metrics_registry.stop()
+    tracer.exporter.close()
+    slow_requests.stop()
     print("✅ Shutdown complete")
     print("=" * 60)
 
-# Root endpoint
-@app.get("/", tags=["Root"])
-def root():
-    """
-    Root endpoint - API information
-    """
-    status = get_system_status()
-    
+def _root_info(status: dict) -> dict:
     return {
         "message": f"Welcome to {settings.API_TITLE}",
         "version": settings.API_VERSION,
@@ -246,16 +293,39 @@ def root():
         }
     }
 
+
+def _cached_status_response(request: Request, db: Session, build, salt: str):
+    """Schedule-backed, conditionally cacheable; env-based status if the DB is unavailable"""
+    try:
+        snapshot = get_schedule_snapshot(db)
+    except Exception as e:
+        print(f"Error getting DB status, using legacy: {e}")
+        return build(get_system_status())
+    return cached_json(request, snapshot, lambda now: build(snapshot.status(now, server_time=False)), salt=f"{salt}|{settings.API_VERSION}")
+
+
+# Root endpoint
+@app.get("/", tags=["Root"])
+def root(request: Request, db: Session = Depends(get_db)):
+    """
+    Root endpoint - API information
+    """
+    return _cached_status_response(request, db, _root_info, salt="root")
+
 # Health check endpoint
 @app.get("/health", tags=["Root"])
-def health_check():
+async def health_check():
     """
     Health check endpoint for monitoring
+    Answered from the cached background probes (core/health.py): healthy,
+    degraded or unhealthy. Orchestrators should use /api/monitoring/live,
+    /ready and /startup, which also set the status code
     """
+    readiness = health.readiness()
     return {
-        "status": "healthy",
+        "status": health.status(readiness),
         "api_version": settings.API_VERSION,
-        "system": get_system_status()
+        "failing": readiness["failing"]
     }
 
 # Run the application (for development)
@@ -0,0 +1,154 @@
+"""
+Admission Control Middleware
+
+Per-route-class concurrency limits with bounded waiting queues.
+Requests that would wait longer than their class target are shed early
+with 503 + Retry-After instead of piling up in the shared threadpool.
+
+The QR -> PIN hot path has its own class with the largest share, and the
+other classes are capped well below the threadpool size (40 threads by
+default), so bcrypt logins and admin list/export calls can never occupy
+every worker thread while PIN verification waits behind them.
+"""
+import json
+import time
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.core.concurrency import ConcurrencyGate, GateRejected
+
+
+class RouteClass:
+    """
+    A named group of path prefixes (and exact paths) sharing one
+    concurrency gate; limits come from ADMISSION_<NAME>_LIMIT, _QUEUE
+    and _WAIT_MS unless given
+    """
+
+    def __init__(
+        self,
+        name: str,
+        prefixes: Tuple[str, ...],
+        exact: Tuple[str, ...] = (),
+        limit: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_wait_ms: Optional[int] = None
+    ):
+        key = f"ADMISSION_{name.upper()}"
+        self.name = name
+        self.prefixes = prefixes
+        self.exact = frozenset(exact)
+        self.gate = ConcurrencyGate(
+            name=name,
+            limit=getattr(settings, f"{key}_LIMIT") if limit is None else limit,
+            max_queue=getattr(settings, f"{key}_QUEUE") if max_queue is None else max_queue,
+            max_wait_seconds=(getattr(settings, f"{key}_WAIT_MS") if max_wait_ms is None else max_wait_ms) / 1000
+        )
+
+    def matches(self, path: str) -> bool:
+        return path in self.exact or any(path.startswith(prefix) for prefix in self.prefixes)
+
+
+# Exact paths are matched first, in any class; then prefixes in order, first
+# matching class wins. The last class catches everything else
+route_classes: List[RouteClass] = [
+    # Hot path: QR scan -> PIN verify -> session validation
+    RouteClass(
+        "auth_hot",
+        ("/api/auth/qr/scan", "/api/auth/pin/verify", "/api/auth/validate-session", "/api/auth/logout")
+    ),
+    # QR generation renders PNGs; kept apart so render storms don't block PIN checks
+    RouteClass("auth_generate", ("/api/auth/qr/generate",)),
+    # bcrypt-bound admin login (exact: /api/admin/login-history is a list)
+    RouteClass("admin_login", (), exact=("/api/admin/login",)),
+    # Prometheus scrapes: small, so a slow scrape cannot pile up, and apart
+    # from admin dashboards so exports don't get scrapes shed
+    RouteClass("metrics_scrape", ("/api/monitoring/prometheus",)),
+    # Admin lists, exports and dashboards
+    RouteClass("admin", ("/api/admin", "/api/interest", "/api/waitlist", "/api/monitoring", "/api/upload/list")),
+    # Most-polled, cheap reads (cached schedule snapshot, conditional GET):
+    # their own room, so routine polling is not squeezed into `default`
+    RouteClass(
+        "public_read",
+        ("/api/system/status", "/api/system/operating-hours", "/api/system/health", "/health", "/uploads/"),
+        exact=("/",)
+    ),
+    # Public interest / waitlist forms and status checks share the admin
+    # routers' prefixes but not their class
+    RouteClass(
+        "default",
+        ("/",),
+        exact=("/api/interest/submit", "/api/interest/status", "/api/waitlist/submit", "/api/waitlist/status")
+    ),
+]
+
+
+# Orchestrator probes answer from cached results (core/health.py) and must
+# not queue behind, or be shed with, admin dashboards. The CPU profile
+# mostly sleeps for up to PROFILER_MAX_SECONDS and the profiler runs one
+# at a time, so it is not allowed to hold an admin slot meanwhile
+UNGATED_PATHS = frozenset((
+    "/api/monitoring/live", "/api/monitoring/ready", "/api/monitoring/startup", "/api/monitoring/profile"
+))
+
+
+def classify(path: str) -> RouteClass:
+    for route_class in route_classes:
+        if path in route_class.exact:
+            return route_class
+    for route_class in route_classes:
+        if route_class.matches(path):
+            return route_class
+    return route_classes[-1]
+
+
+def get_admission_stats() -> dict:
+    """Queue depth, in-flight and shed counters for every route class"""
+    return {route_class.name: route_class.gate.stats() for route_class in route_classes}
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware applying the route-class gates to HTTP requests.
+    WebSocket and lifespan traffic passes through untouched.
+    """
+
+    def __init__(self, app, enabled: Optional[bool] = None):
+        self.app = app
+        self.enabled = settings.ADMISSION_CONTROL_ENABLED if enabled is None else enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope["path"] in UNGATED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        gate = classify(scope["path"]).gate
+        try:
+            await gate.acquire()
+        except GateRejected as rejection:
+            await self._shed(send, gate, rejection)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release(time.monotonic() - started)
+
+    async def _shed(self, send, gate: ConcurrencyGate, rejection: GateRejected) -> None:
+        body = json.dumps({
+            "detail": "Server is busy. Please retry shortly.",
+            "route_class": gate.name,
+            "reason": rejection.reason
+        }).encode("utf-8")
+
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(rejection.retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,293 @@
+"""
+Request Instrumentation Middleware
+
+Pure ASGI middleware recording, per route template and method:
+
+    http_request_duration_seconds   latency histogram
+    http_response_size_bytes        response body size histogram
+    http_requests_total             requests by status code
+    http_requests_in_flight         requests currently being handled
+    http_request_db_queries         SQL statements per request (core/query_budget.py)
+    http_request_db_seconds         database time per request
+
+Series are labelled with the route template ("/api/waitlist/{request_id}"),
+never the raw path, so label cardinality is bounded by the route table.
+
+The template is resolved before the request runs (the in-flight gauge
+needs it up front): static paths are one dict lookup, and only paths
+that miss fall back to the parameterised routes' regexes, tried in the
+router's own order, and the result is remembered in a bounded cache.
+The template is left in the scope, where the tracing middleware picks
+it up instead of resolving the path again.
+
+Each (method, route) pair gets its series bound once (preallocated
+bucket arrays); after that a request costs two clock reads, a dict
+lookup and a handful of list increments.
+
+Requests running past their slow-request threshold are captured with
+stack samples by the watchdog (core/slow_requests.py).
+
+In DEBUG_MODE responses also carry X-DB-Queries, X-DB-Rows and
+X-DB-Time-Ms. Requests running more than REQUEST_QUERY_BUDGET statements
+are logged with their most repeated statement.
+"""
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.routing import Mount
+
+from app.config import settings
+from app.core import query_budget
+from app.core.slow_requests import slow_requests
+from app.core.metrics import LABEL_SEPARATOR, registry, histogram_quantile
+
+logger = logging.getLogger("app.sql")
+
+UNMATCHED = "unmatched"
+# Parameterised/unknown paths remembered after their first resolution
+RESOLVED_CACHE_SIZE = 4096
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS, single_writer=True
+)
+response_size = registry.histogram(
+    "http_response_size_bytes", "HTTP response body size by route template",
+    ["method", "route"], buckets=SIZE_BUCKETS, single_writer=True
+)
+requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code",
+    ["method", "route", "status"], single_writer=True
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled",
+    ["method", "route"], single_writer=True
+)
+request_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS, single_writer=True
+)
+request_db_time = registry.histogram(
+    "http_request_db_seconds", "Database time per HTTP request",
+    ["method", "route"], buckets=LATENCY_BUCKETS, single_writer=True
+)
+query_budget_exceeded = registry.counter(
+    "http_request_query_budget_exceeded_total", "Requests that ran more than REQUEST_QUERY_BUDGET statements",
+    ["method", "route"], single_writer=True
+)
+
+
+class RouteTable:
+    """Maps a request path to its route template, matching like the router"""
+
+    def __init__(self, routes: List[Any]):
+        self.size = len(routes)
+        self.static: Dict[str, str] = {}
+        # (literal prefix, compiled regex, template) for routes with path
+        # parameters, in router order; the prefix check skips most regexes
+        self.dynamic: List[Tuple[str, Any, str]] = []
+        self.resolved: Dict[str, str] = {}
+
+        for route in routes:
+            path = getattr(route, "path", None)
+            regex = getattr(route, "path_regex", None)
+            if path is None or regex is None:
+                continue
+            if isinstance(route, Mount):
+                self.dynamic.append((path + "/", regex, path + "/{path}"))
+            elif "{" in path:
+                self.dynamic.append((path[:path.index("{")], regex, path))
+            elif path not in self.static and not any(r.match(path) for _, r, _ in self.dynamic):
+                # Static route not shadowed by an earlier parameterised one
+                self.static[path] = path
+
+    def resolve(self, path: str) -> str:
+        template = self.static.get(path) or self.resolved.get(path)
+        if template is not None:
+            return template
+        template = UNMATCHED
+        for prefix, regex, candidate in self.dynamic:
+            if path.startswith(prefix) and regex.match(path):
+                template = candidate
+                break
+        if len(self.resolved) >= RESOLVED_CACHE_SIZE:
+            self.resolved.clear()
+        self.resolved[path] = template
+        return template
+
+
+# Set on the scope by the outermost middleware that resolves the route,
+# so the middleware inside it (tracing) reuses the template
+ROUTE_SCOPE_KEY = "route_template"
+
+_route_table: Optional[RouteTable] = None
+
+
+def resolve_route(scope) -> str:
+    """Route template of an HTTP scope, resolved once per request in one shared table"""
+    global _route_table
+    route = scope.get(ROUTE_SCOPE_KEY)
+    if route is not None:
+        return route
+    routes = getattr(scope.get("app"), "routes", None)
+    if routes is None:
+        return UNMATCHED
+    table = _route_table
+    if table is None or table.size != len(routes):
+        table = _route_table = RouteTable(routes)
+    route = scope[ROUTE_SCOPE_KEY] = table.resolve(scope["path"])
+    return route
+
+
+class RouteSeries:
+    """Preallocated series for one (method, route) pair"""
+    __slots__ = ("method", "route", "duration", "size", "in_flight", "queries", "db_time", "statuses")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.duration = request_duration.labels(method=method, route=route)
+        self.size = response_size.labels(method=method, route=route)
+        self.in_flight = requests_in_flight.labels(method=method, route=route)
+        self.queries = request_queries.labels(method=method, route=route)
+        self.db_time = request_db_time.labels(method=method, route=route)
+        self.statuses: Dict[int, Any] = {}
+
+    def status(self, code: int):
+        counter = self.statuses.get(code)
+        if counter is None:
+            counter = self.statuses[code] = requests_total.labels(
+                method=self.method, route=self.route, status=code
+            )
+        return counter
+
+
+class InstrumentationMiddleware:
+    """
+    Pure ASGI middleware; add it last so it is outermost and also times
+    admission-control sheds and CORS preflights.
+    WebSocket and lifespan traffic passes through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        enabled: Optional[bool] = None,
+        query_headers: Optional[bool] = None,
+        query_budget: Optional[int] = None
+    ):
+        self.app = app
+        self.enabled = settings.HTTP_METRICS_ENABLED if enabled is None else enabled
+        self.query_headers = settings.DEBUG_MODE if query_headers is None else query_headers
+        self.query_budget = settings.REQUEST_QUERY_BUDGET if query_budget is None else query_budget
+        self._series: Dict[Tuple[str, str], RouteSeries] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method not in METHODS:
+            method = "OTHER"
+        route = resolve_route(scope)
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = RouteSeries(method, route)
+
+        status = 500
+        size = 0
+        query_headers = self.query_headers
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if query_headers:
+                    message = {**message, "headers": list(message.get("headers", [])) + _usage_headers(usage)}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        series.in_flight.inc()
+        usage, token = query_budget.begin()
+        record, record_token = slow_requests.begin(method, route, scope["path"])
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            series.duration.observe(time.perf_counter() - started)
+            slow_requests.end(record, record_token, status, usage)
+            query_budget.end(token)
+            series.in_flight.dec()
+            series.size.observe(size)
+            series.status(status).inc()
+            self._account(series, usage)
+
+    def _account(self, series: RouteSeries, usage: query_budget.QueryUsage) -> None:
+        series.queries.observe(usage.queries)
+        series.db_time.observe(usage.db_time)
+        if self.query_budget and usage.queries > self.query_budget:
+            query_budget_exceeded.labels(method=series.method, route=series.route).inc()
+            repeated = usage.top_repeated(1)
+            logger.warning(
+                f"{series.method} {series.route} ran {usage.queries} queries "
+                f"(budget {self.query_budget}, {usage.db_time * 1000:.1f} ms)"
+                + (f"; repeated {repeated[0][1]}x: {repeated[0][0]}" if repeated else "")
+            )
+        query_budget.request_finished(series.method, series.route, usage)
+
+
+def _usage_headers(usage: query_budget.QueryUsage) -> List[Tuple[bytes, bytes]]:
+    return [
+        (b"x-db-queries", str(usage.queries).encode("latin-1")),
+        (b"x-db-rows", str(usage.rows).encode("latin-1")),
+        (b"x-db-time-ms", f"{usage.db_time * 1000:.2f}".encode("latin-1")),
+    ]
+
+
+def get_http_stats() -> Dict[str, Any]:
+    """Per-route request counts, latency percentiles, queries, status codes and in-flight (all workers)"""
+    merged = registry.collect()
+    durations = merged["http_request_duration_seconds"]["series"]
+    sizes = merged["http_response_size_bytes"]["series"]
+    in_flight = merged["http_requests_in_flight"]["series"]
+    queries = merged["http_request_db_queries"]["series"]
+    db_time = merged["http_request_db_seconds"]["series"]
+
+    statuses: Dict[str, Dict[str, int]] = {}
+    for key, count in merged["http_requests_total"]["series"].items():
+        method, route, status = key.split(LABEL_SEPARATOR)
+        statuses.setdefault(LABEL_SEPARATOR.join((method, route)), {})[status] = int(count)
+
+    routes = {}
+    for key, value in sorted(durations.items()):
+        method, route = key.split(LABEL_SEPARATOR)
+        counts = value["counts"]
+        size = sizes.get(key, {"sum": 0.0, "count": 0})
+        query_count = queries.get(key, {"sum": 0.0, "count": 0})
+        db_seconds = db_time.get(key, {"sum": 0.0, "count": 0})
+
+        def quantile_ms(q: float) -> Optional[float]:
+            seconds = histogram_quantile(LATENCY_BUCKETS, counts, q)
+            return round(seconds * 1000, 2) if seconds is not None else None
+
+        routes[f"{method} {route}"] = {
+            "count": value["count"],
+            "in_flight": int(in_flight.get(key, 0)),
+            "mean_ms": round(value["sum"] / value["count"] * 1000, 2) if value["count"] else 0.0,
+            "p50_ms": quantile_ms(0.5),
+            "p95_ms": quantile_ms(0.95),
+            "p99_ms": quantile_ms(0.99),
+            "mean_bytes": round(size["sum"] / size["count"]) if size["count"] else 0,
+            "mean_queries": round(query_count["sum"] / query_count["count"], 2) if query_count["count"] else 0.0,
+            "mean_db_ms": round(db_seconds["sum"] / db_seconds["count"] * 1000, 2) if db_seconds["count"] else 0.0,
+            "status": statuses.get(key, {})
+        }
+    return routes
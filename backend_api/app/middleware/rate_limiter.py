@@ -4,12 +4,25 @@ from datetime import datetime, timedelta
 import asyncio
 from typing import Dict, List
 from app.core.audit_logger import audit, AuditEventType
+from app.core.heavy_hitters import heavy_hitters
+from app.core.admin_events import admin_events, AdminEventType
+from app.core.metrics import rate_limit_decisions
+from app.core.tracing import tracer
+
+# Every limiter instance, for get_rate_limiter_stats()
+rate_limiters: List["RateLimiter"] = []
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, int]]:
+    return {limiter.name: limiter.stats() for limiter in rate_limiters}
+
 
 class RateLimiter:
     """
     Enhanced Rate Limiter with Temporary IP Blocking
     """
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60, block_duration_seconds: int = 300):
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60, block_duration_seconds: int = 300, name: str = "default"):
+        self.name = name
         self.max_requests = max_requests
         self.window_seconds = window_seconds
         self.block_duration = block_duration_seconds
@@ -17,6 +30,17 @@ class RateLimiter:
         self.requests: Dict[str, List[datetime]] = defaultdict(list)
         self.blocked_ips: Dict[str, datetime] = {}  # IP -> unblock_time
         self._lock = asyncio.Lock()
+        rate_limiters.append(self)
+    
+    def stats(self) -> Dict[str, int]:
+        """Sizes of the per-IP tables (memory diagnostics)"""
+        return {
+            "tracked_ips": len(self.requests),
+            # IPs whose window emptied but whose key was never removed
+            "empty_ips": sum(1 for timestamps in list(self.requests.values()) if not timestamps),
+            "timestamps": sum(len(timestamps) for timestamps in list(self.requests.values())),
+            "blocked_ips": len(self.blocked_ips)
+        }
     
     async def check_rate_limit(self, request: Request):
         try:
@@ -26,6 +50,10 @@ class RateLimiter:
             
         now = datetime.utcnow()
         
+        with tracer.span("rate_limiter.check", limiter=self.name):
+            await self._check(request, client_ip, now)
+
+    async def _check(self, request: Request, client_ip: str, now: datetime):
         async with self._lock:
             # 1. Check if IP is currently blocked
             if client_ip in self.blocked_ips:
@@ -35,6 +63,7 @@ class RateLimiter:
                     
                     # Log attempt during block (optional, maybe too noisy?)
                     # audit.log(AuditEventType.RATE_LIMIT, success=False, ip_address=client_ip, details={"status": "already_blocked"})
+                    rate_limit_decisions.inc(limiter=self.name, decision="blocked")
                     
                     raise HTTPException(
                         status_code=429,
@@ -73,6 +102,14 @@ class RateLimiter:
                         "duration": self.block_duration
                     }
                 )
+                heavy_hitters.record("rate_limited", ip=client_ip)
+                rate_limit_decisions.inc(limiter=self.name, decision="limited")
+                admin_events.emit(
+                    AdminEventType.RATE_LIMITED,
+                    ip=client_ip,
+                    path=request.url.path,
+                    blocked_seconds=self.block_duration
+                )
                 
                 raise HTTPException(
                     status_code=429,
@@ -81,14 +118,15 @@ class RateLimiter:
             
             # 4. Record this request
             self.requests[client_ip].append(now)
+            rate_limit_decisions.inc(limiter=self.name, decision="allowed")
 
 # Create instances optimized for different endpoints
 # Login: Strict (5 attempts / min) -> 5 mins block
-login_rate_limiter = RateLimiter(max_requests=5, window_seconds=60, block_duration_seconds=300)
+login_rate_limiter = RateLimiter(max_requests=5, window_seconds=60, block_duration_seconds=300, name="login")
 
 # Register: Very Strict (3 attempts / 5 mins) -> 15 mins block
-register_rate_limiter = RateLimiter(max_requests=3, window_seconds=300, block_duration_seconds=900)
+register_rate_limiter = RateLimiter(max_requests=3, window_seconds=300, block_duration_seconds=900, name="register")
 
 # QR Gen: Moderate (20 / min) - Services usually call this, might need higher if shared IP
 # But specific service IPs should be whitelistable eventually. For now, 20/min per IP is reasonable.
-qr_rate_limiter = RateLimiter(max_requests=20, window_seconds=60, block_duration_seconds=300)
+qr_rate_limiter = RateLimiter(max_requests=20, window_seconds=60, block_duration_seconds=300, name="qr")
@@ -0,0 +1,53 @@
+"""
+Tracing Middleware
+
+Pure ASGI middleware opening the root span of each sampled HTTP request
+(core/tracing.py). The span is named after the route template, like the
+instrumentation metrics, and the response carries a `traceresponse`
+header so the calling service can find the trace.
+
+Unsampled requests pay one header scan and one random() call.
+"""
+from typing import Optional
+
+from app.core.tracing import Tracer, tracer as default_tracer
+from app.middleware.instrumentation import METHODS, resolve_route
+
+
+class TracingMiddleware:
+    def __init__(self, app, tracer: Optional[Tracer] = None):
+        self.app = app
+        self.tracer = tracer or default_tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        root = self.tracer.start_trace(method, traceparent)
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Usually already resolved by InstrumentationMiddleware
+        route = resolve_route(scope)
+        root.name = f"{method if method in METHODS else 'OTHER'} {route}"
+        root.set("http.method", method)
+        root.set("http.route", route)
+        header = (b"traceresponse", root.traceparent().encode("latin-1"))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                message = {**message, "headers": list(message.get("headers", [])) + [header]}
+            await send(message)
+
+        with root:
+            await self.app(scope, receive, send_wrapper)
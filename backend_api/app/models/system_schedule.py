@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -19,6 +19,11 @@ class SystemSchedule(Base):
     warning_minutes = Column(Integer, nullable=False, default=15)
     timezone = Column(String, nullable=False, default="UTC")
     
+    # Weekly windows {"mon": [["09:00", "17:00"]], ...}; NULL = same hours every day
+    weekly_windows = Column(JSON, nullable=True)
+    # Date exceptions {"2026-12-25": []} replacing that day's windows
+    exceptions = Column(JSON, nullable=True)
+    
     # Manual override settings
     is_manually_overridden = Column(Boolean, default=False)
     manual_status = Column(String, nullable=True)  # 'open' or 'closed'
@@ -44,6 +49,8 @@ class SystemSchedule(Base):
             "closing_time": f"{self.closing_hour:02d}:{self.closing_minute:02d}",
             "warning_minutes_before_close": self.warning_minutes,
             "timezone": self.timezone,
+            "weekly_windows": self.weekly_windows,
+            "exceptions": self.exceptions,
             "is_manually_overridden": self.is_manually_overridden,
             "manual_status": self.manual_status,
             "override_reason": self.override_reason,
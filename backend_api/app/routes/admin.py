@@ -1,3 +1,5 @@
+import json
+import os
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -5,27 +7,36 @@ from typing import List, Optional
 from app.database import get_db
 from app.schemas.user import PendingUserResponse, UserResponse
 from app.schemas.admin import ApprovalRequest, RejectionRequest, LoginHistoryResponse, AdminLogin
-from app.services import registration_service, admin_service, notification_service
+from app.services import registration_service, admin_service
 from app.models.active_user import ActiveUser
 from app.core.security import create_access_token
 from app.core.dependencies import get_current_admin
 from app.models.admin import Admin
 from app.core.websocket_manager import manager
+from app.core.password_hasher import HashingBusy
+from app.core.events import event_bus, UserApproved, UserInfoRequested
 
 router = APIRouter()
 
 from app.middleware.rate_limiter import login_rate_limiter
 
 @router.post("/login", dependencies=[Depends(login_rate_limiter.check_rate_limit)])
-def login(credentials: AdminLogin, db: Session = Depends(get_db)):
+async def login(credentials: AdminLogin, db: Session = Depends(get_db)):
     """
     Authenticate admin and return access token
     """
-    admin = admin_service.authenticate_admin(
-        username=credentials.username,
-        password=credentials.password,
-        db=db
-    )
+    try:
+        admin = await admin_service.authenticate_admin(
+            username=credentials.username,
+            password=credentials.password,
+            db=db
+        )
+    except HashingBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     
     if not admin:
         raise HTTPException(
@@ -128,11 +139,12 @@ async def approve_user(
             db=db
         )
         
-        # Send approval notification to user
-        await notification_service.notify_user_approval(
-            email=active_user.email,
-            username=active_user.username
-        )
+        # Approval email goes out off the request path
+        event_bus.publish(UserApproved(
+            user_id=active_user.id,
+            username=active_user.username,
+            email=active_user.email
+        ))
         
         return active_user
         
@@ -199,21 +211,12 @@ async def request_info(
         )
         
         # Send email to user
-        subject = "Action Required: Additional Information Needed for Registration"
-        message = f"""
-        <h2>Hello {pending_user.username},</h2>
-        <p>We are reviewing your registration. The administrator has requested the following information:</p>
-        <blockquote style="background-color: #f9f9f9; padding: 10px; border-left: 5px solid #ccc;">
-            {request.question}
-        </blockquote>
-        <p>Please reply to this email or contact support with the requested details.</p>
-        """
-        
-        await notification_service.send_user_notification(
+        event_bus.publish(UserInfoRequested(
+            pending_user_id=pending_user.id,
+            username=pending_user.username,
             email=pending_user.email,
-            subject=subject,
-            message=message
-        )
+            question=request.question
+        ))
         
         return {
             "success": True,
@@ -301,6 +304,7 @@ def get_all_users(
 from app.services import schedule_service
 from app.schemas.schedule import (
     OperatingHoursUpdate, 
+    WeeklyScheduleUpdate,
     SystemToggleRequest, 
     ScheduleResponse,
     ScheduleAuditResponse
@@ -356,6 +360,55 @@ async def update_operating_hours(
         )
 
 
+@router.put("/system/weekly-schedule", response_model=ScheduleResponse)
+async def update_weekly_schedule(
+    schedule_update: WeeklyScheduleUpdate,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Set per-weekday opening windows and date exceptions (holidays)
+    
+    Times are local to the given timezone. Only super admins can modify
+    the system schedule; all changes are logged in the audit trail.
+    Use PUT /system/operating-hours to return to a single daily window.
+    """
+    if not current_admin.is_super_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only super admins can modify the system schedule"
+        )
+    
+    def as_pairs(windows):
+        return [[window.start, window.end] for window in windows]
+    
+    try:
+        updated_schedule = schedule_service.update_weekly_schedule(
+            db=db,
+            weekly_windows={day: as_pairs(windows) for day, windows in schedule_update.weekly_windows.items()},
+            exceptions={day: as_pairs(windows) for day, windows in schedule_update.exceptions.items()},
+            warning_minutes=schedule_update.warning_minutes,
+            admin_id=current_admin.id,
+            timezone=schedule_update.timezone
+        )
+        
+        # Broadcast new status to all connected clients
+        await manager.broadcast(schedule_service.get_system_status(db))
+        
+        return ScheduleResponse(**updated_schedule.to_dict())
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update weekly schedule: {str(e)}"
+        )
+
+
 @router.post("/system/toggle", response_model=ScheduleResponse)
 async def toggle_system_status(
     toggle_request: SystemToggleRequest,
@@ -459,4 +512,259 @@ def get_schedule_audit_log(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve audit log: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+# ============================================================================
+# SECURITY MONITORING ENDPOINTS
+# ============================================================================
+
+from app.core.heavy_hitters import heavy_hitters
+
+
+@router.get("/security/top-offenders")
+def get_top_offenders(
+    event: Optional[str] = None,
+    dimension: Optional[str] = None,
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Get current top offenders across auth abuse streams
+    
+    Streams are QR generations, QR scans, PIN failures, registration
+    attempts and rate-limit blocks, keyed by IP, auth key or service ID.
+    Scores are time-decayed estimates from a count-min sketch.
+    """
+    if dimension and dimension not in heavy_hitters.DIMENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Dimension must be one of: {', '.join(heavy_hitters.DIMENSIONS)}"
+        )
+    
+    if event and dimension:
+        return {event: {dimension: heavy_hitters.top(event, dimension)}}
+    
+    snapshot = heavy_hitters.snapshot()
+    if event:
+        snapshot = {event: snapshot.get(event, {})}
+    if dimension:
+        snapshot = {
+            name: {dimension: streams.get(dimension, [])}
+            for name, streams in snapshot.items()
+        }
+    return snapshot
+
+
+from datetime import datetime, timedelta
+from fastapi import Query
+from app.core.audit_index import audit_search
+from app.core.audit_logger import audit
+
+
+@router.get("/security/audit")
+def search_audit_log(
+    event: Optional[str] = None,
+    ip: Optional[str] = None,
+    user_id: Optional[int] = None,
+    success: Optional[bool] = None,
+    hours: Optional[float] = Query(24, gt=0, le=24 * 90),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Search the security audit log, newest first
+
+    e.g. PIN failures for one IP in the last 6 hours:
+    ?event=pin_verified&success=false&ip=10.0.0.7&hours=6
+
+    `since` (UTC) overrides `hours`. Rotated segments are searched through
+    their block index; the response's `scan` shows how much was read.
+    """
+    if since is None:
+        since = datetime.utcnow() - timedelta(hours=hours)
+    # Include records still queued in the writer
+    audit.flush(timeout=1.0)
+    return audit_search.search(
+        event=event,
+        ip=ip,
+        user_id=user_id,
+        success=success,
+        since=since,
+        until=until,
+        limit=limit
+    )
+
+
+# ============================================================================
+# DATABASE TELEMETRY
+# ============================================================================
+
+from app.core.sql_telemetry import sql_telemetry
+
+
+@router.get("/database/statements")
+def get_top_statements(
+    order: str = Query("total", pattern="^(total|mean|max|count|errors)$"),
+    limit: int = Query(20, ge=1, le=200),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Top SQL statements of this worker, by total time by default
+
+    Statements are normalised (literals collapsed); the slow-query log
+    shows bound parameters as type and length only.
+    """
+    return {
+        "order": order,
+        "statements": sql_telemetry.top_statements(limit, order),
+        "slow_queries": sql_telemetry.slow_log(),
+        "pool": sql_telemetry.pool_stats()
+    }
+
+
+# ============================================================================
+# SLOW REQUESTS
+# ============================================================================
+
+from app.core.slow_requests import slow_requests
+
+
+@router.get("/slow-requests")
+def list_slow_requests(
+    route: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Recent requests of this worker that ran past their slow-request
+    threshold, newest first (samples and statements via /slow-requests/{id})
+    """
+    return {
+        "watchdog": slow_requests.stats(),
+        "captures": slow_requests.captures(route, limit)
+    }
+
+
+@router.get("/slow-requests/{capture_id}")
+def get_slow_request(capture_id: str, current_admin: Admin = Depends(get_current_admin)):
+    """
+    One capture: request metadata, statements run and the stack samples
+    taken while it was running. Ids are "<pid>-<n>"; only the worker with
+    that pid holds the capture, others answer 404
+    """
+    pid = capture_id.partition("-")[0]
+    if pid != str(os.getpid()):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Slow request capture {capture_id} belongs to worker {pid}; this is worker {os.getpid()}"
+        )
+    capture = slow_requests.capture(capture_id)
+    if capture is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow request capture not found (evicted from this worker's buffer)"
+        )
+    return capture
+
+
+# ============================================================================
+# ADMIN EVENT STREAM
+# ============================================================================
+
+from fastapi import WebSocket, WebSocketDisconnect
+from app.core.admin_events import admin_events
+from app.core.dependencies import get_admin_from_token
+from app.core.executors import run_in
+from app.core.websocket_manager import CLOSE_POLICY_VIOLATION
+from app.database import SessionLocal
+from app.config import settings
+
+# Browsers cannot set headers on WebSocket requests, so the admin JWT
+# travels as the second subprotocol: new WebSocket(url, ["bearer", jwt]).
+# Unlike ?token=, the header is not written to uvicorn / nginx access logs
+BEARER_SUBPROTOCOL = "bearer"
+
+
+def _ws_bearer_token(websocket: WebSocket) -> Optional[str]:
+    protocols = [protocol.strip() for protocol in websocket.headers.get("sec-websocket-protocol", "").split(",")]
+    if len(protocols) == 2 and protocols[0] == BEARER_SUBPROTOCOL:
+        return protocols[1]
+    return None
+
+
+def _authenticate_ws_admin(token: Optional[str]) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        admin = get_admin_from_token(token, db)
+        return admin.id if admin else None
+    finally:
+        db.close()
+
+
+@router.get("/events")
+def get_admin_events(
+    since: Optional[str] = None,
+    limit: int = 100,
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Get admin events after a cursor (oldest first)
+    
+    Use the last cursor you saw as `since` to fetch only what you missed.
+    `truncated` means events may have been missed (dropped from the
+    buffer, or older than this worker); reload the affected lists in
+    that case.
+    """
+    events, truncated = admin_events.since(since, min(max(limit, 1), 1000))
+    parsed = [json.loads(event) for event in events]
+    return {
+        "events": parsed,
+        "cursor": parsed[-1]["cursor"] if parsed else since,
+        "truncated": truncated
+    }
+
+
+@router.websocket("/events/ws")
+async def admin_events_ws(websocket: WebSocket, cursor: Optional[str] = None):
+    """
+    Live admin event feed
+    
+    Connect with ?cursor=<last cursor seen> and the subprotocols
+    ["bearer", <admin JWT>]; the token is not accepted in the URL, which
+    would put it in access logs. Missed
+    events are replayed first, then new ones are pushed as they happen:
+    registration.created, interest.created, waitlist.created,
+    login.succeeded, login.failed, security.lockout,
+    security.rate_limited and schedule.changed.
+    If more was missed than can be replayed, a {"type": "resync"}
+    message asks the client to use GET /events instead.
+    """
+    token = _ws_bearer_token(websocket)
+    admin_id = await run_in("db", _authenticate_ws_admin, token) if token else None
+    if admin_id is None:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+    
+    stream = admin_events.subscribers
+    if not await stream.connect(websocket, subprotocol=BEARER_SUBPROTOCOL):
+        return
+    try:
+        # No await between connect() and replay: nothing can slip in between
+        replay_limit = settings.ADMIN_EVENTS_QUEUE_SIZE // 2
+        missed, truncated = admin_events.since(cursor, replay_limit + 1) if cursor else ([], False)
+        if truncated or len(missed) > replay_limit:
+            stream.send_to(websocket, {"type": "resync", "cursor": cursor})
+        else:
+            for event in missed:
+                stream.deliver_to(websocket, event)
+        
+        while True:
+            message = await websocket.receive_text()
+            stream.touch(websocket)
+            if message == "ping":
+                stream.send_to(websocket, {"type": "pong"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream.disconnect(websocket)
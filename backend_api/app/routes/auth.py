@@ -9,12 +9,14 @@ from app.schemas.auth import (
 from app.services import qr_service, pin_service, session_service
 from app.core.system_status import is_system_open, get_system_status
 from app.middleware.rate_limiter import qr_rate_limiter, login_rate_limiter
-from app.core.audit_logger import audit, AuditEventType, detect_suspicious_patterns
+from app.core.events import event_bus, QRGenerated, QRScanned, PinVerified, LoggedOut
+from app.core.executors import run_in
+from app.utils.qr_generator import create_qr_image
 
 router = APIRouter()
 
 @router.post("/qr/generate", response_model=QRGenerateResponse, dependencies=[Depends(qr_rate_limiter.check_rate_limit)])
-def generate_qr_code(
+async def generate_qr_code(
     payload: QRGenerateRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -26,49 +28,51 @@ def generate_qr_code(
     Returns QR code image and token
     """
     # Check if system is open
-    if not is_system_open(db):
+    if not await run_in("db", is_system_open, db):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Authentication service is currently closed"
         )
     
     try:
-        qr_data = qr_service.generate_qr_session(
+        qr_data = await run_in(
+            "db",
+            qr_service.generate_qr_session,
             service_id=payload.service_id,
             service_api_key=payload.service_api_key,
             db=db,
-            client_ip=request.client.host
+            client_ip=request.client.host,
+            render_image=False
         )
+        qr_image = await run_in("render", create_qr_image, qr_data["qr_pattern"])
         
-        audit.log(
-            AuditEventType.QR_GENERATED,
-            success=True,
+        event_bus.publish(QRGenerated(
+            ip=request.client.host,
             service_id=payload.service_id,
-            ip_address=request.client.host,
-            details={"token": qr_data["token"]}
-        )
+            success=True,
+            token=qr_data["token"]
+        ))
         
         return QRGenerateResponse(
             qr_token=qr_data["token"],
-            qr_image=qr_data["qr_image"],
+            qr_image=qr_image,
             expires_in_seconds=qr_data["expires_in_seconds"]
         )
         
     except ValueError as e:
-        audit.log(
-            AuditEventType.QR_GENERATED,
-            success=False,
+        event_bus.publish(QRGenerated(
+            ip=request.client.host,
             service_id=payload.service_id,
-            ip_address=request.client.host,
-            details={"error": str(e)}
-        )
+            success=False,
+            error=str(e)
+        ))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e)
         )
 
 @router.post("/qr/scan", response_model=QRScanResponse, dependencies=[Depends(qr_rate_limiter.check_rate_limit)])
-def scan_qr_code(
+async def scan_qr_code(
     payload: QRScanRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -80,14 +84,16 @@ def scan_qr_code(
     Returns PIN that user must enter on ServiceB.com
     """
     # Check if system is open
-    if not is_system_open(db):
+    if not await run_in("db", is_system_open, db):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Authentication service is currently closed"
         )
     
     try:
-        result = qr_service.process_qr_scan(
+        result = await run_in(
+            "db",
+            qr_service.process_qr_scan,
             qr_token=payload.qr_token,
             user_auth_key=payload.user_auth_key,
             db=db,
@@ -95,15 +101,12 @@ def scan_qr_code(
             device_info=payload.device_info
         )
         
-        audit.log(
-            AuditEventType.QR_SCANNED,
+        event_bus.publish(QRScanned(
+            ip=request.client.host,
+            auth_key=payload.user_auth_key,
             success=True,
-            ip_address=request.client.host,
-            details={
-                "auth_key": payload.user_auth_key, 
-                "device_info": payload.device_info
-            }
-        )
+            device_info=payload.device_info
+        ))
         
         return QRScanResponse(
             success=result["success"],
@@ -112,19 +115,19 @@ def scan_qr_code(
         )
         
     except ValueError as e:
-        audit.log(
-            AuditEventType.QR_SCANNED,
+        event_bus.publish(QRScanned(
+            ip=request.client.host,
+            auth_key=payload.user_auth_key,
             success=False,
-            ip_address=request.client.host,
-            details={"error": str(e), "auth_key": payload.user_auth_key}
-        )
+            error=str(e)
+        ))
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
 @router.post("/pin/verify", response_model=PINVerifyResponse, dependencies=[Depends(login_rate_limiter.check_rate_limit)])
-def verify_pin(
+async def verify_pin(
     payload: PINVerifyRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -136,14 +139,16 @@ def verify_pin(
     Returns session token valid for 30 minutes
     """
     # Check if system is open
-    if not is_system_open(db):
+    if not await run_in("db", is_system_open, db):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Authentication service is currently closed"
         )
     
     try:
-        result = pin_service.verify_pin_and_create_session(
+        result = await run_in(
+            "db",
+            pin_service.verify_pin_and_create_session,
             qr_token=payload.qr_token,
             pin=payload.pin,
             db=db,
@@ -151,13 +156,12 @@ def verify_pin(
         )
         
         user_info = result.get("user_info", {})
-        audit.log(
-            AuditEventType.PIN_VERIFIED,
+        event_bus.publish(PinVerified(
+            ip=request.client.host,
+            qr_token=payload.qr_token,
             success=True,
-            ip_address=request.client.host,
-            user_id=user_info.get("user_id"),
-            details={"qr_token": payload.qr_token}
-        )
+            user_id=user_info.get("user_id")
+        ))
         
         return PINVerifyResponse(
             success=result["success"],
@@ -167,15 +171,14 @@ def verify_pin(
         )
         
     except ValueError as e:
-        audit.log(
-            AuditEventType.PIN_VERIFIED,
+        # Audit, abuse counters and the GAP-M03 suspicious-pattern check
+        # run as event subscribers, off the response path
+        event_bus.publish(PinVerified(
+            ip=request.client.host,
+            qr_token=payload.qr_token,
             success=False,
-            ip_address=request.client.host,
-            details={"error": str(e), "qr_token": payload.qr_token}
-        )
-        
-        # GAP-M03: Check for suspicious patterns on failure
-        detect_suspicious_patterns(request.client.host, db)
+            error=str(e)
+        ))
         
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -205,11 +208,7 @@ def logout(token: str, request: Request, db: Session = Depends(get_db)):
     """
     try:
         success = session_service.logout_session(token, db)
-        audit.log(
-             AuditEventType.LOGOUT,
-             success=True,
-             ip_address=request.client.host
-        )
+        event_bus.publish(LoggedOut(ip=request.client.host))
         return {"success": success, "message": "Logged out successfully"}
     except ValueError as e:
         raise HTTPException(
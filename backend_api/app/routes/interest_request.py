@@ -19,7 +19,7 @@ from app.models.admin import Admin
 from app.middleware.rate_limiter import RateLimiter
 
 router = APIRouter()
-interest_rate_limiter = RateLimiter(max_requests=3, window_seconds=3600)
+interest_rate_limiter = RateLimiter(max_requests=3, window_seconds=3600, name="interest")
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -16,7 +16,7 @@ from app.schemas.invitation import (
 )
 
 router = APIRouter()
-invitation_rate_limiter = RateLimiter(max_requests=5, window_seconds=60)
+invitation_rate_limiter = RateLimiter(max_requests=5, window_seconds=60, name="invitation")
 
 @router.post("/verify", response_model=InvitationVerifyResponse, dependencies=[Depends(invitation_rate_limiter.check_rate_limit)])
 def verify_invitation(request: InvitationVerifyRequest, db: Session = Depends(get_db)):
@@ -3,12 +3,33 @@ Monitoring Routes (GAP-H01, GAP-H02)
 
 Provides health check and metrics endpoints for system monitoring.
 """
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.qr_session import QRSession
-from app.models.login_history import LoginHistory
-from datetime import datetime, timedelta
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.config import settings
+from app.middleware.admission_control import get_admission_stats
+from app.middleware.instrumentation import get_http_stats
+from app.core.executors import get_executor_stats
+from app.core.password_hasher import password_hasher
+from app.core.schedule_cache import schedule_cache
+from app.core.schedule_broadcaster import schedule_broadcaster
+from app.core.websocket_manager import manager
+from app.core.broker import broker
+from app.core.single_flight import get_single_flight_stats
+from app.core.events import event_bus
+from app.core.audit_logger import audit
+from app.core.sql_telemetry import sql_telemetry
+from app.core.tracing import tracer
+from app.core.health import health
+from app.core.profiler import profiler, ProfilerBusy
+from app.core.memory_diagnostics import (
+    memory, process_memory, structure_sizes, SnapshotNotFound, TracingNotStarted
+)
+from app.core.dependencies import require_super_admin
+from app.models.admin import Admin
+from app.core.metrics import registry
+from datetime import datetime
+from typing import Optional
 
 router = APIRouter()
 
@@ -28,82 +49,390 @@ def health_check():
     }
 
 @router.get("/metrics")
-def get_metrics(db: Session = Depends(get_db)):
+def get_metrics():
     """
     Get authentication metrics for monitoring dashboards.
+    Read from the in-process metrics registry (all workers merged);
+    no database queries.
     
     Returns:
         dict: Various metrics about system activity
     """
-    now = datetime.utcnow()
-    hour_ago = now - timedelta(hours=1)
-    day_ago = now - timedelta(days=1)
-    
-    # QR Sessions metrics
-    qr_sessions_last_hour = db.query(QRSession).filter(
-        QRSession.created_at >= hour_ago
-    ).count()
-    
-    qr_sessions_24h = db.query(QRSession).filter(
-        QRSession.created_at >= day_ago
-    ).count()
-    
-    # Successful logins
-    successful_logins_24h = db.query(LoginHistory).filter(
-        LoginHistory.login_at >= day_ago
-    ).count()
-    
-    # Failed attempts
-    failed_attempts_last_hour = db.query(QRSession).filter(
-        QRSession.created_at >= hour_ago,
-        QRSession.failed_attempts > 0
-    ).count()
-    
-    # Currently locked sessions
-    locked_sessions = db.query(QRSession).filter(
-        QRSession.lockout_until > now
-    ).count()
-    
-    # Pending sessions (waiting for scan/verification)
-    pending_sessions = db.query(QRSession).filter(
-        QRSession.status == "pending",
-        QRSession.expires_at > now
-    ).count()
+    merged = registry.collect()
     
     return {
-        "timestamp": now.isoformat(),
+        "timestamp": datetime.utcnow().isoformat(),
         "qr_sessions": {
-            "last_hour": qr_sessions_last_hour,
-            "last_24h": qr_sessions_24h
+            "last_hour": int(registry.windowed_total(merged, "auth_qr_sessions_created_total", 3600)),
+            "last_24h": int(registry.windowed_total(merged, "auth_qr_sessions_created_total", 86400))
         },
         "logins": {
-            "successful_24h": successful_logins_24h
+            "successful_24h": int(registry.windowed_total(merged, "auth_logins_total", 86400))
         },
         "security": {
-            "failed_attempts_last_hour": failed_attempts_last_hour,
-            "locked_sessions": locked_sessions
+            "failed_attempts_last_hour": int(registry.windowed_total(merged, "auth_qr_sessions_failed_total", 3600)),
+            "locked_sessions": int(registry.value(merged, "auth_qr_sessions_locked"))
         },
-        "pending_sessions": pending_sessions
+        "pending_sessions": int(registry.value(merged, "auth_qr_sessions_pending"))
     }
 
+
+@router.get("/prometheus", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    All registry metrics in the Prometheus text exposition format.
+    
+    Returns:
+        str: text/plain; version=0.0.4
+    """
+    return PlainTextResponse(
+        registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+def _probe_response(body: dict, ok: bool) -> JSONResponse:
+    body["timestamp"] = datetime.utcnow().isoformat()
+    return JSONResponse(body, status_code=status.HTTP_200_OK if ok else status.HTTP_503_SERVICE_UNAVAILABLE)
+
+@router.get("/live")
+async def liveness_check():
+    """
+    Liveness probe - the process is up and its health probe loop runs.
+    Does not depend on the database; restart the worker only on 503.
+    
+    Returns:
+        dict: Liveness status (503 if the probe loop crashed)
+    """
+    result = health.liveness()
+    return _probe_response(result, result["alive"])
+
+@router.get("/startup")
+async def startup_check():
+    """
+    Startup probe - startup finished and every critical probe passed once.
+    
+    Returns:
+        dict: Startup status (503 until started)
+    """
+    result = health.startup()
+    return _probe_response(result, result["started"])
+
 @router.get("/ready")
-def readiness_check(db: Session = Depends(get_db)):
+async def readiness_check():
     """
     Readiness probe - checks if service is ready to handle requests.
-    Includes database connectivity check.
+    Answered from the background probes' cached results (database, disk,
+    SMTP); no I/O per request.
+    
+    Returns:
+        dict: Readiness status and per-probe results (503 if not ready)
+    """
+    result = health.readiness()
+    return _probe_response(result, result["ready"])
+
+
+@router.get("/http")
+def http_metrics():
+    """
+    Per-route request metrics from the instrumentation middleware.
+    
+    Returns:
+        dict: Count, in-flight, latency percentiles (bucket estimates),
+        mean response size and status codes per method and route template
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "routes": get_http_stats()
+    }
+
+
+@router.get("/admission")
+def admission_metrics():
+    """
+    Admission control metrics per route class.
+    
+    Returns:
+        dict: Limit, in-flight, queue depth and shed counts per class
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "route_classes": get_admission_stats()
+    }
+
+
+@router.get("/executors")
+def executor_metrics():
+    """
+    Saturation metrics for the named workload executors
+    and the password hashing process pool.
+    
+    Returns:
+        dict: Size, active, queued and timing stats per pool
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "executors": get_executor_stats(),
+        "password_hasher": password_hasher.stats()
+    }
+
+
+@router.get("/schedule")
+def schedule_metrics():
+    """
+    Schedule snapshot cache, transition broadcaster, WebSocket fan-out
+    and cross-worker broker state.
+    
+    Returns:
+        dict: Cache loads/hits, the broadcaster's next planned push and
+        subscriber queue/eviction counters
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "cache": schedule_cache.stats(),
+        "broadcaster": schedule_broadcaster.stats(),
+        "websocket": manager.stats(),
+        "broker": broker.stats()
+    }
+
+
+@router.get("/coalescing")
+def coalescing_metrics():
+    """
+    Single-flight request coalescing per endpoint group.
+    
+    Returns:
+        dict: Calls, executions, shared results and coalescing ratio
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "flights": get_single_flight_stats()
+    }
+
+
+@router.get("/events")
+def event_bus_metrics():
+    """
+    Domain event bus subscribers.
+    
+    Returns:
+        dict: Per-subscriber queue depth, deliveries, failures and
+        events dropped or run inline under back-pressure
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "event_bus": event_bus.stats()
+    }
+
+
+@router.get("/audit")
+def audit_log_metrics():
+    """
+    Security audit log writer.
+    
+    Returns:
+        dict: Queue depth, records written/dropped, batch, fsync and
+        rotation counters
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "audit": audit.stats()
+    }
+
+
+@router.get("/tracing")
+def tracing_metrics():
+    """
+    Request tracing sampler and span exporter.
+    
+    Returns:
+        dict: Requests seen, traces sampled/continued/throttled and
+        spans exported, written and dropped
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "tracing": tracer.stats()
+    }
+
+
+@router.get("/database")
+def database_metrics():
+    """
+    SQL execution and connection pool telemetry (statement texts are
+    under /api/admin/database/statements).
+    
+    Returns:
+        dict: Statement/execution/error counts, slow queries and pool
+        checkout waits, timeouts and saturation
+    """
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "database": sql_telemetry.stats()
+    }
+
+
+@router.get("/profile")
+async def cpu_profile(
+    seconds: float = Query(10, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    idle: bool = False,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """
+    Sample this worker's thread stacks for `seconds` (super admin only).
+    
+    Only the worker serving the request is profiled; repeat the call to
+    reach the others (X-Profile-Pid names the worker). Idle threads are
+    left out unless `idle=true`.
     
     Returns:
-        dict: Readiness status
+        text/plain: collapsed stacks for flamegraph.pl / speedscope, or
+        with format=json the sampling summary, top leaf frames and the
+        collapsed stacks
     """
     try:
-        # Simple query to verify DB connectivity
-        db.execute("SELECT 1")
-        db_status = "connected"
-    except Exception as e:
-        db_status = f"error: {str(e)}"
+        profile = await profiler.profile(seconds, interval_ms / 1000, include_idle=idle)
+    except ProfilerBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Retry-After": str(int(settings.PROFILER_MAX_SECONDS))},
+        )
     
+    if format == "json":
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "profile": profile.summary(),
+            "collapsed": profile.collapsed()
+        }
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"X-Profile-Pid": str(profile.pid), "X-Profile-Samples": str(profile.samples)}
+    )
+
+
+# Memory diagnostics: super admin, this worker only
+GROUP_BY_PATTERN = "^(lineno|filename|traceback)$"
+
+
+def _tracing_required(e: TracingNotStarted) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+def _snapshot_not_found(e: SnapshotNotFound) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {e.args[0]!r} not found")
+
+
+def _this_worker(
+    pid: Optional[int] = Query(None, description="Worker that must handle the request (the pid of earlier responses)")
+) -> int:
+    """
+    Tracing state and snapshots live in one worker. Requests naming
+    another worker's pid are refused, so a start/snapshot/diff sequence
+    never mixes workers; the client retries until it reaches that one.
+    """
+    if pid is not None and pid != os.getpid():
+        raise HTTPException(
+            status_code=status.HTTP_421_MISDIRECTED_REQUEST,
+            detail=f"Request is for worker {pid}; this is worker {os.getpid()}"
+        )
+    return os.getpid()
+
+
+@router.get("/memory")
+def memory_overview(
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """
+    Worker RSS, gc counts, tracemalloc status and the sizes of known
+    in-process structures (rate-limiter IP tables, WebSocket connections,
+    SQLAlchemy identity maps, caches and buffers).
+    """
     return {
-        "ready": db_status == "connected",
-        "database": db_status,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "pid": worker,
+        "process": process_memory(),
+        "tracemalloc": memory.status(),
+        "structures": structure_sizes()
     }
+
+
+@router.post("/memory/tracemalloc/start")
+def start_tracemalloc(
+    frames: int = Query(settings.MEMORY_TRACEMALLOC_FRAMES, ge=1, le=25),
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """
+    Start tracing allocations on this worker. Every allocation gets slower
+    and each traced block costs memory until stopped. Pass the returned
+    pid to the later snapshot and diff calls.
+    """
+    return {"pid": worker, **memory.start(frames)}
+
+
+@router.post("/memory/tracemalloc/stop")
+def stop_tracemalloc(
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """Discard the snapshots and stop tracing (unless PYTHONTRACEMALLOC started it)"""
+    return {"pid": worker, **memory.stop()}
+
+
+@router.post("/memory/snapshots")
+def take_memory_snapshot(
+    name: Optional[str] = Query(None, min_length=1, max_length=64),
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """Take a named tracemalloc snapshot (default name: the current time)"""
+    try:
+        return {"pid": worker, **memory.take_snapshot(name)}
+    except TracingNotStarted as e:
+        raise _tracing_required(e)
+
+
+@router.get("/memory/snapshots")
+def list_memory_snapshots(
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    return {"timestamp": datetime.utcnow().isoformat(), "pid": worker, "snapshots": memory.snapshots()}
+
+
+@router.get("/memory/snapshots/{name}/top")
+def top_memory_allocations(
+    name: str,
+    group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN),
+    limit: int = Query(20, ge=1, le=200),
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """Largest allocation sites of one snapshot"""
+    try:
+        return {"pid": worker, "snapshot": name, "group_by": group_by, "top": memory.top(name, group_by, limit)}
+    except SnapshotNotFound as e:
+        raise _snapshot_not_found(e)
+
+
+@router.get("/memory/diff")
+def diff_memory_snapshots(
+    base: str,
+    target: Optional[str] = None,
+    group_by: str = Query("lineno", pattern=GROUP_BY_PATTERN),
+    limit: int = Query(20, ge=1, le=200),
+    worker: int = Depends(_this_worker),
+    current_admin: Admin = Depends(require_super_admin)
+):
+    """
+    Allocation sites that grew most between two snapshots, by size
+    difference; without `target`, from `base` to now.
+    """
+    try:
+        return {"pid": worker, **memory.diff(base, target, group_by, limit)}
+    except SnapshotNotFound as e:
+        raise _snapshot_not_found(e)
+    except TracingNotStarted as e:
+        raise _tracing_required(e)
@@ -1,20 +1,22 @@
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
     HTTPException,
     Query,
+    Request,
     status,
 )
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from app.database import get_db
 from app.schemas.user import UserRegister, PendingUserResponse
-from app.services import registration_service, notification_service
+from app.services import registration_service
 from app.core.system_status import is_system_open
 from app.models.pending_user import PendingUser
 from app.models.active_user import ActiveUser
 from app.middleware.rate_limiter import register_rate_limiter
+from app.core.heavy_hitters import heavy_hitters
+from app.core.password_hasher import HashingBusy
 
 router = APIRouter()
 
@@ -126,7 +128,7 @@ def check_username_availability(
 )
 def register_user(
     user_data: UserRegister,
-    background_tasks: BackgroundTasks,
+    request: Request,
     db: Session = Depends(get_db),
 ):
     """
@@ -135,6 +137,11 @@ def register_user(
     This is called from Website A.com registration form
     User will be in pending state until admin approves
     """
+    heavy_hitters.record(
+        "registration_attempt",
+        ip=request.client.host if request.client else None,
+    )
+
     # Check if system is open
     if not is_system_open(db):
         raise HTTPException(
@@ -170,18 +177,14 @@ def register_user(
             policies_accepted=user_data.policies_accepted,
         )
 
-        # Send notification to admin
-        background_tasks.add_task(
-            notification_service.send_admin_notification,
-            subject="New User Registration",
-            message=(
-                f"New user {user_data.username} ({user_data.email}) has registered "
-                "and is awaiting approval."
-            ),
-        )
-
         return pending_user
 
+    except HashingBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
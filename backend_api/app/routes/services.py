@@ -4,9 +4,12 @@ from typing import List
 from app.database import get_db
 from app.schemas.service import ServiceRegister, ServiceResponse
 from app.services import service_management
+from app.core.single_flight import get_flight
 
 router = APIRouter()
 
+services_flight = get_flight("services_list")
+
 @router.post("/register", response_model=ServiceResponse)
 def register_service(
     service_data: ServiceRegister,
@@ -41,9 +44,14 @@ def list_services(
 ):
     """
     Get list of all registered services
+    Concurrent identical requests share one query (single-flight)
     """
-    services = service_management.get_all_services(db, include_inactive)
-    return services
+    def load():
+        # Converted inside the flight: followers must not touch the leader's session
+        services = service_management.get_all_services(db, include_inactive)
+        return [ServiceResponse.model_validate(service) for service in services]
+    
+    return services_flight.do_sync(f"list:{include_inactive}", load)
 
 @router.post("/deactivate/{service_id}")
 def deactivate_service(service_id: int, db: Session = Depends(get_db)):
@@ -1,47 +1,80 @@
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
 from app.core.websocket_manager import manager
+from app.core.http_cache import cached_json
+from app.core.single_flight import get_flight
+from app.core.health import health
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.services import schedule_service
 from app.schemas.system import SystemStatusResponse
+from app.schemas.schedule import as_time_windows
 from datetime import datetime
 
 router = APIRouter()
 
+# Snapshot reloads after an invalidation are shared by concurrent pollers
+status_flight = get_flight("system_status")
+
 @router.get("/status", response_model=SystemStatusResponse)
-def get_status(db: Session = Depends(get_db)):
+def get_status(request: Request, db: Session = Depends(get_db)):
     """
     Get current system status
     
     Shows if system is open, closed, or closing soon
     Includes manual override information if applicable
-    All apps should call this periodically to show warnings
+    Call once on load, then subscribe to /api/system/ws: a status event is
+    pushed at every transition, and `next_transition_at` (UTC) lets
+    clients count down without polling. Compare it against the response's
+    Date header (plus Age, if a cache answered), or against `server_time`
+    in WebSocket events; this body may come from a cache, so it carries
+    no clock of its own
+    
+    Supports conditional GET (ETag / Last-Modified); max-age ends at the
+    next transition
     """
-    status = schedule_service.get_system_status(db)
-    return SystemStatusResponse(**status)
+    snapshot = status_flight.do_sync("snapshot", schedule_service.get_schedule_snapshot, db)
+    return cached_json(
+        request, snapshot,
+        lambda now: SystemStatusResponse(**snapshot.status(now, server_time=False)),
+        salt="status"
+    )
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    """
+    Status events; also {"type": "ping"} heartbeats, answer with "pong"
+    """
+    if not await manager.connect(websocket):
+        return
     try:
         while True:
-            await websocket.receive_text()
+            message = await websocket.receive_text()
+            manager.touch(websocket)
+            if message == "ping":
+                manager.send_to(websocket, {"type": "pong"})
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 @router.get("/operating-hours")
-def get_operating_hours(db: Session = Depends(get_db)):
+def get_operating_hours(request: Request, db: Session = Depends(get_db)):
     """
     Get configured operating hours and current schedule
+    Supports conditional GET, like /status
     """
-    schedule = schedule_service.get_current_schedule(db)
-    
+    schedule = schedule_service.get_schedule_snapshot(db)
+    return cached_json(request, schedule, lambda now: _operating_hours(schedule, now), salt="operating-hours")
+
+def _operating_hours(schedule, now: datetime) -> dict:
     return {
         "opening_time": f"{schedule.opening_hour:02d}:{schedule.opening_minute:02d}",
         "closing_time": f"{schedule.closing_hour:02d}:{schedule.closing_minute:02d}",
         "warning_minutes_before_close": schedule.warning_minutes,
         "timezone": schedule.timezone,
-        "currently_open": schedule_service.is_system_open(db),
+        "weekly_windows": as_time_windows(schedule.weekly_windows),
+        "exceptions": as_time_windows(schedule.exceptions),
+        "currently_open": schedule.is_open(now),
         "is_manually_overridden": schedule.is_manually_overridden,
         "manual_status": schedule.manual_status,
         "override_reason": schedule.override_reason,
@@ -52,10 +85,11 @@ def get_operating_hours(db: Session = Depends(get_db)):
 def health_check(db: Session = Depends(get_db)):
     """
     Simple health check endpoint
-    Returns 200 if API is running
+    Returns 200 if API is running; `status` comes from the cached
+    background probes (healthy, degraded or unhealthy)
     """
     return {
-        "status": "healthy",
+        "status": health.status(),
         "timestamp": datetime.utcnow().isoformat(),
         "system_open": schedule_service.is_system_open(db)
     }
\ No newline at end of file
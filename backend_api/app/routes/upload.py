@@ -3,6 +3,7 @@ import shutil
 import os
 import uuid
 from app.middleware.rate_limiter import RateLimiter
+from app.core.executors import run_in
 
 router = APIRouter()
 
@@ -16,8 +17,13 @@ AUDIO_DIR = os.path.join(UPLOAD_DIR, "audio")
 os.makedirs(PHOTO_DIR, exist_ok=True)
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
+def _save_upload(source, file_path: str):
+    """Blocking copy of an uploaded file to disk"""
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
 # Rate limiter for uploads (10 requests per minute per IP)
-upload_rate_limiter = RateLimiter(max_requests=10, window_seconds=60)
+upload_rate_limiter = RateLimiter(max_requests=10, window_seconds=60, name="upload")
 
 @router.post("/photo", status_code=status.HTTP_201_CREATED, dependencies=[Depends(upload_rate_limiter.check_rate_limit)])
 async def upload_photo(file: UploadFile = File(...)):
@@ -42,9 +48,8 @@ async def upload_photo(file: UploadFile = File(...)):
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(PHOTO_DIR, unique_filename)
 
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save file on the io executor
+        await run_in("io", _save_upload, file.file, file_path)
 
         # Return file info
         return {
@@ -83,9 +88,8 @@ async def upload_audio(file: UploadFile = File(...)):
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(AUDIO_DIR, unique_filename)
 
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Save file on the io executor
+        await run_in("io", _save_upload, file.file, file_path)
 
         return {
             "success": True,
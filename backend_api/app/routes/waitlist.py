@@ -22,7 +22,7 @@ from app.middleware.rate_limiter import RateLimiter
 router = APIRouter()
 
 # Rate limiter for interest submissions (3 per hour per IP)
-interest_rate_limiter = RateLimiter(max_requests=3, window_seconds=3600)
+interest_rate_limiter = RateLimiter(max_requests=3, window_seconds=3600, name="waitlist")
 
 
 # ============================================================================
@@ -2,7 +2,7 @@
 Schemas for system schedule management
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -26,6 +26,34 @@ class OperatingHoursUpdate(BaseModel):
         return v
 
 
+class TimeWindow(BaseModel):
+    """Local opening window, e.g. 09:00 - 12:30 (end may be 24:00)"""
+    start: str = Field(..., description="Opening time (HH:MM)")
+    end: str = Field(..., description="Closing time (HH:MM)")
+
+
+def as_time_windows(windows: Optional[Dict[str, list]]) -> Optional[Dict[str, List[dict]]]:
+    """Stored [start, end] pairs as the {"start", "end"} objects the API accepts"""
+    if windows is None:
+        return None
+    return {
+        key: [{"start": start, "end": end} for start, end in pairs]
+        for key, pairs in windows.items()
+    }
+
+
+class WeeklyScheduleUpdate(BaseModel):
+    """Schema for weekly windows with date exceptions"""
+    weekly_windows: Dict[str, List[TimeWindow]] = Field(
+        ..., description="Windows per weekday: mon, tue, wed, thu, fri, sat, sun"
+    )
+    exceptions: Dict[str, List[TimeWindow]] = Field(
+        default_factory=dict, description="Windows per date (YYYY-MM-DD); empty list = closed"
+    )
+    warning_minutes: int = Field(15, ge=0, description="Warning minutes before close")
+    timezone: str = Field("UTC", description="IANA timezone, e.g. Europe/Berlin")
+
+
 class SystemToggleRequest(BaseModel):
     """Schema for manual system toggle"""
     status: str = Field(..., description="Target status: 'open', 'closed', or 'auto'")
@@ -47,6 +75,8 @@ class ScheduleResponse(BaseModel):
     closing_time: str
     warning_minutes_before_close: int
     timezone: str
+    weekly_windows: Optional[Dict[str, List[TimeWindow]]] = None
+    exceptions: Optional[Dict[str, List[TimeWindow]]] = None
     is_manually_overridden: bool
     manual_status: Optional[str]
     override_reason: Optional[str]
@@ -54,6 +84,11 @@ class ScheduleResponse(BaseModel):
     updated_at: Optional[str]
     updated_by: Optional[int]
     
+    @validator('weekly_windows', 'exceptions', pre=True)
+    def windows_as_objects(cls, v):
+        """Windows are stored as pairs; respond in the request's shape"""
+        return as_time_windows(v)
+    
     class Config:
         from_attributes = True
 
@@ -7,6 +7,8 @@ class SystemStatusResponse(BaseModel):
     warning: bool
     message: str
     minutes_until_close: Optional[int] = None
+    # UTC; clients count down to this (against the Date header) instead of polling
+    next_transition_at: Optional[str] = None
 
 class MaintenanceWarning(BaseModel):
     """Warning about upcoming maintenance/shutdown"""
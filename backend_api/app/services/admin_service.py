@@ -3,24 +3,50 @@ from app.models.login_history import LoginHistory
 from app.models.active_user import ActiveUser
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.core.security import verify_password
+from app.core.executors import run_in
+from app.core.password_hasher import password_hasher
 
-def authenticate_admin(username: str, password: str, db: Session) -> Optional[Admin]:
+def get_active_admin(username: str, db: Session) -> Optional[Admin]:
     """
-    Verify admin credentials
-    Used for admin login to control center
+    Look up an active admin by username
     """
-    admin = db.query(Admin).filter(
+    return db.query(Admin).filter(
         Admin.username == username,
         Admin.is_active == True
     ).first()
+
+def save_rehashed_password(admin: Admin, new_hash: str, db: Session) -> Admin:
+    """
+    Store an upgraded password hash for an admin
+    """
+    admin.hashed_password = new_hash
+    db.commit()
+    db.refresh(admin)
+    return admin
+
+async def authenticate_admin(username: str, password: str, db: Session) -> Optional[Admin]:
+    """
+    Verify admin credentials
+    Used for admin login to control center
+    The lookup runs on the db executor, bcrypt in the hashing process pool
+    
+    Hashes made with an outdated scheme or cost are transparently
+    replaced with one using the current parameters on successful login
+    """
+    admin = await run_in("db", get_active_admin, username, db)
     
     if not admin:
         return None
     
-    if not verify_password(password, admin.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update_async(
+        password, admin.hashed_password
+    )
+    if not verified:
         return None
     
+    if new_hash:
+        admin = await run_in("db", save_rehashed_password, admin, new_hash, db)
+    
     return admin
 
 def get_login_history(
@@ -7,6 +7,7 @@ from jinja2 import Environment, FileSystemLoader
 from datetime import datetime
 from typing import Optional
 from app.config import settings
+from app.core.executors import run_in
 
 # Initialize Jinja2 template environment
 template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'email')
@@ -77,7 +78,6 @@ async def send_info_request_email(email: str, name: str, message: str, request_i
 
 async def send_email(to: str, subject: str, html_content: str):
     """Send email using configured provider"""
-    import smtplib
     from email.mime.text import MIMEText
     from email.mime.multipart import MIMEMultipart
     
@@ -90,17 +90,22 @@ async def send_email(to: str, subject: str, html_content: str):
     msg.attach(html_part)
     
     try:
-        # Wrap blocking calls in a way to not block main loop if possible, 
-        # or accept the blocking nature for this task as per documentation.
-        # For now, implementing as per doc.
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            if settings.SMTP_TLS:
-                server.starttls()
-            if settings.SMTP_USER:
-                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.sendmail(settings.EMAIL_FROM, to, msg.as_string())
+        # smtplib blocks; run it on the io executor instead of the event loop
+        await run_in("io", _deliver_smtp, to, msg.as_string())
     except Exception as e:
         print(f"Failed to send email: {e}")
         # In production, log this better.
         pass # Don't crash the request if email fails? Or raise? Doc raises.
         # raise
+
+
+def _deliver_smtp(to: str, message: str):
+    """Blocking SMTP delivery"""
+    import smtplib
+    
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
+        if settings.SMTP_TLS:
+            server.starttls()
+        if settings.SMTP_USER:
+            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        server.sendmail(settings.EMAIL_FROM, to, message)
@@ -10,8 +10,8 @@ from app.models.interest_request import (
     InterestRequest, InterestStatus, RequestSource
 )
 from app.services import invitation_service
-from app.services.email_service import (
-    send_invitation_email, send_rejection_email, send_info_request_email
+from app.core.events import (
+    event_bus, InterestSubmitted, InterestInvited, InterestRejected, InterestInfoRequested
 )
 
 
@@ -61,6 +61,11 @@ async def create_interest_request(
     db.commit()
     db.refresh(request)
     
+    event_bus.publish(InterestSubmitted(
+        request_id=request.id,
+        source=request.source.value if hasattr(request.source, "value") else request.source
+    ))
+    
     return request
 
 
@@ -97,14 +102,15 @@ async def create_admin_invite(
     db.commit()
     
     # Send email
-    await send_invitation_email(
+    event_bus.publish(InterestInvited(
+        request_id=request.id,
         email=request.primary_email,
         name=request.display_name,
         code=invitation.code,
         pin=invitation.pin,
         url_token=invitation.url_token,
         expires_at=invitation.expires_at
-    )
+    ))
     
     return {
         "success": True,
@@ -147,14 +153,15 @@ async def approve_request(
     request.mark_invited(invitation.id)
     db.commit()
     
-    await send_invitation_email(
+    event_bus.publish(InterestInvited(
+        request_id=request_id,
         email=request.primary_email,
         name=request.display_name,
         code=invitation.code,
         pin=invitation.pin,
         url_token=invitation.url_token,
         expires_at=invitation.expires_at
-    )
+    ))
     
     return {
         "success": True,
@@ -183,11 +190,12 @@ async def reject_request(
     request.reject(admin_username, reason)
     db.commit()
     
-    await send_rejection_email(
+    event_bus.publish(InterestRejected(
+        request_id=request_id,
         email=request.primary_email,
         name=request.display_name,
         reason=reason
-    )
+    ))
     
     return True
 
@@ -210,12 +218,12 @@ async def request_more_info(
     request.request_info(admin_username, message)
     db.commit()
     
-    await send_info_request_email(
+    event_bus.publish(InterestInfoRequested(
+        request_id=request_id,
         email=request.primary_email,
         name=request.display_name,
-        message=message,
-        request_id=request_id
-    )
+        message=message
+    ))
     
     return True
 
@@ -6,6 +6,12 @@ from app.models.active_user import ActiveUser
 from sqlalchemy.orm import Session
 from app.config import settings
 from app.core.security import create_access_token
+from app.core.admin_events import admin_events, AdminEventType
+from app.core.tracing import tracer
+from app.core.metrics import (
+    pin_verifications, qr_sessions_failed, lockouts, logins, locked_qr_sessions, time_to_login,
+    tracking_key
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,9 +35,11 @@ def check_session_lockout(qr_session: QRSession) -> None:
     if qr_session.lockout_until:
         if datetime.utcnow() < qr_session.lockout_until:
             remaining = (qr_session.lockout_until - datetime.utcnow()).seconds
+            pin_verifications.inc(result="locked")
             raise ValueError(f"Session locked. Try again in {remaining} seconds.")
         else:
             # Lockout expired, reset
+            locked_qr_sessions.discard(tracking_key(qr_session.token))
             qr_session.lockout_until = None
             qr_session.failed_attempts = 0
 
@@ -40,17 +48,22 @@ def check_pin_expiration(qr_session: QRSession) -> None:
     # If pin_expires_at is set, use it
     if qr_session.pin_expires_at:
         if datetime.utcnow() > qr_session.pin_expires_at:
+            pin_verifications.inc(result="pin_expired")
             raise ValueError("PIN has expired. Please scan QR code again.")
     
     # Fallback to checking creation/scan time if explicit expiry not set (though it should be)
     elif qr_session.scanned_at:
         expiry = qr_session.scanned_at + timedelta(minutes=PIN_EXPIRY_MINUTES)
         if datetime.utcnow() > expiry:
+            pin_verifications.inc(result="pin_expired")
             raise ValueError("PIN has expired. Please scan QR code again.")
 
 def track_failed_attempt(qr_session: QRSession, db: Session) -> None:
     """Track failed PIN attempt and implement lockout if needed."""
     qr_session.failed_attempts += 1
+    pin_verifications.inc(result="invalid_pin")
+    if qr_session.failed_attempts == 1:
+        qr_sessions_failed.inc()
     
     logger.warning(
         f"Failed PIN attempt {qr_session.failed_attempts}/{MAX_PIN_ATTEMPTS} "
@@ -60,13 +73,32 @@ def track_failed_attempt(qr_session: QRSession, db: Session) -> None:
     if qr_session.failed_attempts >= MAX_PIN_ATTEMPTS:
         qr_session.locked_at = datetime.utcnow()
         qr_session.lockout_until = datetime.utcnow() + timedelta(minutes=LOCKOUT_DURATION_MINUTES)
+        lockouts.inc()
+        locked_qr_sessions.add(tracking_key(qr_session.token), qr_session.lockout_until)
         
         logger.warning(
             f"Session {qr_session.token[:8]}... locked until {qr_session.lockout_until}"
         )
     
     db.commit()
+    
+    admin_events.emit(
+        AdminEventType.LOGIN_FAILED,
+        qr_session_id=qr_session.id,
+        service_id=qr_session.service_id,
+        failed_attempts=qr_session.failed_attempts,
+        ip=qr_session.verifier_ip
+    )
+    if qr_session.lockout_until and qr_session.failed_attempts >= MAX_PIN_ATTEMPTS:
+        admin_events.emit(
+            AdminEventType.LOCKOUT,
+            qr_session_id=qr_session.id,
+            service_id=qr_session.service_id,
+            locked_until=qr_session.lockout_until.isoformat(),
+            ip=qr_session.verifier_ip
+        )
 
+@tracer.traced()
 def verify_pin_and_create_session(
     qr_token: str, 
     pin: str, 
@@ -89,10 +121,12 @@ def verify_pin_and_create_session(
     ).first()
     
     if not qr_session:
+        pin_verifications.inc(result="not_found")
         raise ValueError("Invalid QR code")
     
     # Check if already verified
     if qr_session.is_verified:
+        pin_verifications.inc(result="already_used")
         raise ValueError("This QR code was already used")
     
     # Check for lockout
@@ -100,6 +134,7 @@ def verify_pin_and_create_session(
     
     # Check if QR was scanned (has a PIN)
     if not qr_session.pin:
+        pin_verifications.inc(result="not_scanned")
         raise ValueError("QR code not scanned yet. Please scan with mobile app first.")
     
     # Check PIN expiration
@@ -125,6 +160,7 @@ def verify_pin_and_create_session(
     ).first()
     
     if not user:
+        pin_verifications.inc(result="user_not_found")
         raise ValueError("User not found")
     
     # Create session token (JWT) valid for 30 minutes
@@ -158,6 +194,17 @@ def verify_pin_and_create_session(
     
     db.add(login_record)
     db.commit()
+    pin_verifications.inc(result="success")
+    logins.inc()
+    if qr_session.created_at:
+        time_to_login.observe((qr_session.verified_at - qr_session.created_at).total_seconds())
+    
+    admin_events.emit(
+        AdminEventType.LOGIN_SUCCEEDED,
+        user_id=user.id,
+        service_id=qr_session.service_id,
+        ip=qr_session.verifier_ip
+    )
     
     logger.info(f"Successful login for user {user.id} via session {qr_session.token[:8]}...")
     
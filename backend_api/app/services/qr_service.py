@@ -6,6 +6,8 @@ from app.models.registered_service import RegisteredService
 from app.models.active_user import ActiveUser
 from app.utils.qr_generator import create_qr_image
 from app.config import settings
+from app.core.tracing import tracer
+from app.core.metrics import qr_sessions_created, qr_scans, pending_qr_sessions, time_to_scan, tracking_key
 from app.utils.session_code import generate_session_code, generate_obfuscation_map, apply_obfuscation, validate_scanned_pattern
 import logging
 
@@ -14,16 +16,21 @@ logger = logging.getLogger(__name__)
 # Constants
 PIN_EXPIRY_MINUTES = 2
 
+@tracer.traced()
 def generate_qr_session(
     service_id: int, 
     service_api_key: str, 
     db: Session, 
-    client_ip: str = None
+    client_ip: str = None,
+    render_image: bool = True
 ) -> dict:
     """
     Create a new QR code session for a service
     ServiceB.com calls this to get a QR code to display to user
     
+    Pass render_image=False to skip PNG rendering and render
+    `qr_pattern` separately (e.g. on the render executor).
+    
     Returns:
         dict with token, qr_image, and expiry info
     """
@@ -65,17 +72,21 @@ def generate_qr_session(
     db.add(qr_session)
     db.commit()
     db.refresh(qr_session)
+    qr_sessions_created.inc()
+    pending_qr_sessions.add(tracking_key(token), expires_at)
     
     # Generate the actual QR code image using the OBFUSCATED PATTERN
-    qr_image = create_qr_image(qr_pattern)
+    qr_image = create_qr_image(qr_pattern) if render_image else None
     
     return {
         "token": token,
+        "qr_pattern": qr_pattern,
         "qr_image": qr_image,
         "expires_in_seconds": settings.QR_CODE_EXPIRY_MINUTES * 60,
         "service_name": service.service_name
     }
 
+@tracer.traced()
 def process_qr_scan(
     qr_token: str, 
     user_auth_key: str, 
@@ -102,21 +113,26 @@ def process_qr_scan(
         ).first()
     
     if not qr_session:
+        qr_scans.inc(result="not_found")
         raise ValueError("QR code not found")
     
     # 3. Validate scanned pattern against stored session code (GAP-H03)
     if qr_session.session_code and qr_session.obfuscation_map:
         if not validate_scanned_pattern(qr_token, qr_session.session_code, qr_session.obfuscation_map):
+            qr_scans.inc(result="invalid_pattern")
             raise ValueError("Invalid QR code pattern")
     
     # Check if QR code has expired
     if datetime.utcnow() > qr_session.expires_at:
         qr_session.status = "expired"
         db.commit()
+        qr_scans.inc(result="expired")
+        pending_qr_sessions.discard(tracking_key(qr_session.token), qr_session.expires_at)
         raise ValueError("QR code has expired. Please refresh and try again.")
     
     # Check if QR code was already scanned
     if qr_session.is_used:
+        qr_scans.inc(result="already_scanned")
         raise ValueError("QR code already scanned")
     
     # Verify the user exists and is active
@@ -126,6 +142,7 @@ def process_qr_scan(
     ).first()
     
     if not user:
+        qr_scans.inc(result="invalid_user")
         raise ValueError("Invalid user credentials")
     
     # Generate 6-digit PIN for verification
@@ -146,6 +163,10 @@ def process_qr_scan(
     qr_session.device_info = device_info
     
     db.commit()
+    qr_scans.inc(result="success")
+    pending_qr_sessions.discard(tracking_key(qr_session.token), qr_session.expires_at)
+    if qr_session.created_at:
+        time_to_scan.observe((qr_session.scanned_at - qr_session.created_at).total_seconds())
     
     return {
         "success": True,
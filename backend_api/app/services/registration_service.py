@@ -2,7 +2,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from app.models.pending_user import PendingUser
 from app.models.active_user import ActiveUser
-from app.core.security import hash_password
+from app.core.password_hasher import password_hasher
+from app.core.events import event_bus, RegistrationSubmitted
 from app.utils.token_generator import generate_auth_key
 from typing import Optional, List, Dict
 import json
@@ -58,7 +59,7 @@ def create_pending_user(
         raise ValueError("Username already taken")
     
     # Create new pending user
-    hashed_pwd = hash_password(password)
+    hashed_pwd = password_hasher.hash(password)
     
     pending_user = PendingUser(
         email=email,
@@ -87,6 +88,12 @@ def create_pending_user(
     db.commit()
     db.refresh(pending_user)
     
+    event_bus.publish(RegistrationSubmitted(
+        pending_user_id=pending_user.id,
+        username=pending_user.username,
+        email=pending_user.email
+    ))
+    
     return pending_user
 
 def get_pending_users(db: Session, skip: int = 0, limit: int = 100):
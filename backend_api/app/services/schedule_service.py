@@ -8,9 +8,25 @@ from typing import Optional, Dict, Any
 import json
 
 from app.models.system_schedule import SystemSchedule, SystemScheduleAudit
+from app.core.schedule_cache import schedule_cache
+from app.core.schedule_engine import ScheduleRules, load_timezone
+from app.core.admin_events import admin_events, AdminEventType
+from app.core.tracing import tracer
 from app.config import settings
 
 
+def _schedule_changed(schedule: SystemSchedule, action: str, admin_id: Optional[int]) -> None:
+    """Drop cached snapshots (all workers) and tell admin dashboards"""
+    schedule_cache.invalidate()
+    admin_events.emit(
+        AdminEventType.SCHEDULE_CHANGED,
+        action=action,
+        admin_id=admin_id,
+        is_manually_overridden=bool(schedule.is_manually_overridden),
+        manual_status=schedule.manual_status
+    )
+
+
 def get_current_schedule(db: Session) -> SystemSchedule:
     """
     Get the current active system schedule
@@ -35,97 +51,32 @@ def get_current_schedule(db: Session) -> SystemSchedule:
     return schedule
 
 
+def get_schedule_snapshot(db: Session):
+    """
+    Get the cached, immutable snapshot of the current schedule
+    """
+    return schedule_cache.get(db)
+
+
+@tracer.traced()
 def is_system_open(db: Session) -> bool:
     """
     Check if system is currently open
     Considers both scheduled hours and manual overrides
+    Answered from the cached schedule snapshot; no query unless invalidated
     """
-    schedule = get_current_schedule(db)
-    
-    # Check if manual override is active
-    if schedule.is_manually_overridden:
-        # Check if override has expired
-        if schedule.override_expires_at and datetime.utcnow() > schedule.override_expires_at:
-            # Override expired, clear it
-            clear_manual_override(db, schedule)
-            # Fall through to scheduled check
-        else:
-            return schedule.manual_status == 'open'
-    
-    # Check scheduled hours
-    now = datetime.utcnow().time()
-    opening = time(schedule.opening_hour, schedule.opening_minute)
-    closing = time(schedule.closing_hour, schedule.closing_minute)
-    
-    return opening <= now < closing
+    return schedule_cache.is_open(db)
 
 
 def should_send_warning(db: Session) -> bool:
     """Check if we're in warning period before closing"""
-    schedule = get_current_schedule(db)
-    
-    # Don't send warnings if manually overridden
-    if schedule.is_manually_overridden:
-        return False
-    
-    now = datetime.utcnow()
-    closing = datetime.combine(now.date(), time(schedule.closing_hour, schedule.closing_minute))
-    warning_time = closing - timedelta(minutes=schedule.warning_minutes)
-    
-    return warning_time <= now < closing
+    phase, _ = schedule_cache.phase(db)
+    return phase == "warning"
 
 
 def get_system_status(db: Session) -> Dict[str, Any]:
     """Get detailed system status including override information"""
-    schedule = get_current_schedule(db)
-    now = datetime.utcnow()
-    
-    status_info = {
-        "schedule_id": schedule.id,
-        "timezone": schedule.timezone,
-        "currently_open": is_system_open(db)
-    }
-    
-    # Check for manual override
-    if schedule.is_manually_overridden:
-        status_info.update({
-            "status": schedule.manual_status,
-            "warning": False,
-            "message": f"System is manually {schedule.manual_status}",
-            "is_manual_override": True,
-            "override_reason": schedule.override_reason,
-            "override_expires_at": schedule.override_expires_at.isoformat() if schedule.override_expires_at else None
-        })
-        return status_info
-    
-    # Normal scheduled operation
-    status_info["is_manual_override"] = False
-    
-    if is_system_open(db):
-        if should_send_warning(db):
-            closing = datetime.combine(now.date(), time(schedule.closing_hour, schedule.closing_minute))
-            minutes_left = int((closing - now).total_seconds() / 60)
-            
-            status_info.update({
-                "status": "open",
-                "warning": True,
-                "message": f"System closing in {minutes_left} minutes. Please save your work.",
-                "minutes_until_close": minutes_left
-            })
-        else:
-            status_info.update({
-                "status": "open",
-                "warning": False,
-                "message": "System is operating normally"
-            })
-    else:
-        status_info.update({
-            "status": "closed",
-            "warning": False,
-            "message": f"System is closed. Hours: {schedule.opening_hour:02d}:{schedule.opening_minute:02d} - {schedule.closing_hour:02d}:{schedule.closing_minute:02d} {schedule.timezone}"
-        })
-    
-    return status_info
+    return schedule_cache.status(db)
 
 
 def update_operating_hours(
@@ -155,6 +106,7 @@ def update_operating_hours(
     closing_time = time(closing_hour, closing_minute)
     if opening_time >= closing_time:
         raise ValueError("Opening time must be before closing time")
+    load_timezone(timezone)
     
     # Get current schedule for audit
     current_schedule = get_current_schedule(db)
@@ -167,11 +119,13 @@ def update_operating_hours(
     current_schedule.closing_minute = closing_minute
     current_schedule.warning_minutes = warning_minutes
     current_schedule.timezone = timezone
+    current_schedule.weekly_windows = None  # back to the same hours every day
     current_schedule.updated_by = admin_id
     current_schedule.updated_at = datetime.utcnow()
     
     db.commit()
     db.refresh(current_schedule)
+    _schedule_changed(current_schedule, "update_hours", admin_id)
     
     # Create audit log
     audit = SystemScheduleAudit(
@@ -187,6 +141,52 @@ def update_operating_hours(
     return current_schedule
 
 
+def update_weekly_schedule(
+    db: Session,
+    weekly_windows: Dict[str, list],
+    admin_id: int,
+    exceptions: Optional[Dict[str, list]] = None,
+    warning_minutes: int = 15,
+    timezone: str = "UTC"
+) -> SystemSchedule:
+    """
+    Replace the schedule with per-weekday windows and date exceptions
+    Creates audit log entry
+    """
+    if warning_minutes < 0:
+        raise ValueError("Warning minutes must be positive")
+
+    # Validates days, times, overlaps and timezone (raises ValueError)
+    rules = ScheduleRules.from_config(timezone, weekly_windows, exceptions)
+    config = rules.to_config()
+
+    current_schedule = get_current_schedule(db)
+    old_value = current_schedule.to_dict()
+
+    current_schedule.weekly_windows = config["weekly_windows"]
+    current_schedule.exceptions = config["exceptions"] or None
+    current_schedule.warning_minutes = warning_minutes
+    current_schedule.timezone = timezone
+    current_schedule.updated_by = admin_id
+    current_schedule.updated_at = datetime.utcnow()
+
+    db.commit()
+    db.refresh(current_schedule)
+    _schedule_changed(current_schedule, "update_weekly", admin_id)
+
+    audit = SystemScheduleAudit(
+        admin_id=admin_id,
+        action="update_weekly",
+        old_value=json.dumps(old_value),
+        new_value=json.dumps(current_schedule.to_dict()),
+        reason="Weekly schedule updated"
+    )
+    db.add(audit)
+    db.commit()
+
+    return current_schedule
+
+
 def set_manual_override(
     db: Session,
     status: str,  # 'open' or 'closed'
@@ -219,6 +219,7 @@ def set_manual_override(
     
     db.commit()
     db.refresh(schedule)
+    _schedule_changed(schedule, "manual_override", admin_id)
     
     # Create audit log
     audit = SystemScheduleAudit(
@@ -262,6 +263,7 @@ def clear_manual_override(
     
     db.commit()
     db.refresh(schedule)
+    _schedule_changed(schedule, "auto_restore", admin_id)
     
     # Create audit log if admin initiated
     if admin_id:
@@ -3,8 +3,11 @@ from app.models.active_user import ActiveUser
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.core.security import decode_access_token
+from app.core.metrics import session_validations, logouts
+from app.core.tracing import tracer
 
 
+@tracer.traced()
 def validate_session_token(token: str, db: Session) -> dict:
     """
     Verify if a session token is still valid
@@ -15,6 +18,7 @@ def validate_session_token(token: str, db: Session) -> dict:
     payload = decode_access_token(token)
 
     if not payload:
+        session_validations.inc(result="invalid_token")
         raise ValueError("Invalid token")
 
     # Check if session exists in login history
@@ -23,10 +27,12 @@ def validate_session_token(token: str, db: Session) -> dict:
     )
 
     if not login_record:
+        session_validations.inc(result="not_found")
         raise ValueError("Session not found")
 
     # Check if session has expired
     if datetime.utcnow() > login_record.session_expires_at:
+        session_validations.inc(result="expired")
         raise ValueError("Session has expired")
 
     # Check if user is still active
@@ -37,8 +43,10 @@ def validate_session_token(token: str, db: Session) -> dict:
     )
 
     if not user:
+        session_validations.inc(result="inactive_user")
         raise ValueError("User account is inactive")
 
+    session_validations.inc(result="valid")
     return {
         "valid": True,
         "user_id": user.id,
@@ -47,6 +55,7 @@ def validate_session_token(token: str, db: Session) -> dict:
     }
 
 
+@tracer.traced()
 def logout_session(token: str, db: Session) -> bool:
     """
     Logout a user session
@@ -61,5 +70,6 @@ def logout_session(token: str, db: Session) -> bool:
 
     login_record.logout_at = datetime.utcnow()
     db.commit()
+    logouts.inc()
 
     return True
@@ -13,6 +13,7 @@ from datetime import datetime
 
 from app.models.waitlist import WaitlistRequest, WaitlistStatus
 from app.services import invitation_service, notification_service
+from app.core.events import event_bus, WaitlistSubmitted, WaitlistInvited, WaitlistRejected
 
 
 async def submit_interest(
@@ -67,21 +68,15 @@ async def submit_interest(
     db.commit()
     db.refresh(waitlist_request)
     
-    # Notify admin about new request
-    await notification_service.send_admin_notification(
-        subject="New Waitlist Request",
-        message=f"""
-A new user has submitted an interest request:
-
-Name: {full_name}
-Email: {email}
-Phone: {phone or 'Not provided'}
-Company: {company or 'Not provided'}
-Role: {role or 'Not provided'}
-
-Please log in to the admin panel to review and approve/reject this request.
-        """
-    )
+    # Admin dashboard update and admin email happen off the request path
+    event_bus.publish(WaitlistSubmitted(
+        request_id=waitlist_request.id,
+        full_name=full_name,
+        email=email,
+        phone=phone,
+        company=company,
+        role=role
+    ))
     
     return waitlist_request
 
@@ -184,14 +179,15 @@ async def approve_request(
     db.commit()
     
     # Send invitation email to user
-    await send_invitation_notification(
+    event_bus.publish(WaitlistInvited(
+        request_id=request_id,
         email=waitlist_request.email,
         full_name=waitlist_request.full_name,
         phone=waitlist_request.phone,
         invitation_code=invitation.code,
         pin=invitation.pin,
         expires_at=invitation.expires_at
-    )
+    ))
     
     return {
         "success": True,
@@ -237,11 +233,12 @@ async def reject_request(
     db.commit()
     
     # Optionally notify user of rejection
-    await send_rejection_notification(
+    event_bus.publish(WaitlistRejected(
+        request_id=request_id,
         email=waitlist_request.email,
         full_name=waitlist_request.full_name,
         reason=reason
-    )
+    ))
     
     return True
 
@@ -2,6 +2,9 @@ import qrcode
 import io
 import base64
 
+from app.core.tracing import tracer
+
+@tracer.traced()
 def create_qr_image(data: str) -> str:
     """
     Generate QR code and return as base64 string
@@ -0,0 +1,109 @@
+"""
+Audit log request-path cost benchmark.
+
+Measures what one audit.log(...) call costs the calling request:
+  1. legacy:  logging.Logger + RotatingFileHandler, key=value line with a
+              json.dumps of details, formatted and written per call
+              (the previous AuditLogger)
+  2. batched: AuditLogger enqueue; the writer thread does the JSON Lines
+              encoding and one write() per batch
+
+Usage:
+    python scripts/bench_audit_log.py [--calls 20000] [--fsync-interval 1]
+"""
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.audit_logger import AuditEventType, AuditLogger
+
+
+def legacy_logger(path: str) -> logging.Logger:
+    logger = logging.getLogger(f"bench.audit.{os.getpid()}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=10 * 1024 * 1024, backupCount=30)
+    handler.setFormatter(logging.Formatter('%(asctime)s | %(levelname)s | %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def legacy_log(logger: logging.Logger, ip: str, details: dict):
+    entry = {
+        "event": AuditEventType.PIN_VERIFIED.value,
+        "success": "false",
+        "ip": ip,
+        "user_id": "nan",
+        "service_id": "nan",
+        "details": json.dumps(details)
+    }
+    logger.warning(" | ".join(f"{k}={v}" for k, v in entry.items()))
+
+
+def measure(call, calls: int) -> list:
+    latencies = []
+    for index in range(calls):
+        details = {"error": "Invalid PIN", "qr_token": f"token-{index}"}
+        started = time.perf_counter()
+        call(f"10.0.{index % 256}.{index % 200}", details)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+def summarize(name: str, latencies: list, elapsed: float):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"   {name:<8} mean={statistics.mean(latencies):7.2f} us   p50={statistics.median(latencies):7.2f} us   "
+        f"p99={p99:8.2f} us   max={latencies[-1]:9.2f} us   total={elapsed:6.3f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--fsync-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print("⏱️  Audit log request-path cost")
+    print(f"   {args.calls} PIN-failure records, fsync interval {args.fsync_interval}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = legacy_logger(os.path.join(tmp, "legacy.log"))
+        started = time.perf_counter()
+        legacy = measure(lambda ip, details: legacy_log(logger, ip, details), args.calls)
+        legacy_elapsed = time.perf_counter() - started
+
+        audit = AuditLogger(
+            log_file=os.path.join(tmp, "audit.jsonl"),
+            queue_size=args.calls,
+            fsync_interval=args.fsync_interval
+        )
+        started = time.perf_counter()
+        batched = measure(
+            lambda ip, details: audit.log(AuditEventType.PIN_VERIFIED, success=False, ip_address=ip, details=details),
+            args.calls
+        )
+        enqueue_elapsed = time.perf_counter() - started
+        audit.flush(timeout=60)
+        drained_elapsed = time.perf_counter() - started
+        audit.close()
+
+        print()
+        summarize("legacy", legacy, legacy_elapsed)
+        summarize("batched", batched, enqueue_elapsed)
+        print()
+        print(f"   batched writer drained everything {drained_elapsed:.3f} s after the first call")
+        print(f"   writer: {audit.stats()}")
+
+
+if __name__ == "__main__":
+    main()
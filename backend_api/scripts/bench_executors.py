@@ -0,0 +1,96 @@
+"""
+Executor isolation benchmark.
+
+Measures PIN-verify style latency (short DB query) while bcrypt-heavy
+admin logins saturate the CPU pool, comparing:
+  1. shared:   everything on one pool (Starlette's default threadpool model)
+  2. isolated: bcrypt on the crypto pool, queries on the db pool
+
+Usage:
+    python scripts/bench_executors.py [--logins 64] [--verifies 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.core.executors import InstrumentedExecutor
+from app.core.security import hash_password, verify_password
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+PASSWORD_HASH = hash_password("benchmark-password")
+
+
+def admin_login():
+    """bcrypt verification, as in admin_service.authenticate_admin"""
+    verify_password("benchmark-password", PASSWORD_HASH)
+
+
+def pin_verify():
+    """Short query, standing in for pin_service.verify_pin_and_create_session"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1")).scalar()
+
+
+async def run_scenario(login_pool, verify_pool, logins: int, verifies: int) -> list:
+    loop = asyncio.get_running_loop()
+    login_tasks = [loop.run_in_executor(login_pool, admin_login) for _ in range(logins)]
+
+    latencies = []
+    for _ in range(verifies):
+        started = time.perf_counter()
+        await loop.run_in_executor(verify_pool, pin_verify)
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.002)
+
+    await asyncio.gather(*login_tasks)
+    return latencies
+
+
+def summarize(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"   {name:<9} p50={statistics.median(latencies):8.2f} ms   "
+        f"p99={p99:8.2f} ms   max={latencies[-1]:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--verifies", type=int, default=200)
+    args = parser.parse_args()
+
+    print("⏱️  Executor isolation benchmark")
+    print(f"   {args.logins} concurrent bcrypt logins, {args.verifies} PIN verifies")
+
+    baseline = asyncio.run(run_scenario(
+        ThreadPoolExecutor(4), ThreadPoolExecutor(4), 0, args.verifies
+    ))
+
+    shared_pool = ThreadPoolExecutor(max_workers=8)
+    shared = asyncio.run(run_scenario(shared_pool, shared_pool, args.logins, args.verifies))
+
+    crypto_pool = InstrumentedExecutor("crypto", 2)
+    db_pool = InstrumentedExecutor("db", 6)
+    isolated = asyncio.run(run_scenario(crypto_pool, db_pool, args.logins, args.verifies))
+
+    print()
+    summarize("idle", baseline)
+    summarize("shared", shared)
+    summarize("isolated", isolated)
+    print()
+    print(f"   crypto pool: {crypto_pool.stats()}")
+    print(f"   db pool:     {db_pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
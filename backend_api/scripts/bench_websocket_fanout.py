@@ -0,0 +1,145 @@
+"""
+WebSocket fan-out benchmark.
+
+Simulates N subscribers (a few of them slow or stalled) and compares:
+  1. sequential: await send_json per connection (the old ConnectionManager)
+  2. fan-out:    serialize once, per-connection queues and writer tasks
+
+Reports time until broadcast() returns and until every healthy
+subscriber has the message.
+
+Usage:
+    python scripts/bench_websocket_fanout.py [--subscribers 10000] [--slow 20] [--stalled 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.websocket_manager import ConnectionManager
+
+MESSAGE = {
+    "schedule_id": 1,
+    "status": "open",
+    "warning": True,
+    "message": "System closing in 9 minutes. Please save your work.",
+    "minutes_until_close": 9,
+    "next_transition_at": "2026-03-02T16:51:00",
+}
+
+
+class Delivery:
+    """Counts healthy deliveries; fires once all have arrived"""
+
+    def __init__(self, expected: int):
+        self.remaining = expected
+        self.done = asyncio.Event()
+
+    def arrived(self):
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.done.set()
+
+
+class SimulatedSocket:
+    def __init__(self, delivery: Delivery, delay: float = 0.0, stalled: bool = False):
+        self.delivery = delivery
+        self.delay = delay
+        self.stalled = stalled
+        self.delivered = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.delivered = True
+        self.delivery.arrived()
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data, separators=(",", ":"), ensure_ascii=False))
+
+    async def close(self, code=1000):
+        pass
+
+
+def make_sockets(count: int, slow: int, stalled: int):
+    delivery = Delivery(count - stalled)
+    sockets = [SimulatedSocket(delivery) for _ in range(count - slow - stalled)]
+    sockets += [SimulatedSocket(delivery, delay=0.05) for _ in range(slow)]
+    sockets += [SimulatedSocket(delivery, stalled=True) for _ in range(stalled)]
+    healthy = sockets[:count - stalled]
+    return sockets, healthy, delivery
+
+
+async def sequential(count: int, slow: int, stalled: int, timeout: float):
+    sockets, healthy, _ = make_sockets(count, slow, stalled)
+    started = time.perf_counter()
+    try:
+        # One stalled client blocks everyone behind it
+        await asyncio.wait_for(_send_each(sockets), timeout)
+        returned = time.perf_counter() - started
+    except asyncio.TimeoutError:
+        returned = None
+    delivered = sum(socket.delivered for socket in healthy)
+    return returned, time.perf_counter() - started, delivered, len(healthy)
+
+
+async def _send_each(sockets):
+    for socket in sockets:
+        await socket.send_json(MESSAGE)
+
+
+async def fanout(count: int, slow: int, stalled: int, timeout: float):
+    manager = ConnectionManager(max_connections=count, send_timeout=1.0, heartbeat_interval=60)
+    sockets, healthy, delivery = make_sockets(count, slow, stalled)
+    for socket in sockets:
+        await manager.connect(socket)
+    await asyncio.sleep(0.1)  # let writer tasks reach their first wait
+
+    started = time.perf_counter()
+    await manager.broadcast(MESSAGE)
+    returned = time.perf_counter() - started
+    try:
+        await asyncio.wait_for(delivery.done.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    all_delivered = time.perf_counter() - started
+    delivered = sum(socket.delivered for socket in healthy)
+
+    for socket in list(manager.connections):
+        manager.disconnect(socket)
+    return returned, all_delivered, delivered, len(healthy)
+
+
+def report(name: str, result):
+    returned, elapsed, delivered, healthy = result
+    returned_text = f"{returned * 1000:9.1f} ms" if returned is not None else "  blocked  "
+    print(
+        f"   {name:<10} broadcast returned {returned_text}   "
+        f"healthy delivered {delivered}/{healthy} after {elapsed * 1000:9.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--slow", type=int, default=20, help="subscribers taking 50 ms per send")
+    parser.add_argument("--stalled", type=int, default=5, help="subscribers that never drain")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"📡 WebSocket fan-out: {args.subscribers} subscribers, {args.slow} slow, {args.stalled} stalled")
+    report("sequential", asyncio.run(sequential(args.subscribers, args.slow, args.stalled, args.timeout)))
+    report("fan-out", asyncio.run(fanout(args.subscribers, args.slow, args.stalled, args.timeout)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Password hash calibration.
+
+Measures hash latency on this host and picks the highest cost that stays
+within a target budget, then benchmarks throughput and memory for each
+scheme. Run it on production hardware and copy the printed settings into
+the environment; existing hashes are upgraded on the next successful
+admin login.
+
+Usage:
+    python scripts/calibrate_password_hash.py [--target-ms 250] [--samples 5]
+
+argon2 is only measured when the optional argon2-cffi package is installed.
+"""
+import argparse
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passlib.hash import bcrypt
+
+PASSWORD = "Calibration-Password-123!"
+
+
+def argon2_available() -> bool:
+    try:
+        import argon2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def make_handler(scheme: str, cost: int, memory_kib: int = 65536, parallelism: int = 2):
+    if scheme == "bcrypt":
+        return bcrypt.using(rounds=cost)
+    from passlib.hash import argon2
+    return argon2.using(time_cost=cost, memory_cost=memory_kib, parallelism=parallelism)
+
+
+def median_hash_ms(handler, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, costs, target_ms: float, samples: int, **options):
+    """Return (chosen_cost, [(cost, median_ms), ...])"""
+    measured = []
+    chosen = costs[0]
+    for cost in costs:
+        ms = median_hash_ms(make_handler(scheme, cost, **options), samples)
+        measured.append((cost, ms))
+        print(f"   {scheme:<6} cost={cost:<3} median={ms:9.1f} ms")
+        if ms <= target_ms:
+            chosen = cost
+        else:
+            break
+    return chosen, measured
+
+
+def _hash_with_rss(args):
+    """Hash in a worker process and report peak RSS growth in KiB"""
+    scheme, cost, options = args
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    make_handler(scheme, cost, **options).hash(PASSWORD)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return after - before
+
+
+def _hash_once(args):
+    scheme, cost, options = args
+    make_handler(scheme, cost, **options).hash(PASSWORD)
+
+
+def benchmark(scheme: str, cost: int, workers: int, count: int, **options):
+    job = (scheme, cost, options)
+    with ProcessPoolExecutor(max_workers=1) as probe:
+        rss_kib = probe.submit(_hash_with_rss, job).result()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(_hash_once, [job] * workers))  # warm up workers
+        started = time.perf_counter()
+        list(pool.map(_hash_once, [job] * count))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"   {scheme:<6} cost={cost:<3} throughput={count / elapsed:7.1f} hashes/s "
+        f"with {workers} workers, peak RSS growth={rss_kib} KiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--count", type=int, default=32, help="hashes per throughput run")
+    parser.add_argument("--argon2-memory-kib", type=int, default=65536)
+    parser.add_argument("--argon2-parallelism", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"🔐 Calibrating password hashing for a {args.target_ms:.0f} ms budget")
+    print()
+
+    bcrypt_rounds, _ = calibrate("bcrypt", list(range(10, 17)), args.target_ms, args.samples)
+    argon2_cost = None
+    argon2_options = {
+        "memory_kib": args.argon2_memory_kib,
+        "parallelism": args.argon2_parallelism,
+    }
+    if argon2_available():
+        argon2_cost, _ = calibrate("argon2", list(range(1, 11)), args.target_ms, args.samples, **argon2_options)
+    else:
+        print("   argon2 skipped (pip install argon2-cffi to measure it)")
+
+    print()
+    print("📊 Throughput and memory")
+    benchmark("bcrypt", bcrypt_rounds, args.workers, args.count)
+    if argon2_cost is not None:
+        benchmark("argon2", argon2_cost, args.workers, args.count, **argon2_options)
+
+    print()
+    print("✅ Suggested settings:")
+    print(f"   BCRYPT_ROUNDS={bcrypt_rounds}")
+    if argon2_cost is not None:
+        print("   # or, to switch schemes:")
+        print("   PASSWORD_HASH_SCHEME=argon2")
+        print(f"   ARGON2_TIME_COST={argon2_cost}")
+        print(f"   ARGON2_MEMORY_KIB={args.argon2_memory_kib}")
+        print(f"   ARGON2_PARALLELISM={args.argon2_parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ sys.path.append('.')
 
 from app.database import SessionLocal
 from app.models.admin import Admin
-from app.core.security import hash_password
+from app.core.password_hasher import password_hasher
 
 def create_admin_account():
     """Create initial admin account"""
@@ -30,7 +30,7 @@ def create_admin_account():
             username=username,
             email=email,
             full_name=full_name,
-            hashed_password=hash_password(password),
+            hashed_password=password_hasher.hash(password),
             is_super_admin=True,
             is_active=True
         )
@@ -52,6 +52,7 @@ def create_admin_account():
         return False
     finally:
         db.close()
+        password_hasher.shutdown()
 
 if __name__ == "__main__":
     create_admin_account()
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Critical-path summary of exported request traces.
+
+Reads TRACE_FILE and its rotated segments, rebuilds each trace from its
+spans and, per endpoint (root span), prints latency percentiles and the
+spans the request spent its time waiting on: for each span, the mean time
+on the critical path and its share of the endpoint's total.
+
+Usage:
+    python scripts/trace_report.py [--file logs/traces.jsonl] [--endpoint pin/verify] [--top 8]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.core.tracing import read_spans, summarize_traces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=settings.TRACE_FILE)
+    parser.add_argument("--backups", type=int, default=settings.TRACE_BACKUP_COUNT)
+    parser.add_argument("--endpoint", help="only endpoints whose name contains this")
+    parser.add_argument("--top", type=int, default=8, help="critical-path spans shown per endpoint")
+    args = parser.parse_args()
+
+    report = summarize_traces(read_spans(args.file, args.backups), endpoint=args.endpoint, top=args.top)
+    if not report:
+        print(f"⚠️  No traces found in {args.file}")
+        return
+
+    print(f"🔍 Critical paths from {args.file}")
+    for endpoint, summary in report.items():
+        print()
+        print(
+            f"{endpoint}  traces={summary['traces']}  p50={summary['p50_ms']:.1f} ms  "
+            f"p95={summary['p95_ms']:.1f} ms  max={summary['max_ms']:.1f} ms"
+        )
+        for entry in summary["critical_path"]:
+            bar = "█" * max(1, round(entry["share"] * 30))
+            print(f"   {entry['share'] * 100:5.1f}%  {entry['mean_ms']:9.3f} ms  {entry['name']:<48} {bar}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.database import Base, get_db
+from app.core.query_budget import assert_query_budget
+from app.core.sql_telemetry import sql_telemetry
 
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
 
@@ -12,6 +14,8 @@ engine = create_engine(
     connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Count test-database statements per request, as on the app engine
+sql_telemetry.instrument(engine)
 
 @pytest.fixture(scope="function")
 def db():
@@ -43,3 +47,11 @@ def mock_system_open():
     with patch("app.routes.registration.is_system_open", return_value=True), \
          patch("app.routes.auth.is_system_open", return_value=True):
         yield
+
+@pytest.fixture
+def query_budget():
+    """
+    with query_budget(max_queries=3): client.get(...)
+    fails if any request inside the block ran more statements
+    """
+    return assert_query_budget
@@ -1,7 +1,7 @@
 import pytest
 from fastapi import status
 from app.models.admin import Admin
-from app.core.security import hash_password
+from app.core.security import hash_password, create_access_token
 
 @pytest.fixture
 def test_admin(db):
@@ -54,3 +54,58 @@ def test_get_pending_users_authorized(client, test_admin):
     )
     assert response.status_code == status.HTTP_200_OK
     assert isinstance(response.json(), list)
+
+def test_admin_login_upgrades_outdated_hash(client, db):
+    from passlib.hash import bcrypt
+    from app.core.security import pwd_context
+
+    weak_hash = bcrypt.using(rounds=4).hash("legacypass")
+    admin = Admin(
+        username="legacy_admin",
+        email="legacy@test.com",
+        full_name="Legacy Admin",
+        hashed_password=weak_hash,
+        is_super_admin=False,
+        is_active=True
+    )
+    db.add(admin)
+    db.commit()
+    assert pwd_context.needs_update(weak_hash)
+
+    response = client.post("/api/admin/login", json={
+        "username": "legacy_admin",
+        "password": "legacypass"
+    })
+    assert response.status_code == status.HTTP_200_OK
+
+    db.refresh(admin)
+    assert admin.hashed_password != weak_hash
+    assert not pwd_context.needs_update(admin.hashed_password)
+    assert pwd_context.verify("legacypass", admin.hashed_password)
+
+def admin_headers(admin):
+    """Bearer headers without going through the (rate limited) login route"""
+    token = create_access_token(data={"sub": admin.username, "type": "admin", "id": admin.id})
+    return {"Authorization": f"Bearer {token}"}
+
+def test_update_weekly_schedule(client, test_admin):
+    headers = admin_headers(test_admin)
+
+    response = client.put("/api/admin/system/weekly-schedule", headers=headers, json={
+        "weekly_windows": {"mon": [{"start": "09:00", "end": "17:00"}]},
+        "exceptions": {"2026-12-25": []},
+        "timezone": "Europe/Berlin"
+    })
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    # Same shape as the request
+    assert data["weekly_windows"]["mon"] == [{"start": "09:00", "end": "17:00"}]
+    assert data["weekly_windows"]["sun"] == []
+    assert data["exceptions"] == {"2026-12-25": []}
+    public = client.get("/api/system/operating-hours").json()
+    assert public["weekly_windows"]["mon"] == [{"start": "09:00", "end": "17:00"}]
+
+    response = client.put("/api/admin/system/weekly-schedule", headers=headers, json={
+        "weekly_windows": {"mon": [{"start": "17:00", "end": "09:00"}]}
+    })
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
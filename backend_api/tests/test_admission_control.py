@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.core.concurrency import ConcurrencyGate, GateRejected
+from app.middleware.admission_control import AdmissionControlMiddleware, classify
+
+
+def test_classify_protects_hot_path():
+    assert classify("/api/auth/pin/verify").name == "auth_hot"
+    assert classify("/api/auth/qr/generate").name == "auth_generate"
+    assert classify("/api/admin/login").name == "admin_login"
+    assert classify("/api/admin/pending").name == "admin"
+    assert classify("/api/system/status").name == "public_read"
+    assert classify("/").name == "public_read"
+    assert classify("/health").name == "public_read"
+    assert classify("/api/register").name == "default"
+
+
+def test_classify_keeps_public_and_list_routes_out_of_narrow_classes():
+    # Only the login itself shares the bcrypt gate
+    assert classify("/api/admin/login-history").name == "admin"
+    # Public forms and status checks under admin-owned prefixes
+    for path in ("/api/interest/submit", "/api/interest/status", "/api/waitlist/submit", "/api/waitlist/status"):
+        assert classify(path).name == "default"
+    assert classify("/api/interest/pending").name == "admin"
+    assert classify("/api/waitlist/3/approve").name == "admin"
+
+
+def test_prometheus_scrapes_have_their_own_class():
+    assert classify("/api/monitoring/prometheus").name == "metrics_scrape"
+    assert classify("/api/monitoring/metrics").name == "admin"
+
+
+def test_profile_and_probes_are_not_gated():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["path"])
+
+    async def scenario():
+        middleware = AdmissionControlMiddleware(app, enabled=True)
+        gate = classify("/api/monitoring/metrics").gate
+        held = [await gate.acquire() for _ in range(gate.limit)]
+        original_wait = gate.max_wait_seconds
+        gate.max_wait_seconds = 0.01
+        try:
+            for path in ("/api/monitoring/profile", "/api/monitoring/live"):
+                await middleware({"type": "http", "path": path}, None, None)
+        finally:
+            gate.max_wait_seconds = original_wait
+            for _ in held:
+                gate.release()
+
+    asyncio.run(scenario())
+    assert seen == ["/api/monitoring/profile", "/api/monitoring/live"]
+
+
+def test_gate_sheds_when_queue_is_full():
+    async def scenario():
+        gate = ConcurrencyGate("test", limit=1, max_queue=1, max_wait_seconds=1)
+        await gate.acquire()
+        waiter = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(GateRejected) as rejected:
+            await gate.acquire()
+        assert rejected.value.reason == "queue_full"
+        gate.release()
+        await waiter
+        assert gate.in_flight == 1
+        gate.release()
+        assert gate.in_flight == 0
+        return gate.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2
+    assert stats["shed_queue_full"] == 1
+
+
+def test_gate_sheds_after_wait_target():
+    async def scenario():
+        gate = ConcurrencyGate("test", limit=1, max_queue=5, max_wait_seconds=0.01)
+        await gate.acquire()
+        with pytest.raises(GateRejected) as rejected:
+            await gate.acquire()
+        assert rejected.value.reason == "wait_timeout"
+        assert gate.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_returns_503_with_retry_after():
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.05)
+
+    async def scenario():
+        middleware = AdmissionControlMiddleware(app, enabled=True)
+        gate = classify("/api/admin/login").gate
+        held = [await gate.acquire() for _ in range(gate.limit)]
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        original_wait = gate.max_wait_seconds
+        gate.max_wait_seconds = 0.01
+        try:
+            await middleware({"type": "http", "path": "/api/admin/login"}, None, send)
+        finally:
+            gate.max_wait_seconds = original_wait
+            for _ in held:
+                gate.release()
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert sent[0]["status"] == 503
+    assert any(name == b"retry-after" for name, _ in sent[0]["headers"])
+
+
+def test_admission_metrics_endpoint(client):
+    response = client.get("/api/monitoring/admission")
+    assert response.status_code == 200
+    assert "auth_hot" in response.json()["route_classes"]
+
+
+def test_route_class_limits_come_from_settings(monkeypatch):
+    from app.config import settings
+    from app.middleware.admission_control import RouteClass
+
+    monkeypatch.setattr(settings, "ADMISSION_PUBLIC_READ_LIMIT", 64)
+    monkeypatch.setattr(settings, "ADMISSION_PUBLIC_READ_WAIT_MS", 250)
+    gate = RouteClass("public_read", ("/health",)).gate
+    assert gate.limit == 64 and gate.max_wait_seconds == 0.25
+    assert RouteClass("public_read", ("/health",), limit=3).gate.limit == 3
@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timedelta
+
+from app.core.audit_index import AuditSearch
+from app.core.audit_logger import AuditEventType, AuditLogger
+from tests.test_admin import admin_headers
+
+
+def fill(audit, count, ip_every=10):
+    for index in range(count):
+        ip = "10.9.9.9" if index % ip_every == 0 else f"10.0.{index % 250}.1"
+        audit.log(
+            AuditEventType.PIN_VERIFIED,
+            success=index % 3 != 0,
+            ip_address=ip,
+            user_id=index,
+            details={"qr_token": f"token-{index}"}
+        )
+
+
+def test_search_across_sealed_and_active_segments(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = AuditLogger(log_file=path, max_bytes=64 * 1024, backup_count=5, batch_size=50)
+    fill(audit, 1200)
+    assert audit.flush()
+    audit.close()
+    assert os.path.exists(path + ".1.seg") and os.path.exists(path + ".1.idx")
+
+    search = AuditSearch(path, backup_count=5)
+    result = search.search(event="pin_verified", success=False, ip="10.9.9.9", limit=1000)
+
+    expected = [index for index in range(1200) if index % 10 == 0 and index % 3 == 0]
+    found = [record["user_id"] for record in result["results"]]
+    # Newest first; everything that was kept is found (oldest segments rotated out)
+    assert found == sorted(found, reverse=True)
+    assert found == [index for index in reversed(expected) if index >= found[-1]]
+    assert result["scan"]["segments"] >= 2
+
+    single = search.search(user_id=1199)
+    assert [record["user_id"] for record in single["results"]] == [1199]
+    assert single["scan"]["blocks_read"] <= 1
+
+
+def test_time_window_prunes_segments(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = AuditLogger(log_file=path, max_bytes=32 * 1024, backup_count=5, batch_size=50)
+    fill(audit, 600)
+    audit.flush()
+    audit.close()
+
+    search = AuditSearch(path, backup_count=5)
+    future = search.search(since=datetime.utcnow() + timedelta(hours=1))
+    assert future["results"] == []
+    assert future["scan"]["blocks_read"] == 0
+
+    limited = search.search(limit=5)
+    assert len(limited["results"]) == 5 and limited["truncated"] is True
+
+
+def test_admin_audit_endpoint(client, db):
+    from app.models.admin import Admin
+
+    admin = Admin(username="audit_admin", email="audit@test.com", full_name="Audit", hashed_password="x")
+    db.add(admin)
+    db.commit()
+
+    response = client.get(
+        "/api/admin/security/audit?event=pin_verified&success=false&ip=10.1.2.3&hours=6",
+        headers=admin_headers(admin)
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"results", "truncated", "scan"}
+
+    assert client.get("/api/admin/security/audit").status_code == 401
+
+
+def test_workers_sharing_one_file_lose_nothing_on_rotation(tmp_path):
+    # Two loggers on one file stand in for two workers
+    path = str(tmp_path / "audit.jsonl")
+    workers = [
+        AuditLogger(log_file=path, max_bytes=20000, backup_count=100, batch_size=10, flush_interval=0.005)
+        for _ in range(2)
+    ]
+    for index in range(400):
+        for worker in workers:
+            worker.log(AuditEventType.LOGOUT, success=True, ip_address="10.0.0.1", user_id=index)
+    for worker in workers:
+        assert worker.flush()
+        worker.close()
+
+    assert sum(worker.stats()["rotations"] for worker in workers) >= 2
+    result = AuditSearch(path, backup_count=100).search(limit=10000)
+    assert len(result["results"]) == 800
@@ -0,0 +1,56 @@
+import json
+import os
+
+from app.core.audit_logger import AuditEventType, AuditLogger
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_written_as_json_lines(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = AuditLogger(log_file=path, fsync_interval=0)
+
+    audit.log(AuditEventType.PIN_VERIFIED, success=False, ip_address="10.0.0.1", details={"error": "Invalid PIN"})
+    audit.log_suspicious("10.0.0.1", "high_failure_rate", {"failures": 12})
+    assert audit.flush()
+    audit.close()
+
+    failed, suspicious = read_records(path)
+    assert failed["event"] == "pin_verified" and failed["level"] == "warning"
+    assert failed["success"] is False and failed["details"] == {"error": "Invalid PIN"}
+    assert suspicious["level"] == "error"
+    assert suspicious["details"] == {"failures": 12, "reason": "high_failure_rate"}
+    assert audit.stats()["fsyncs"] >= 1
+
+
+def test_overflow_is_counted_and_recorded(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    # Writer sleeps between flush intervals, so the queue fills up
+    audit = AuditLogger(log_file=path, queue_size=2, batch_size=100, flush_interval=60)
+
+    for index in range(5):
+        audit.log(AuditEventType.QR_GENERATED, success=True, service_id=index)
+    assert audit.stats()["dropped"] == 3
+    assert audit.flush()
+    audit.close()
+
+    records = read_records(path)
+    assert records[0]["event"] == "audit_dropped" and records[0]["details"] == {"count": 3}
+    assert [record["service_id"] for record in records[1:]] == [0, 1]
+
+
+def test_size_rotation(tmp_path):
+    path = str(tmp_path / "audit.jsonl")
+    audit = AuditLogger(log_file=path, max_bytes=500, backup_count=2, batch_size=1, flush_interval=0.01)
+
+    for index in range(20):
+        audit.log(AuditEventType.LOGOUT, success=True, ip_address=f"10.0.0.{index}")
+        audit.flush()
+    audit.close()
+
+    assert audit.stats()["rotations"] >= 2
+    assert os.path.exists(path + ".1.seg") and os.path.exists(path + ".2.idx")
+    assert not os.path.exists(path + ".1") and not os.path.exists(path + ".3.seg")
@@ -99,3 +99,16 @@ def test_pin_verify_invalid_pin(client, test_service, test_user):
         "pin": "000000"
     })
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+def test_metrics_snapshot_never_holds_raw_tokens(client, test_service):
+    from app.core.metrics import pending_qr_sessions, tracking_key
+
+    response_gen = client.post("/api/auth/qr/generate", json={
+        "service_id": test_service.id,
+        "service_api_key": test_service.api_key
+    })
+    qr_token = response_gen.json()["qr_token"]
+
+    active = pending_qr_sessions.snapshot()["active"]
+    assert tracking_key(qr_token) in active
+    assert qr_token not in active
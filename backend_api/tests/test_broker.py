@@ -0,0 +1,135 @@
+import asyncio
+
+from app.core.broker import LocalBroker, RedisBroker, SQLiteBroker, encode_command, read_reply
+
+
+class StandInRedis:
+    """Minimal RESP server: SUBSCRIBE, RedisBroker's publish script and AUTH"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.sequence = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                command = [part.decode() for part in await read_reply(reader)]
+                name = command[0].upper()
+                if name == "SUBSCRIBE":
+                    for index, channel in enumerate(command[1:], start=1):
+                        self.subscribers.setdefault(channel, []).append(writer)
+                        writer.write(b"*3\r\n$9\r\nsubscribe\r\n" + encode_command(channel)[4:] + b":%d\r\n" % index)
+                elif name == "EVAL":
+                    # INCR + PUBLISH "<id> <payload>", as RedisBroker.PUBLISH_SCRIPT
+                    self.sequence += 1
+                    channel, payload = command[4], f"{self.sequence} {command[5]}"
+                    targets = self.subscribers.get(channel, [])
+                    for target in targets:
+                        target.write(encode_command("message", channel, payload))
+                    writer.write(b":%d\r\n" % self.sequence)
+                else:
+                    writer.write(b"+OK\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def exchange(first, second, messages_per_broker=20):
+    """Two 'workers' publish interleaved; return what each one received"""
+    received = {"first": [], "second": []}
+    ids = {"first": [], "second": []}
+    first.subscribe("status", received["first"].append)
+    second.subscribe("status", received["second"].append)
+    first.subscribe_sequenced("status", lambda message_id, _: ids["first"].append(message_id))
+    second.subscribe_sequenced("status", lambda message_id, _: ids["second"].append(message_id))
+    await first.start()
+    await second.start()
+
+    for index in range(messages_per_broker):
+        await first.publish("status", f"a{index}")
+        await second.publish("status", f"b{index}")
+
+    for _ in range(100):
+        if all(len(values) == messages_per_broker * 2 for values in received.values()):
+            break
+        await asyncio.sleep(0.02)
+
+    await first.stop()
+    await second.stop()
+    # Message ids are shared by every worker and follow delivery order
+    assert ids["first"] == ids["second"] == sorted(set(ids["first"]))
+    return received
+
+
+def test_local_broker_delivers_in_process():
+    received = []
+    broker = LocalBroker()
+    broker.subscribe("status", received.append)
+    asyncio.run(broker.publish("status", "hello"))
+    assert received == ["hello"]
+
+
+def test_sqlite_broker_delivers_once_in_order_to_every_worker(tmp_path):
+    path = str(tmp_path / "broker.db")
+    received = asyncio.run(exchange(SQLiteBroker(path, poll_interval=0.01), SQLiteBroker(path, poll_interval=0.01)))
+
+    assert len(received["first"]) == 40
+    assert received["first"] == received["second"]
+    assert sorted(received["first"]) == sorted([f"a{i}" for i in range(20)] + [f"b{i}" for i in range(20)])
+    # Each publisher's own messages keep their order
+    assert [m for m in received["first"] if m.startswith("a")] == [f"a{i}" for i in range(20)]
+
+
+def test_redis_broker_against_stand_in_server():
+    async def scenario():
+        server = StandInRedis()
+        port = await server.start()
+        url = f"redis://127.0.0.1:{port}"
+        try:
+            return await exchange(RedisBroker(url), RedisBroker(url))
+        finally:
+            await server.stop()
+
+    received = asyncio.run(scenario())
+    assert len(received["first"]) == 40
+    assert received["first"] == received["second"]
+
+
+def test_manager_broadcast_goes_through_broker(tmp_path):
+    from app.core.websocket_manager import ConnectionManager
+
+    class Socket:
+        def __init__(self):
+            self.received = []
+
+        async def accept(self, subprotocol=None):
+            pass
+
+        async def send_text(self, text):
+            self.received.append(text)
+
+    async def scenario():
+        path = str(tmp_path / "broker.db")
+        # Two workers, each with its own manager and subscriber
+        workers = [ConnectionManager(broker=SQLiteBroker(path, poll_interval=0.01)) for _ in range(2)]
+        sockets = [Socket(), Socket()]
+        for manager, socket in zip(workers, sockets):
+            await manager.broker.start()
+            await manager.connect(socket)
+
+        await workers[0].broadcast({"status": "closed"})
+        await asyncio.sleep(0.1)
+        for manager in workers:
+            await manager.broker.stop()
+        return sockets
+
+    assert [socket.received for socket in asyncio.run(scenario())] == [['{"status":"closed"}']] * 2
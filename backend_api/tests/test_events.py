@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.events import EventBus, LoggedOut, PinVerified, event_bus
+
+
+def test_unstarted_bus_delivers_directly():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(LoggedOut, seen.append)
+    bus.subscribe(PinVerified, lambda event: seen.append("pin"))
+
+    bus.publish(LoggedOut(ip="1.2.3.4"))
+    assert [event.ip for event in seen] == ["1.2.3.4"]
+
+
+def test_coroutine_handlers_must_be_background():
+    async def handler(event):
+        pass
+
+    with pytest.raises(ValueError):
+        EventBus().subscribe(LoggedOut, handler, background=False)
+
+
+def test_background_delivery_keeps_order_and_leaves_publisher():
+    async def scenario():
+        bus = EventBus()
+        seen = []
+        publisher_thread = threading.get_ident()
+        threads = []
+
+        async def slow(event):
+            await asyncio.sleep(0.001)
+            seen.append(event.ip)
+
+        def on_pool(event):
+            threads.append(threading.get_ident())
+
+        bus.subscribe(LoggedOut, slow)
+        bus.subscribe(LoggedOut, on_pool, pool="io")
+        await bus.start()
+
+        for index in range(20):
+            bus.publish(LoggedOut(ip=str(index)))
+        # Nothing ran on the publisher's turn
+        assert seen == []
+
+        await bus.stop()
+        return seen, threads, publisher_thread
+
+    seen, threads, publisher_thread = asyncio.run(scenario())
+    assert seen == [str(index) for index in range(20)]
+    assert len(threads) == 20 and publisher_thread not in threads
+
+
+def test_overflow_policies():
+    async def scenario():
+        bus = EventBus()
+        dropped_seen, inline_seen = [], []
+        dropping = bus.subscribe(LoggedOut, dropped_seen.append, queue_size=2)
+        inline = bus.subscribe(LoggedOut, inline_seen.append, queue_size=2, overflow="inline")
+        await bus.start()
+
+        for index in range(5):
+            bus.publish(LoggedOut(ip=str(index)))
+        # Three events past the bound ran immediately for the inline subscriber
+        assert [event.ip for event in inline_seen] == ["2", "3", "4"]
+
+        await bus.stop()
+        return dropping, inline, dropped_seen, inline_seen
+
+    dropping, inline, dropped_seen, inline_seen = asyncio.run(scenario())
+    assert dropping.dropped == 3 and len(dropped_seen) == 2
+    assert inline.overflowed == 3 and len(inline_seen) == 5
+
+
+def test_publish_from_threads():
+    async def scenario():
+        bus = EventBus()
+        seen = []
+        bus.subscribe(LoggedOut, seen.append)
+        await bus.start()
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(None, bus.publish, LoggedOut(ip=str(index)))
+            for index in range(50)
+        ])
+        await bus.stop()
+        return seen
+
+    assert len(asyncio.run(scenario())) == 50
+
+
+def test_app_subscribers_are_wired(client):
+    assert event_bus.running
+
+    stats = {(s["event"], s["name"]): s for s in event_bus.stats()["subscribers"]}
+    assert stats[("PinVerified", "check_suspicious_patterns")]["background"] is True
+    assert stats[("PinVerified", "record_pin_failed")]["background"] is False
@@ -0,0 +1,39 @@
+import asyncio
+import contextvars
+import threading
+
+from app.core.executors import executors, get_executor_stats, run_in
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_run_in_uses_named_pool_and_copies_context():
+    def work():
+        return threading.current_thread().name, request_id.get()
+
+    async def scenario():
+        request_id.set("req-1")
+        return await run_in("render", work)
+
+    before = executors["render"].stats()["completed"]
+    thread_name, seen_id = asyncio.run(scenario())
+
+    assert thread_name.startswith("render-pool")
+    assert seen_id == "req-1"
+    assert get_executor_stats()["render"]["completed"] == before + 1
+
+
+def test_executor_counts_failures():
+    def boom():
+        raise ValueError("nope")
+
+    async def scenario():
+        try:
+            await run_in("io", boom)
+        except ValueError:
+            return True
+        return False
+
+    before = executors["io"].stats()["failed"]
+    assert asyncio.run(scenario()) is True
+    assert executors["io"].stats()["failed"] == before + 1
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+from app.core.health import HealthMonitor, probe_database, probe_disk
+from app.middleware.admission_control import UNGATED_PATHS
+
+
+class FlakyProbe:
+    def __init__(self):
+        self.failing = False
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("refused")
+        return {"calls": self.calls}
+
+
+def test_readiness_tolerates_one_failure_and_startup_latches():
+    database = FlakyProbe()
+    smtp = FlakyProbe()
+    smtp.failing = True
+    monitor = HealthMonitor(interval_seconds=60, timeout_seconds=1, failure_threshold=2)
+    monitor.add_probe("database", database, pool="db")
+    monitor.add_probe("smtp", smtp, critical=False)
+
+    async def scenario():
+        states = [monitor.readiness()["status"]]
+        await monitor.run_once()
+        states.append((monitor.readiness()["ready"], monitor.status()))
+        database.failing = True
+        await monitor.run_once()
+        states.append(monitor.readiness()["ready"])
+        await monitor.run_once()
+        states.append(monitor.readiness())
+        return states
+
+    starting, first, after_one_failure, after_two = asyncio.run(scenario())
+
+    assert starting == "starting"
+    # Non-critical SMTP failure: ready but degraded
+    assert first == (True, "degraded")
+    assert after_one_failure is True
+    assert after_two["ready"] is False and after_two["failing"] == ["database"]
+    assert after_two["status"] == "unavailable"
+    checks = {check["name"]: check for check in after_two["checks"]}
+    assert checks["database"]["consecutive_failures"] == 2
+    assert checks["database"]["error"] == "ConnectionError: refused"
+    assert monitor.startup()["started"] is True
+    assert monitor.liveness()["alive"] is True
+
+
+def test_hung_probe_times_out_and_is_not_stacked():
+    release = threading.Event()
+    calls = []
+
+    def hung():
+        calls.append(1)
+        release.wait(5)
+
+    monitor = HealthMonitor(interval_seconds=60, timeout_seconds=0.05)
+    monitor.add_probe("database", hung, pool="db")
+
+    async def scenario():
+        await monitor.run_once()
+        await monitor.run_once()
+        result = monitor.readiness()
+        release.set()
+        for _ in range(100):
+            if not monitor.probes["database"].running:
+                break
+            await asyncio.sleep(0.01)
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result["checks"][0]["error"] == "timed out after 0.05s"
+    assert len(calls) == 1
+    assert monitor.probes["database"].running is False
+
+
+def test_stale_results_are_not_ready():
+    monitor = HealthMonitor(interval_seconds=60, timeout_seconds=1)
+    monitor.add_probe("database", lambda: None, pool="db")
+    asyncio.run(monitor.run_once())
+    assert monitor.readiness()["ready"] is True
+
+    monitor.probes["database"].checked_at = time.monotonic() - monitor.stale_after - 1
+    assert monitor.readiness()["ready"] is False
+
+
+def test_builtin_probes(tmp_path):
+    assert "pool_checked_out" in probe_database()
+    detail = probe_disk([str(tmp_path / "missing" / "logs")], min_free_mb=0)()
+    assert detail[str(tmp_path / "missing" / "logs")]["free_mb"] > 0
+
+    monitor = HealthMonitor(timeout_seconds=1)
+    monitor.add_probe("disk", probe_disk([str(tmp_path)], min_free_mb=10 ** 12))
+    asyncio.run(monitor.run_once())
+    assert "MB free for" in monitor.checks()[0]["error"]
+
+
+def test_probe_endpoints(client):
+    # The startup hook started the probe loop; wait for its first round
+    for _ in range(200):
+        response = client.get("/api/monitoring/startup")
+        if response.status_code == 200:
+            break
+        time.sleep(0.01)
+    assert response.json()["started"] is True
+
+    assert client.get("/api/monitoring/live").json()["alive"] is True
+    ready = client.get("/api/monitoring/ready")
+    assert ready.status_code == 200
+    assert {check["name"] for check in ready.json()["checks"]} >= {"database", "disk"}
+    assert client.get("/api/system/health").json()["status"] in ("healthy", "degraded")
+    root = client.get("/health").json()
+    assert root["status"] in ("healthy", "degraded") and root["failing"] == []
+    assert "/api/monitoring/ready" in UNGATED_PATHS
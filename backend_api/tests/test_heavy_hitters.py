@@ -0,0 +1,48 @@
+from app.core.heavy_hitters import CountMinSketch, HeavyHitterStream, HeavyHitterTracker
+
+
+def test_count_min_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    for i in range(500):
+        sketch.add(f"key-{i}")
+    for _ in range(40):
+        sketch.add("hot")
+    assert sketch.estimate("hot") >= 40
+    assert sketch.total == 540
+
+
+def test_stream_keeps_heaviest_keys_in_bounded_table():
+    stream = HeavyHitterStream(window_seconds=60, num_windows=5, top_k=3)
+    now = 1_000_000.0
+    for i in range(200):
+        stream.add(f"noise-{i}", now=now)
+    for key, hits in (("a", 50), ("b", 30), ("c", 20)):
+        for _ in range(hits):
+            stream.add(key, now=now)
+
+    top = stream.top(now=now)
+    assert [entry["key"] for entry in top] == ["a", "b", "c"]
+    assert len(stream._top) <= 3
+
+
+def test_stream_scores_decay_as_windows_rotate():
+    stream = HeavyHitterStream(window_seconds=60, num_windows=3, decay=0.5, top_k=5)
+    now = 1_000_020.0
+    for _ in range(10):
+        stream.add("ip", now=now)
+
+    assert stream.top(now=now)[0]["score"] == 10
+    assert stream.top(now=now + 60)[0]["score"] == 5
+    # Once the window falls off the ring the key disappears entirely
+    assert stream.top(now=now + 60 * 3) == []
+
+
+def test_tracker_records_every_dimension():
+    tracker = HeavyHitterTracker(top_k=5)
+    tracker.record("qr_scanned", ip="10.0.0.1", auth_key="key-1")
+    tracker.record("qr_scanned", ip="10.0.0.1")
+
+    snapshot = tracker.snapshot()
+    assert snapshot["qr_scanned"]["ip"][0] == {"key": "10.0.0.1", "score": 2}
+    assert snapshot["qr_scanned"]["auth_key"][0]["key"] == "key-1"
+    assert tracker.top("pin_failed", "ip") == []
@@ -0,0 +1,62 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.core.http_cache import cache_headers, representation_window
+from app.core.schedule_cache import ScheduleSnapshot
+
+
+def make_snapshot():
+    return ScheduleSnapshot.from_schedule(SimpleNamespace(
+        id=1, opening_hour=9, opening_minute=0, closing_hour=17, closing_minute=0,
+        warning_minutes=15, timezone="UTC", is_manually_overridden=False,
+        manual_status=None, override_reason=None, override_expires_at=None,
+        updated_at=datetime(2026, 1, 1)
+    ))
+
+
+def test_max_age_ends_at_next_transition():
+    snapshot = make_snapshot()
+    headers = cache_headers(snapshot, datetime(2026, 3, 2, 16, 44, 50))
+    assert headers["Cache-Control"] == "public, max-age=10"
+    assert headers["Last-Modified"] == "Mon, 02 Mar 2026 09:00:00 GMT"
+
+    # Capped for long stable phases
+    headers = cache_headers(snapshot, datetime(2026, 3, 2, 12, 0))
+    assert headers["Cache-Control"] == "public, max-age=30"
+
+
+def test_etag_changes_with_phase_and_warning_minute():
+    snapshot = make_snapshot()
+    open_tag = cache_headers(snapshot, datetime(2026, 3, 2, 12, 0))["ETag"]
+    assert cache_headers(snapshot, datetime(2026, 3, 2, 13, 0))["ETag"] == open_tag
+
+    warning = cache_headers(snapshot, datetime(2026, 3, 2, 16, 50, 10))["ETag"]
+    assert warning != open_tag
+    assert cache_headers(snapshot, datetime(2026, 3, 2, 16, 50, 40))["ETag"] == warning
+    assert cache_headers(snapshot, datetime(2026, 3, 2, 16, 51, 10))["ETag"] != warning
+
+    key, since, until = representation_window(snapshot, datetime(2026, 3, 2, 16, 50, 10))
+    assert key == "warning-9"
+    assert since <= datetime(2026, 3, 2, 16, 50, 10) < until
+
+
+def test_status_conditional_get(client):
+    first = client.get("/api/system/status")
+    assert first.status_code == 200
+    # A cached body must not carry a clock
+    assert "server_time" not in first.json()
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"].startswith("public, max-age=")
+
+    second = client.get("/api/system/status", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+    third = client.get("/api/system/status", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert third.status_code == 304
+
+    # Different endpoints never share validators
+    hours = client.get("/api/system/operating-hours")
+    assert hours.status_code == 200
+    assert hours.headers["etag"] != etag
+    assert client.get("/health", headers={"If-None-Match": etag}).status_code == 200
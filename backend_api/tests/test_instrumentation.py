@@ -0,0 +1,99 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import histogram_quantile
+from app.middleware.instrumentation import (
+    ROUTE_SCOPE_KEY, UNMATCHED, InstrumentationMiddleware, RouteTable, resolve_route,
+    request_duration, requests_in_flight, requests_total, response_size
+)
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/items/stats")
+    def stats():
+        return {"ok": True}
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    @app.get("/fail")
+    def fail():
+        raise RuntimeError("boom")
+
+    app.add_middleware(InstrumentationMiddleware, enabled=True)
+    return app
+
+
+def test_route_table_matches_router_order():
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    def thing(thing_id: str):
+        return {}
+
+    # Registered after the parameterised route, so the router never reaches it
+    @app.get("/things/special")
+    def special():
+        return {}
+
+    @app.get("/other")
+    def other():
+        return {}
+
+    table = RouteTable(app.routes)
+    assert table.resolve("/other") == "/other"
+    assert table.resolve("/things/special") == "/things/{thing_id}"
+    assert table.resolve("/things/7") == "/things/{thing_id}"
+    assert table.resolve("/nowhere") == UNMATCHED
+
+
+def test_route_resolved_once_per_request():
+    app = build_app()
+    scope = {"type": "http", "app": app, "path": "/items/7"}
+    assert resolve_route(scope) == "/items/{item_id}"
+    # Inner middleware reads the template left on the scope
+    scope["path"] = "/items/stats"
+    assert scope[ROUTE_SCOPE_KEY] == resolve_route(scope) == "/items/{item_id}"
+
+
+def test_requests_recorded_per_route_template():
+    app = build_app()
+    client = TestClient(app, raise_server_exceptions=False)
+
+    for item_id in (1, 2, 3):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/items/stats").status_code == 200
+    assert client.get("/fail").status_code == 500
+    assert client.get("/missing").status_code == 404
+
+    duration = request_duration.labels(method="GET", route="/items/{item_id}")
+    assert duration.count >= 3
+    assert sum(duration.counts) == duration.count
+    assert requests_total.labels(method="GET", route="/items/{item_id}", status=200).value >= 3
+    assert requests_total.labels(method="GET", route="/fail", status=500).value >= 1
+    assert requests_total.labels(method="GET", route=UNMATCHED, status=404).value >= 1
+    assert response_size.labels(method="GET", route="/items/stats").sum >= len(b'{"ok":true}')
+    assert requests_in_flight.labels(method="GET", route="/items/{item_id}").value == 0
+
+
+def test_histogram_quantile_interpolates():
+    buckets = (0.1, 0.2, 0.4)
+    # 10 observations in (0.1, 0.2], 10 in (0.2, 0.4]
+    counts = [0, 10, 10, 0]
+    assert histogram_quantile(buckets, counts, 0.5) == 0.2
+    assert abs(histogram_quantile(buckets, counts, 0.75) - 0.3) < 1e-9
+    assert histogram_quantile(buckets, [0, 0, 0, 0], 0.5) is None
+
+
+def test_http_metrics_endpoint(client):
+    client.get("/api/monitoring/health")
+    response = client.get("/api/monitoring/http")
+    assert response.status_code == 200
+    routes = response.json()["routes"]
+    health = routes["GET /api/monitoring/health"]
+    assert health["count"] >= 1
+    assert health["status"]["200"] >= 1
+    assert health["p50_ms"] is not None
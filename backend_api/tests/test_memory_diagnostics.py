@@ -0,0 +1,123 @@
+import os
+import tracemalloc
+
+import pytest
+
+from app.core.memory_diagnostics import MemoryDiagnostics, SnapshotNotFound, TracingNotStarted, structure_sizes
+from app.middleware.rate_limiter import RateLimiter, get_rate_limiter_stats
+from app.models.admin import Admin
+from tests.test_admin import admin_headers
+
+held = []
+
+
+def allocate_strings(count):
+    held.extend(f"leak-{index:06d}" * 4 for index in range(count))
+
+
+@pytest.fixture
+def memory():
+    diagnostics = MemoryDiagnostics(max_snapshots=2)
+    yield diagnostics
+    diagnostics.stop()
+    held.clear()
+
+
+def test_snapshot_diff_finds_the_growing_line(memory):
+    with pytest.raises(TracingNotStarted):
+        memory.take_snapshot("before")
+
+    assert memory.start()["tracing"] is True
+    memory.take_snapshot("before")
+    allocate_strings(5000)
+    memory.take_snapshot("after")
+
+    diff = memory.diff("before", "after", limit=5)
+    assert diff["size_diff_bytes"] > 5000 * 40
+    top = diff["top"][0]
+    assert top["site"] == f"{__file__}:{allocate_strings.__code__.co_firstlineno + 1}"
+    assert top["count_diff"] >= 5000
+
+    by_file = memory.diff("before", group_by="filename", limit=3)
+    assert by_file["target"] == "now"
+    assert by_file["top"][0]["site"] == __file__
+    assert memory.top("after", limit=1)[0]["size_bytes"] > 0
+
+
+def test_snapshots_are_bounded_and_stop_discards(memory):
+    memory.start()
+    for name in ("a", "b", "c"):
+        memory.take_snapshot(name)
+    assert [snapshot["name"] for snapshot in memory.snapshots()] == ["b", "c"]
+    with pytest.raises(SnapshotNotFound):
+        memory.diff("a", "c")
+
+    status = memory.stop()
+    assert status["tracing"] is False and status["snapshots"] == []
+    assert not tracemalloc.is_tracing()
+
+
+def test_stop_leaves_tracing_started_elsewhere_running(memory):
+    # As with PYTHONTRACEMALLOC: tracing was on before this module started it
+    tracemalloc.start()
+    try:
+        assert memory.start()["started_here"] is False
+        memory.take_snapshot("a")
+        status = memory.stop()
+        assert status["snapshots"] == [] and status["tracing"] is True
+    finally:
+        tracemalloc.stop()
+
+
+def test_rate_limiter_and_structure_sizes():
+    limiter = RateLimiter(name="memory-test")
+    limiter.requests["10.0.0.1"] = []
+    limiter.requests["10.0.0.2"].extend([1, 2])
+    assert get_rate_limiter_stats()["memory-test"] == {
+        "tracked_ips": 2, "empty_ips": 1, "timestamps": 2, "blocked_ips": 0
+    }
+
+    sizes = structure_sizes()
+    assert {"rate_limiters", "websockets", "sqlalchemy", "caches", "buffers"} <= set(sizes)
+    assert sizes["sqlalchemy"]["sessions"] >= 0
+
+
+def test_memory_endpoints(client, db):
+    admin = Admin(
+        username="memory_admin", email="memory@test.com", full_name="Memory",
+        hashed_password="x", is_super_admin=True
+    )
+    db.add(admin)
+    db.commit()
+    headers = admin_headers(admin)
+
+    try:
+        overview = client.get("/api/monitoring/memory", headers=headers).json()
+        assert overview["process"]["gc_objects"] > 0
+        assert "login" in overview["structures"]["rate_limiters"]
+        # The test client's session holds the admin
+        assert overview["structures"]["sqlalchemy"]["identity_map_objects"] >= 1
+
+        assert client.post("/api/monitoring/memory/snapshots", headers=headers).status_code == 409
+        started = client.post("/api/monitoring/memory/tracemalloc/start?frames=2", headers=headers).json()
+        assert started["frames"] == 2 and started["pid"] == os.getpid()
+        pid = started["pid"]
+        response = client.post(f"/api/monitoring/memory/snapshots?name=base&pid={pid}", headers=headers)
+        assert response.json()["name"] == "base" and response.json()["pid"] == pid
+        # Meant for another worker: refused rather than run here
+        response = client.post(f"/api/monitoring/memory/snapshots?name=other&pid={pid + 1}", headers=headers)
+        assert response.status_code == 421
+        snapshots = client.get("/api/monitoring/memory/snapshots", headers=headers).json()["snapshots"]
+        assert [snapshot["name"] for snapshot in snapshots] == ["base"]
+
+        response = client.get(f"/api/monitoring/memory/diff?base=base&limit=5&pid={pid}", headers=headers)
+        assert response.status_code == 200 and len(response.json()["top"]) <= 5
+        assert response.json()["pid"] == pid
+        response = client.get("/api/monitoring/memory/snapshots/base/top?group_by=traceback&limit=3", headers=headers)
+        assert response.status_code == 200
+        assert client.get("/api/monitoring/memory/diff?base=missing", headers=headers).status_code == 404
+        assert client.get("/api/monitoring/memory/diff?base=base&group_by=bogus", headers=headers).status_code == 422
+    finally:
+        assert client.post("/api/monitoring/memory/tracemalloc/stop", headers=headers).json()["tracing"] is False
+
+    assert client.get("/api/monitoring/memory").status_code == 401
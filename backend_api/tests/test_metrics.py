@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import time
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_histogram_and_prometheus_text():
+    registry = MetricsRegistry()
+    scans = registry.counter("scans_total", "Scans by result", ["result"])
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+    scans.inc(result="success")
+    scans.inc(2, result="expired")
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    text = registry.render_prometheus()
+    assert "# TYPE scans_total counter" in text
+    assert 'scans_total{result="expired"} 2' in text
+    assert 'scans_total{result="success"} 1' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert text.endswith("\n")
+
+
+def test_windowed_counter_totals():
+    registry = MetricsRegistry()
+    created = registry.counter("created_total", "Created", windowed=True)
+    created.inc()
+    created.inc()
+
+    # An increment from two hours ago only counts towards the 24h window
+    old_minute = int(time.time() // 60) - 120
+    created._minutes[()][old_minute] = 5
+
+    merged = registry.collect()
+    assert registry.windowed_total(merged, "created_total", 3600) == 2
+    assert registry.windowed_total(merged, "created_total", 86400) == 7
+
+
+def test_tracked_gauge_expiry_and_discard():
+    registry = MetricsRegistry()
+    pending = registry.tracked_gauge("pending", "Pending")
+    now = time.time()
+    pending.add("a", now + 60)
+    pending.add("b", now + 60)
+    pending.add("c", now - 1)
+    pending.discard("b")
+
+    assert registry.value(registry.collect(), "pending") == 1
+
+
+def test_workers_merged_through_directory(tmp_path):
+    directory = str(tmp_path)
+    registry = MetricsRegistry(directory=directory)
+    logins = registry.counter("logins_total", "Logins", windowed=True)
+    pending = registry.tracked_gauge("pending", "Pending")
+    inflight = registry.gauge("inflight", "In flight")
+
+    # Another worker (this pid is alive) and one that has exited
+    expires = time.time() + 60
+    minute = str(int(time.time() // 60))
+    other = {
+        "logins_total": {"series": {"": 3.0}, "minutes": {"": {minute: 3.0}}},
+        "pending": {"active": {"x": expires, "y": expires}, "discarded": {}},
+        "inflight": {"series": {"": 4.0}}
+    }
+    with open(os.path.join(directory, "1.json"), "w") as f:
+        json.dump({"pid": os.getppid(), "metrics": other}, f)
+    with open(os.path.join(directory, "999999999.json"), "w") as f:
+        json.dump({"pid": 999999999, "metrics": other}, f)
+
+    logins.inc()
+    # Scanned here, generated in the other worker
+    pending.discard("x", expires)
+    inflight.set(1)
+
+    merged = registry.collect()
+    assert registry.value(merged, "logins_total") == 7
+    assert registry.windowed_total(merged, "logins_total", 3600) == 7
+    assert registry.value(merged, "pending") == 1
+    # Gauges of exited workers are not included
+    assert registry.value(merged, "inflight") == 5
+
+    registry.flush()
+    with open(os.path.join(directory, f"{os.getpid()}.json")) as f:
+        assert json.load(f)["metrics"]["logins_total"]["series"] == {"": 1.0}
+
+
+def test_merged_counters_stay_monotonic_when_workers_exit(tmp_path):
+    directory = str(tmp_path)
+    registry = MetricsRegistry(directory=directory)
+    logins = registry.counter("logins_total", "Logins", windowed=True)
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+    inflight = registry.gauge("inflight", "In flight")
+
+    worker = subprocess.Popen(["sleep", "30"])
+    minute = str(int(time.time() // 60))
+    other = {
+        "logins_total": {"series": {"": 5.0}, "minutes": {"": {minute: 5.0}}},
+        "latency_seconds": {"buckets": [1.0], "series": {"": {"counts": [2, 1], "sum": 3.5, "count": 3}}},
+        "inflight": {"series": {"": 4.0}}
+    }
+    with open(os.path.join(directory, f"{worker.pid}.json"), "w") as f:
+        json.dump({"pid": worker.pid, "metrics": other}, f)
+    logins.inc()
+
+    def totals():
+        merged = registry.collect()
+        return (
+            registry.value(merged, "logins_total"),
+            merged["latency_seconds"]["series"][""]["count"],
+            registry.windowed_total(merged, "logins_total", 3600)
+        )
+
+    assert totals() == (6, 3, 6)
+    assert registry.value(registry.collect(), "inflight") == 4
+
+    worker.kill()
+    worker.wait()
+    assert totals() == (6, 3, 6)
+    assert not os.path.exists(os.path.join(directory, f"{worker.pid}.json"))
+    assert registry.value(registry.collect(), "inflight") == 0
+
+    # A new process reusing this pid must not overwrite the earlier one's totals
+    registry.flush()
+    fresh = MetricsRegistry(directory=directory)
+    fresh_logins = fresh.counter("logins_total", "Logins", windowed=True)
+    fresh.histogram("latency_seconds", "Latency", buckets=(1.0,))
+    fresh.start()
+    try:
+        fresh_logins.inc()
+        fresh.flush()
+        assert fresh.value(fresh.collect(), "logins_total") == 7
+    finally:
+        fresh.stop()
+
+
+def test_metrics_endpoints_without_queries(client):
+    response = client.get("/api/monitoring/metrics")
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"timestamp", "qr_sessions", "logins", "security", "pending_sessions"}
+    assert set(body["qr_sessions"]) == {"last_hour", "last_24h"}
+
+    response = client.get("/api/monitoring/prometheus")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE auth_qr_sessions_created_total counter" in response.text
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.password_hasher import HashingBusy, PasswordHasher
+from app.core.security import verify_password
+
+
+@pytest.fixture(scope="module")
+def hasher():
+    hasher = PasswordHasher(workers=2, max_pending=8)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify_in_process_pool(hasher):
+    hashed = hasher.hash("s3cret")
+    assert verify_password("s3cret", hashed)
+    assert hasher.verify("s3cret", hashed) is True
+    assert hasher.verify("wrong", hashed) is False
+    assert hasher.stats()["pending"] == 0
+
+
+def test_async_submission(hasher):
+    async def scenario():
+        hashed = await hasher.hash_async("async-pass")
+        return await hasher.verify_async("async-pass", hashed)
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_hash_many_slices_large_batches(hasher):
+    passwords = [f"user-{i}" for i in range(10)]
+    hashes = hasher.hash_many(passwords)
+    assert len(hashes) == 10
+    assert verify_password("user-9", hashes[9])
+
+
+def test_hash_many_waits_for_capacity_held_by_other_callers():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        # Other callers hold every slot: hash_many waits instead of failing
+        hasher._reserve(4)
+        threading.Timer(0.2, hasher._finish, args=(4,)).start()
+        hashes = hasher.hash_many([f"bulk-{i}" for i in range(3)], timeout=5)
+        assert len(hashes) == 3 and verify_password("bulk-2", hashes[2])
+        assert hasher.stats()["rejected"] == 0 and hasher.stats()["pending"] == 0
+
+        hasher._reserve(4)
+        with pytest.raises(HashingBusy):
+            hasher.hash_many(["late"], timeout=0.05)
+        hasher._finish(4)
+    finally:
+        hasher.shutdown()
+
+
+def test_logins_are_not_rejected_during_bulk_import():
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    hashed = hasher.hash("login-pass")
+    imported = []
+    bulk = threading.Thread(target=lambda: imported.extend(hasher.hash_many([f"bulk-{i}" for i in range(12)])))
+
+    async def logins():
+        # Two at a time: everything hash_many leaves free
+        return await asyncio.gather(
+            hasher.hash_async("new-pass"),
+            hasher.verify_and_update_async("login-pass", hashed)
+        )
+
+    try:
+        bulk.start()
+        while bulk.is_alive():
+            assert hasher.stats()["bulk_pending"] <= hasher.bulk_limit
+            asyncio.run(logins())
+            assert hasher.verify_and_update("login-pass", hashed)[0] is True
+        bulk.join()
+        assert len(imported) == 12 and verify_password("bulk-11", imported[11])
+        assert hasher.stats()["rejected"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_rejects_beyond_pending_cap():
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    with pytest.raises(HashingBusy):
+        hasher.hash("x")
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_inline_mode_skips_pool():
+    hasher = PasswordHasher(workers=0, max_pending=1)
+    assert verify_password("inline", hasher.hash("inline"))
+    assert hasher.stats()["running"] is False
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from app.core.profiler import OTHER_STACKS, ProfilerBusy, StackSampler
+from app.models.admin import Admin
+from tests.test_admin import admin_headers
+
+
+def spin_until(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def add_admin(db, super_admin):
+    admin = Admin(
+        username="profile_admin", email="profile@test.com", full_name="Profile",
+        hashed_password="x", is_super_admin=super_admin
+    )
+    db.add(admin)
+    db.commit()
+    return admin
+
+
+def test_samples_busy_thread_and_skips_idle():
+    stop = threading.Event()
+    busy = threading.Thread(target=spin_until, args=(stop,), name="busy-worker_7")
+    idle = threading.Thread(target=stop.wait, name="idle-worker")
+    busy.start()
+    idle.start()
+    try:
+        profile = StackSampler().run(0.3, interval=0.005)
+    finally:
+        stop.set()
+        busy.join()
+        idle.join()
+
+    assert profile.samples > 10
+    lines = profile.collapsed().splitlines()
+    # "<thread>;<root frame>;...;<leaf frame> <count>", pool suffix stripped
+    busy_lines = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy_lines and any("spin_until (" in line for line in busy_lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert not any(line.startswith("idle-worker;") for line in lines)
+    assert not any(line.startswith("stack-sampler;") for line in lines)
+    assert profile.summary()["sampler_cpu_ms"] >= 0
+
+
+def test_one_profile_at_a_time_and_bounded_stacks():
+    sampler = StackSampler(max_seconds=0.2, max_stacks=1)
+    done = []
+    worker = threading.Thread(target=lambda: done.append(sampler.run(5, interval=0.005, include_idle=True)))
+    worker.start()
+    time.sleep(0.05)
+    with pytest.raises(ProfilerBusy):
+        sampler.run(0.1)
+    worker.join()
+
+    profile = done[0]
+    # Duration capped at max_seconds
+    assert profile.seconds < 1
+    assert profile.truncated > 0
+    assert any(OTHER_STACKS in stack for stack in profile.stacks)
+    assert sampler.stats()["running"] is False
+
+
+def test_profile_endpoint_requires_super_admin(client, db):
+    admin = add_admin(db, super_admin=False)
+    assert client.get("/api/monitoring/profile?seconds=0.1").status_code == 401
+    assert client.get("/api/monitoring/profile?seconds=0.1", headers=admin_headers(admin)).status_code == 403
+
+
+def test_profile_endpoint(client, db):
+    admin = add_admin(db, super_admin=True)
+    headers = admin_headers(admin)
+
+    response = client.get("/api/monitoring/profile?seconds=0.2&interval_ms=5&idle=true", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["x-profile-samples"]) > 0
+    assert response.text.strip()
+
+    response = client.get("/api/monitoring/profile?seconds=0.1&format=json", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["profile"]["samples"] > 0
+    assert client.get("/api/monitoring/profile?seconds=0", headers=headers).status_code == 422
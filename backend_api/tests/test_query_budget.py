@@ -0,0 +1,99 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import query_budget
+from app.models.admin import Admin
+from app.models.pending_user import PendingUser
+from tests.conftest import TestingSessionLocal
+from tests.test_admin import admin_headers
+
+
+def add_admin(db):
+    admin = Admin(username="budget_admin", email="budget@test.com", full_name="Budget", hashed_password="x")
+    db.add(admin)
+    db.commit()
+    return admin
+
+
+def add_pending_users(db, count):
+    for index in range(count):
+        db.add(PendingUser(
+            email=f"pending{index}@test.com",
+            username=f"pending{index}",
+            hashed_password="x",
+            full_name=f"Pending {index}",
+            invitation_id=index + 1
+        ))
+    db.commit()
+
+
+def test_track_counts_queries_rows_and_threadpool_work(db):
+    add_pending_users(db, 3)
+
+    def load_all():
+        session = TestingSessionLocal()
+        try:
+            return session.query(PendingUser).all()
+        finally:
+            session.close()
+
+    with query_budget.track() as usage:
+        # Work handed to a pool with the copied context is charged too
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(1) as pool:
+            users = pool.submit(context.run, load_all).result()
+        db.query(PendingUser).count()
+        db.query(PendingUser).count()
+
+    assert len(users) == 3
+    assert usage.queries == 3
+    assert usage.rows == 3
+    assert usage.db_time > 0
+    assert usage.top_repeated()[0][1] == 2
+    assert query_budget.current() is None
+
+
+def test_response_headers_in_debug_mode(client, db):
+    admin = add_admin(db)
+    add_pending_users(db, 1)
+
+    response = client.get("/api/admin/pending", headers=admin_headers(admin))
+    assert response.status_code == 200
+    assert int(response.headers["x-db-queries"]) >= 1
+    assert "x-db-rows" in response.headers and "x-db-time-ms" in response.headers
+
+
+def test_list_query_count_does_not_grow_with_rows(client, db, query_budget):
+    admin = add_admin(db)
+    add_pending_users(db, 10)
+    headers = admin_headers(admin)
+
+    # Admin lookup + one list query, however many rows
+    with query_budget(max_queries=2):
+        assert len(client.get("/api/admin/pending", headers=headers).json()) == 10
+
+
+def test_endpoint_budgets(client, db, query_budget):
+    admin = add_admin(db)
+    add_pending_users(db, 1)
+    headers = admin_headers(admin)
+
+    # Admin, pending user, its invitation
+    with query_budget(max_queries=3):
+        client.get("/api/admin/pending/1", headers=headers)
+    # Admin + one COUNT per status
+    with query_budget(max_queries=6):
+        client.get("/api/waitlist/stats", headers=headers)
+    with query_budget(max_queries=2):
+        client.get("/api/interest/stats", headers=headers)
+
+
+def test_budget_violation_reports_the_route(client, db, query_budget):
+    admin = add_admin(db)
+    headers = admin_headers(admin)
+
+    with pytest.raises(AssertionError, match=r"GET /api/waitlist/stats ran \d+ queries \(budget 1\)"):
+        with query_budget(max_queries=1):
+            client.get("/api/waitlist/stats", headers=headers)
@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.schedule_broadcaster import ScheduleBroadcaster
+
+
+class FakeSchedule:
+    """Status provider that flips from open to closed at a fixed instant"""
+
+    def __init__(self, closes_in: float):
+        self.closes_at = datetime.utcnow() + timedelta(seconds=closes_in)
+
+    def __call__(self):
+        if datetime.utcnow() < self.closes_at:
+            return {"status": "open", "warning": False, "is_manual_override": False,
+                    "next_transition_at": self.closes_at.isoformat()}
+        return {"status": "closed", "warning": False, "is_manual_override": False,
+                "next_transition_at": None}
+
+
+def test_broadcasts_at_transition():
+    published = []
+
+    async def publish(message):
+        published.append((datetime.utcnow(), message))
+
+    schedule = FakeSchedule(closes_in=0.2)
+
+    async def scenario():
+        broadcaster = ScheduleBroadcaster(max_sleep_seconds=5, status_provider=schedule, publish=publish)
+        broadcaster.start()
+        await asyncio.sleep(0.5)
+        await broadcaster.stop()
+        return broadcaster
+
+    broadcaster = asyncio.run(scenario())
+
+    assert len(published) == 1
+    sent_at, message = published[0]
+    assert message["status"] == "closed"
+    assert sent_at >= schedule.closes_at
+    assert (sent_at - schedule.closes_at).total_seconds() < 0.2
+    assert broadcaster.broadcasts == 1
+
+
+def test_wake_replans_without_duplicate_broadcast():
+    published = []
+    calls = []
+
+    def provider():
+        calls.append(1)
+        return {"status": "open", "warning": False, "is_manual_override": False, "next_transition_at": None}
+
+    async def publish(message):
+        published.append(message)
+
+    async def scenario():
+        broadcaster = ScheduleBroadcaster(max_sleep_seconds=30, status_provider=provider, publish=publish)
+        broadcaster.start()
+        await asyncio.sleep(0.05)
+        broadcaster.wake()
+        await asyncio.sleep(0.05)
+        await broadcaster.stop()
+        return broadcaster
+
+    broadcaster = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert broadcaster.wakeups == 1
+    assert published == []
+
+
+def test_status_includes_next_transition(client):
+    response = client.get("/api/system/status")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["next_transition_at"] is not None
+    # Cacheable: no clock in the body (WebSocket pushes carry server_time)
+    assert "server_time" not in data
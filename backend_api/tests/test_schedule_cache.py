@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.core.schedule_cache import ScheduleCache, ScheduleSnapshot
+from app.services import schedule_service
+
+
+def make_snapshot(**overrides):
+    values = dict(
+        id=1, opening_hour=9, opening_minute=0, closing_hour=17, closing_minute=0,
+        warning_minutes=15, timezone="UTC", is_manually_overridden=False,
+        manual_status=None, override_reason=None, override_expires_at=None,
+        updated_at=datetime(2026, 1, 1)
+    )
+    values.update(overrides)
+    return ScheduleSnapshot.from_schedule(SimpleNamespace(**values))
+
+
+def test_snapshot_phases_and_transitions():
+    snapshot = make_snapshot()
+    morning = datetime(2026, 3, 2, 8, 0)
+    assert snapshot.phase(morning) == "closed"
+    assert snapshot.next_transition(morning) == datetime(2026, 3, 2, 9, 0)
+
+    noon = datetime(2026, 3, 2, 12, 0)
+    assert snapshot.phase(noon) == "open"
+    assert snapshot.next_transition(noon) == datetime(2026, 3, 2, 16, 45)
+
+    late = datetime(2026, 3, 2, 16, 50)
+    assert snapshot.phase(late) == "warning"
+    assert snapshot.status(late)["minutes_until_close"] == 10
+    assert snapshot.next_transition(late) == datetime(2026, 3, 2, 17, 0)
+
+    evening = datetime(2026, 3, 2, 18, 0)
+    assert snapshot.next_transition(evening) == datetime(2026, 3, 3, 9, 0)
+
+
+def test_expired_override_is_ignored_without_db():
+    expires = datetime(2026, 3, 2, 12, 0)
+    snapshot = make_snapshot(
+        is_manually_overridden=True, manual_status="closed", override_expires_at=expires
+    )
+    assert snapshot.phase(expires - timedelta(minutes=1)) == "override_closed"
+    assert snapshot.phase(expires + timedelta(minutes=1)) == "open"
+
+
+def test_cache_loads_once_until_invalidated(db, tmp_path):
+    cache = ScheduleCache(str(tmp_path / "schedule.version"), check_interval_seconds=0)
+    cache.get(db)
+    cache.is_open(db)
+    cache.status(db)
+    assert cache.loads == 1
+
+    cache.invalidate()
+    cache.get(db)
+    assert cache.loads == 2
+
+
+def test_cache_reloads_when_another_worker_bumps_version(db, tmp_path):
+    version_file = tmp_path / "schedule.version"
+    cache = ScheduleCache(str(version_file), check_interval_seconds=0)
+    other_worker = ScheduleCache(str(version_file), check_interval_seconds=0)
+    cache.get(db)
+
+    other_worker.invalidate()
+    cache.get(db)
+    assert cache.loads == 2
+
+
+def test_schedule_writes_invalidate_global_cache(db):
+    from app.models.admin import Admin
+    admin = Admin(username="sched", email="s@test.com", full_name="S", hashed_password="x")
+    db.add(admin)
+    db.commit()
+
+    schedule_service.set_manual_override(db, status="closed", admin_id=admin.id)
+    assert schedule_service.is_system_open(db) is False
+    schedule_service.set_manual_override(db, status="open", admin_id=admin.id)
+    assert schedule_service.is_system_open(db) is True
+    schedule_service.clear_manual_override(db, admin_id=admin.id)
+    assert schedule_service.get_system_status(db)["is_manual_override"] is False
+
+
+def test_weekly_windows_with_exceptions_and_timezone():
+    snapshot = make_snapshot(
+        timezone="Europe/Berlin",
+        weekly_windows={"mon": [["09:00", "12:00"], ["13:00", "17:00"]], "tue": [["22:00", "24:00"]],
+                        "wed": [["00:00", "02:00"]]},
+        exceptions={"2026-03-09": []}
+    )
+    # 2026-03-02 is a Monday; Berlin is UTC+1 in March before DST
+    assert snapshot.phase(datetime(2026, 3, 2, 8, 30)) == "open"
+    assert snapshot.closing_at(datetime(2026, 3, 2, 8, 30)) == datetime(2026, 3, 2, 11, 0)
+    assert snapshot.phase(datetime(2026, 3, 2, 11, 30)) == "closed"
+    assert snapshot.next_opening(datetime(2026, 3, 2, 11, 30)) == datetime(2026, 3, 2, 12, 0)
+
+    # Tuesday 22:00 - Wednesday 02:00 is a single open period
+    assert snapshot.closing_at(datetime(2026, 3, 3, 22, 0)) == datetime(2026, 3, 4, 1, 0)
+
+    # Holiday on the following Monday
+    assert snapshot.is_open(datetime(2026, 3, 9, 9, 0)) is False
+    assert snapshot.next_opening(datetime(2026, 3, 8, 12, 0)) == datetime(2026, 3, 10, 21, 0)
+
+
+def test_transition_table_follows_dst():
+    from app.core.schedule_engine import ScheduleRules
+
+    rules = ScheduleRules.daily("Europe/Berlin", 9 * 60, 17 * 60)
+    table = rules.compile(datetime(2026, 3, 27), horizon_days=4)
+    # Berlin switches to UTC+2 on 2026-03-29
+    assert table.next_opening(datetime(2026, 3, 27, 20, 0)) == datetime(2026, 3, 28, 8, 0)
+    assert table.next_opening(datetime(2026, 3, 28, 20, 0)) == datetime(2026, 3, 29, 7, 0)
+
+
+def test_weekly_schedule_validation():
+    import pytest
+    from app.core.schedule_engine import ScheduleRules
+
+    with pytest.raises(ValueError):
+        ScheduleRules.from_config("UTC", {"mon": [["10:00", "09:00"]]})
+    with pytest.raises(ValueError):
+        ScheduleRules.from_config("UTC", {"mon": [["09:00", "12:00"], ["11:00", "13:00"]]})
+    with pytest.raises(ValueError):
+        ScheduleRules.from_config("Mars/Olympus", {"mon": [["09:00", "12:00"]]})
+    with pytest.raises(ValueError):
+        ScheduleRules.from_config("UTC", {"funday": []})
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def test_sync_callers_share_one_execution():
+    flight = SingleFlight("test")
+    runs = []
+    release = threading.Event()
+
+    def slow():
+        runs.append(1)
+        release.wait(2)
+        return {"value": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do_sync("k", slow))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert results == [{"value": 42}] * 8
+    stats = flight.stats()
+    assert stats["executions"] == 1
+    assert stats["shared"] == 7
+    assert stats["coalescing_ratio"] == 0.875
+    assert stats["in_flight"] == 0
+
+
+def test_sync_errors_propagate_to_followers():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do_sync("k", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert errors == ["boom", "boom"]
+    assert flight.stats()["errors"] == 1
+
+
+def test_sync_follower_timeout():
+    flight = SingleFlight("test", timeout=0.05)
+    started = threading.Event()
+    leader = threading.Thread(target=lambda: flight.do_sync("k", lambda: (started.set(), time.sleep(0.3))))
+    leader.start()
+    started.wait()
+    with pytest.raises(SingleFlightTimeout):
+        flight.do_sync("k", lambda: None)
+    leader.join()
+    assert flight.stats()["timeouts"] == 1
+
+
+def test_async_callers_share_one_execution():
+    flight = SingleFlight("test")
+    runs = []
+
+    async def compute():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", compute) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["result"] * 10
+    assert len(runs) == 1
+    assert flight.stats()["shared"] == 9
+
+
+def test_async_timeout_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        with pytest.raises(SingleFlightTimeout):
+            await flight.do("k", compute, timeout=0.01)
+        return await leader
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_services_list_goes_through_flight(client):
+    from app.routes.services import services_flight
+
+    before = services_flight.stats()["calls"]
+    response = client.get("/api/services/list")
+    assert response.status_code == 200
+    assert services_flight.stats()["calls"] == before + 1
@@ -0,0 +1,103 @@
+import contextvars
+import os
+import threading
+import time
+
+import pytest
+
+from app.core.slow_requests import SlowRequestWatchdog, parse_route_thresholds, run_bound, statement_started
+from app.models.admin import Admin
+from tests.test_admin import admin_headers
+
+
+def slow_database_call(seconds):
+    statement_started("SELECT *\n  FROM qr_sessions WHERE token = ?")
+    time.sleep(seconds)
+
+
+def run_request(watchdog, method, route, work):
+    """Request on this thread whose work runs on a pool thread, like run_in()"""
+    record, token = watchdog.begin(method, route, route)
+    context = contextvars.copy_context()
+    worker = threading.Thread(target=context.run, args=(run_bound, work), name="db-pool_3")
+    worker.start()
+    worker.join()
+    watchdog.end(record, token, 200)
+
+
+@pytest.fixture
+def watchdog():
+    watchdog = SlowRequestWatchdog(
+        threshold_ms=10_000,
+        route_thresholds=parse_route_thresholds("POST /api/auth/pin/verify=50, /api/admin/audit=bad"),
+        check_interval_ms=10,
+        max_samples=5
+    )
+    yield watchdog
+    watchdog.stop()
+
+
+def test_route_thresholds(watchdog):
+    assert watchdog.threshold_for("POST", "/api/auth/pin/verify") == 0.05
+    assert watchdog.threshold_for("GET", "/api/auth/pin/verify") == 10
+    assert parse_route_thresholds("/api/admin/audit=5000") == {"/api/admin/audit": 5}
+
+
+def test_fast_requests_leave_nothing(watchdog):
+    run_request(watchdog, "POST", "/api/auth/pin/verify", lambda: None)
+    time.sleep(0.03)
+    assert watchdog.captures() == []
+    assert watchdog.stats()["in_flight"] == 0 and watchdog.stats()["requests"] == 1
+
+
+def test_slow_request_captures_pool_thread_stack_and_sql(watchdog):
+    run_request(watchdog, "POST", "/api/auth/pin/verify", lambda: slow_database_call(0.2))
+
+    [summary] = watchdog.captures()
+    assert summary["route"] == "/api/auth/pin/verify" and summary["status"] == 200
+    assert summary["duration_ms"] >= 200 and summary["threshold_ms"] == 50
+    assert 1 <= summary["samples"] <= 5
+
+    capture = watchdog.capture(summary["id"])
+    sample = capture["samples"][0]
+    assert sample["elapsed_ms"] >= 50
+    assert sample["thread"] == "db-pool_3"
+    assert sample["sql"] == "SELECT * FROM qr_sessions WHERE token = ?"
+    assert any(frame.startswith("slow_database_call (") for frame in sample["stack"])
+    assert watchdog.stats()["slow"] == 1
+
+
+def test_ring_buffer_is_bounded():
+    watchdog = SlowRequestWatchdog(threshold_ms=0, check_interval_ms=5, buffer_size=2)
+    try:
+        for index in range(3):
+            run_request(watchdog, "GET", f"/r{index}", lambda: time.sleep(0.03))
+        assert [capture["route"] for capture in watchdog.captures()] == ["/r2", "/r1"]
+        assert watchdog.captures(route="r1")[0]["route"] == "/r1"
+    finally:
+        watchdog.stop()
+
+
+def test_admin_endpoints(client, db, watchdog, monkeypatch):
+    monkeypatch.setattr("app.routes.admin.slow_requests", watchdog)
+    admin = Admin(username="slow_admin", email="slow@test.com", full_name="Slow", hashed_password="x")
+    db.add(admin)
+    db.commit()
+    headers = admin_headers(admin)
+
+    run_request(watchdog, "POST", "/api/auth/pin/verify", lambda: slow_database_call(0.1))
+
+    response = client.get("/api/admin/slow-requests?route=pin", headers=headers)
+    assert response.status_code == 200
+    [summary] = response.json()["captures"]
+    assert "stack" not in summary
+
+    response = client.get(f"/api/admin/slow-requests/{summary['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["samples"][0]["stack"]
+    assert summary["id"] == f"{os.getpid()}-{summary['id'].split('-')[1]}"
+    assert client.get(f"/api/admin/slow-requests/{os.getpid()}-999999", headers=headers).status_code == 404
+    # Same sequence number, another worker: never this worker's capture
+    other = client.get(f"/api/admin/slow-requests/1-{summary['id'].split('-')[1]}", headers=headers)
+    assert other.status_code == 404 and "belongs to worker 1" in other.json()["detail"]
+    assert client.get("/api/admin/slow-requests").status_code == 401
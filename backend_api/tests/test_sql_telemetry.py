@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+
+from app.core.sql_telemetry import (
+    InstrumentedQueuePool, SQLTelemetry, classify_statement, normalize_statement,
+    pool_timeouts, redact_parameters
+)
+from tests.test_admin import admin_headers
+
+
+def test_normalize_and_classify():
+    statement = "SELECT * FROM qr_sessions\n  WHERE id IN (?, ?, ?) AND status = 'pending' AND failed_attempts > 3"
+    normalized = normalize_statement(statement)
+    assert normalized == "SELECT * FROM qr_sessions WHERE id IN (?...) AND status = ? AND failed_attempts > ?"
+    assert classify_statement(normalized) == ("SELECT", "qr_sessions")
+    assert normalize_statement("UPDATE users SET name=%(name)s WHERE id = :id_1") == "UPDATE users SET name=? WHERE id = ?"
+    assert classify_statement("INSERT INTO login_history (a) VALUES (?)") == ("INSERT", "login_history")
+
+
+def test_parameters_redacted():
+    assert redact_parameters({"token": "secret-token", "id": 7, "at": None}) == {
+        "token": "<str:12>", "id": "<int>", "at": None
+    }
+    assert redact_parameters(("1234", 2.5)) == ["<str:4>", "<float>"]
+    assert redact_parameters([(1,), (2,)], executemany=True) == "<2 parameter sets>"
+
+
+def test_statement_stats_slow_log_and_errors():
+    telemetry = SQLTelemetry(slow_query_ms=0)
+    engine = create_engine("sqlite://")
+    telemetry.instrument(engine)
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER, name TEXT)"))
+        for index in range(3):
+            conn.execute(text("INSERT INTO items VALUES (:id, :name)"), {"id": index, "name": "pin-1234"})
+        conn.execute(text("SELECT name FROM items WHERE id = 1"))
+        conn.execute(text("SELECT name FROM items WHERE id = 2"))
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing"))
+
+    top = {row["statement"]: row for row in telemetry.top_statements(order_by="count")}
+    assert top["INSERT INTO items VALUES (?...)"]["count"] == 3
+    assert top["SELECT name FROM items WHERE id = ?"]["count"] == 2
+    assert top["SELECT * FROM missing"]["errors"] == 1
+    assert telemetry.stats()["errors"] == 1
+
+    # Every statement is "slow" at a 0 ms threshold; values are never kept
+    slow = telemetry.slow_log()
+    assert slow[0]["statement"] == "SELECT * FROM missing" and slow[0]["failed"] is True
+    insert = next(entry for entry in slow if entry["statement"].startswith("INSERT"))
+    assert insert["parameters"] == ["<int>", "<str:8>"]
+    assert "pin-1234" not in repr(slow)
+
+
+def test_statement_table_is_bounded():
+    telemetry = SQLTelemetry(max_statements=2)
+    engine = create_engine("sqlite://")
+    telemetry.instrument(engine)
+    with engine.connect() as conn:
+        for column in ("1", "2 + 2", "'a'", "1 AS x", "2 AS y"):
+            conn.execute(text(f"SELECT {column}"))
+
+    statements = [row["statement"] for row in telemetry.top_statements()]
+    assert len(statements) == 3
+    assert "<other statements>" in statements
+
+
+def test_pool_checkout_timeout_counted(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    before = pool_timeouts.labels().value
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    assert pool_timeouts.labels().value == before + 1
+
+
+def test_database_endpoints(client, db):
+    from app.models.admin import Admin
+
+    admin = Admin(username="sql_admin", email="sql@test.com", full_name="SQL", hashed_password="x")
+    db.add(admin)
+    db.commit()
+
+    response = client.get("/api/admin/database/statements?order=max&limit=5", headers=admin_headers(admin))
+    assert response.status_code == 200
+    assert set(response.json()) == {"order", "statements", "slow_queries", "pool"}
+    assert client.get("/api/admin/database/statements?order=bogus", headers=admin_headers(admin)).status_code == 422
+    assert client.get("/api/admin/database/statements").status_code == 401
+
+    response = client.get("/api/monitoring/database")
+    assert response.status_code == 200
+    assert "pool" in response.json()["database"]
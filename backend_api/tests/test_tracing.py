@@ -0,0 +1,169 @@
+import json
+
+import pytest
+
+from app.core.tracing import SpanExporter, Tracer, parse_traceparent, read_spans, summarize_traces, tracer
+
+PARENT_TRACE = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_SPAN = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def traced(tmp_path, monkeypatch):
+    """Global tracer sampling every request into a temporary file"""
+    exporter = SpanExporter(path=str(tmp_path / "traces.jsonl"), flush_interval=0.01)
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    monkeypatch.setattr(tracer, "max_traces_per_second", 0)
+    yield exporter
+    exporter.close()
+
+
+def written(exporter):
+    assert exporter.flush()
+    return list(read_spans(exporter.path))
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{PARENT_TRACE}-{PARENT_SPAN}-01") == (PARENT_TRACE, PARENT_SPAN, True)
+    assert parse_traceparent(f"00-{PARENT_TRACE.upper()}-{PARENT_SPAN}-00") == (PARENT_TRACE, PARENT_SPAN, False)
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_SPAN}-01") is None
+    assert parse_traceparent(f"ff-{PARENT_TRACE}-{PARENT_SPAN}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_spans_nest_and_export(tmp_path):
+    exporter = SpanExporter(path=str(tmp_path / "traces.jsonl"), flush_interval=0.01)
+    local = Tracer(exporter, sample_rate=0.0)
+
+    # Not sampled: nothing is current, spans are no-ops
+    assert local.start_trace("GET /") is None
+    with local.span("orphan") as orphan:
+        orphan.set("ignored", True)
+
+    @local.traced("users.load")
+    def service_call():
+        local.record_span("db SELECT users", 0.002, statement="SELECT * FROM users")
+        raise ValueError("boom")
+
+    root = local.start_trace("POST /api/auth/pin/verify", f"00-{PARENT_TRACE}-{PARENT_SPAN}-01")
+    with root:
+        with pytest.raises(ValueError):
+            service_call()
+    exporter.close()
+
+    spans = {span["name"]: span for span in read_spans(exporter.path)}
+    assert set(spans) == {"POST /api/auth/pin/verify", "users.load", "db SELECT users"}
+    assert all(span["trace_id"] == PARENT_TRACE for span in spans.values())
+    assert spans["POST /api/auth/pin/verify"]["parent_id"] == PARENT_SPAN
+    call = spans["users.load"]
+    assert call["parent_id"] == root.span_id and call["error"] == "ValueError"
+    assert spans["db SELECT users"]["parent_id"] == call["span_id"]
+    assert local.stats()["continued"] == 1
+
+
+def test_sampling_cap():
+    local = Tracer(SpanExporter(path="unused"), sample_rate=1.0, max_traces_per_second=2)
+    started = [local.start_trace("GET /") for _ in range(5)]
+    assert sum(span is not None for span in started) == 2
+    assert local.throttled == 3
+
+
+def test_request_trace_continues_caller_and_records_db(client, traced):
+    response = client.get("/api/services/list", headers={"traceparent": f"00-{PARENT_TRACE}-{PARENT_SPAN}-01"})
+    assert response.status_code == 200
+    version, trace_id, span_id, flags = response.headers["traceresponse"].split("-")
+    assert trace_id == PARENT_TRACE and flags == "01"
+
+    spans = [span for span in written(traced) if span["trace_id"] == PARENT_TRACE]
+    root = next(span for span in spans if span["span_id"] == span_id)
+    assert root["name"] == "GET /api/services/list"
+    assert root["parent_id"] == PARENT_SPAN
+    assert root["attributes"]["http.status_code"] == 200
+    db_spans = [span for span in spans if span["name"].startswith("db SELECT registered_services")]
+    assert db_spans and "?" in db_spans[0]["attributes"]["statement"]
+
+
+def test_unsampled_caller_is_not_traced(client, traced):
+    response = client.post(
+        "/api/auth/validate-session?token=bad",
+        headers={"traceparent": f"00-{PARENT_TRACE}-{PARENT_SPAN}-00"}
+    )
+    assert response.status_code == 401
+    assert "traceresponse" not in response.headers
+    assert written(traced) == []
+
+    response = client.post("/api/auth/validate-session?token=bad")
+    spans = {span["name"]: span for span in written(traced)}
+    assert spans["session_service.validate_session_token"]["error"] == "ValueError"
+    assert spans["POST /api/auth/validate-session"]["attributes"]["http.status_code"] == 401
+
+
+def test_critical_path_summary():
+    def span(span_id, parent_id, name, start, duration_ms):
+        return {
+            "trace_id": "t1", "span_id": span_id, "parent_id": parent_id, "name": name,
+            "start": start, "duration_ms": duration_ms
+        }
+
+    # Root 100 ms: render 0-30 ms overlapped by the db call 10-60 ms
+    # (waited on), then a commit 70-90 ms
+    spans = [
+        span("r", None, "POST /api/auth/qr/generate", 0.0, 100),
+        span("a", "r", "qr.render", 0.0, 30),
+        span("b", "r", "qr_service.generate_qr_session", 0.010, 50),
+        span("c", "b", "db SELECT registered_services", 0.020, 10),
+        span("d", "r", "db.commit", 0.070, 20),
+    ]
+    report = summarize_traces(spans)
+    summary = report["POST /api/auth/qr/generate"]
+    assert summary["traces"] == 1 and summary["max_ms"] == 100
+    path = {entry["name"]: entry["mean_ms"] for entry in summary["critical_path"]}
+    assert path == pytest.approx({
+        "POST /api/auth/qr/generate": 20,          # 60-70 and 90-100
+        "qr_service.generate_qr_session": 40,
+        "db SELECT registered_services": 10,
+        "db.commit": 20,
+        "qr.render": 10,                           # only 0-10 ms is on the path
+    })
+    assert summarize_traces(spans, endpoint="pin/verify") == {}
+
+
+def test_exporter_rotates(tmp_path):
+    exporter = SpanExporter(path=str(tmp_path / "traces.jsonl"), max_bytes=1, backup_count=2, flush_interval=0.01)
+    local = Tracer(exporter, sample_rate=1.0, max_traces_per_second=0)
+    for index in range(3):
+        with local.start_trace(f"GET /{index}"):
+            pass
+        assert exporter.flush()
+    exporter.close()
+
+    assert exporter.rotations == 3
+    assert not (tmp_path / "traces.jsonl").exists()
+    names = [json.loads(line)["name"] for line in (tmp_path / "traces.jsonl.1").read_text().splitlines()]
+    assert names == ["GET /2"]
+    assert [span["name"] for span in read_spans(exporter.path, backup_count=2)] == ["GET /1", "GET /2"]
+
+
+def test_workers_sharing_the_file_rotate_once(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    first = SpanExporter(path=path, max_bytes=1, backup_count=3, flush_interval=0.01)
+    second = SpanExporter(path=path, max_bytes=1, backup_count=3, flush_interval=0.01)
+    with Tracer(first, sample_rate=1.0, max_traces_per_second=0).start_trace("GET /first"):
+        pass
+    assert first.flush()
+    assert first.rotations == 1
+
+    # The second worker crossed the limit at the same moment, but rotates
+    # only after the first: nothing left to rotate, nothing moved or lost
+    second._rotate()
+    (tmp_path / "traces.jsonl").write_text("")
+    second._rotate()
+    first.close()
+    second.close()
+
+    assert second.rotations == 0 and second.write_errors == 0
+    assert not (tmp_path / "traces.jsonl.2").exists()
+    assert [span["name"] for span in read_spans(path, backup_count=3)] == ["GET /first"]
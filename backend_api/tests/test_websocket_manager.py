@@ -0,0 +1,111 @@
+import asyncio
+
+from app.core.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0, stalled: bool = False):
+        self.delay = delay
+        self.stalled = stalled
+        self.received = []
+        self.closed_with = None
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        self.received.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_stalled_client_does_not_delay_others_and_is_evicted():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, send_timeout=0.1, heartbeat_interval=10)
+        fast = [FakeWebSocket() for _ in range(50)]
+        stalled = FakeWebSocket(stalled=True)
+        for websocket in fast + [stalled]:
+            await manager.connect(websocket)
+
+        await manager.broadcast({"status": "open"})
+        await asyncio.sleep(0.01)
+        assert all(websocket.received == ['{"status":"open"}'] for websocket in fast)
+
+        await asyncio.sleep(0.2)
+        assert stalled not in manager.connections
+        assert stalled.closed_with == 1008
+        assert len(manager.connections) == 50
+        return manager
+
+    manager = asyncio.run(scenario())
+    assert manager.evicted_slow == 1
+
+
+def test_full_queue_evicts_slow_consumer():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, send_timeout=5, heartbeat_interval=10)
+        slow = FakeWebSocket(delay=0.5)
+        await manager.connect(slow)
+        for index in range(5):
+            await manager.broadcast({"n": index})
+        await asyncio.sleep(0)
+        return manager, slow
+
+    manager, slow = asyncio.run(scenario())
+    assert slow not in manager.connections
+    assert manager.evicted_slow == 1
+
+
+def test_connection_cap_and_idle_timeout():
+    async def scenario():
+        manager = ConnectionManager(max_connections=1, heartbeat_interval=0.05, idle_timeout=0.12)
+        first, second = FakeWebSocket(), FakeWebSocket()
+        assert await manager.connect(first) is True
+        assert await manager.connect(second) is False
+        assert second.closed_with == 1013
+
+        await asyncio.sleep(0.08)
+        assert first.received == ['{"type": "ping"}']
+        await asyncio.sleep(0.2)
+        return manager, first
+
+    manager, first = asyncio.run(scenario())
+    assert first not in manager.connections
+    assert first.closed_with == 1001
+    assert manager.evicted_idle == 1
+
+
+def test_system_ws_answers_ping(client):
+    with client.websocket_connect("/api/system/ws") as websocket:
+        websocket.send_text("ping")
+        assert websocket.receive_json() == {"type": "pong"}
+
+
+def test_broadcast_local_skips_the_broker():
+    class RecordingBroker:
+        def __init__(self):
+            self.published = []
+
+        def subscribe(self, channel, handler):
+            pass
+
+        async def publish(self, channel, payload):
+            self.published.append(payload)
+
+    async def scenario():
+        broker = RecordingBroker()
+        manager = ConnectionManager(queue_size=2, send_timeout=1, heartbeat_interval=10, broker=broker)
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+        await manager.broadcast_local({"status": "closed"})
+        await asyncio.sleep(0.01)
+        return broker, websocket
+
+    broker, websocket = asyncio.run(scenario())
+    # Each worker's schedule broadcaster pushes its own transitions
+    assert broker.published == []
+    assert websocket.received == ['{"status":"closed"}']
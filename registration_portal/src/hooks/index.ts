@@ -539,6 +539,12 @@ export function useSystemStatus(): UseSystemStatusReturn {
                     if (!isMounted) return;
                     try {
                         const newStatus = JSON.parse(event.data);
+                        // Server heartbeat: answer so the connection isn't closed as idle
+                        if (newStatus.type === 'ping') {
+                            socket?.send('pong');
+                            return;
+                        }
+                        if (newStatus.type === 'pong') return;
                         setStatus(newStatus);
                         setIsLoading(false);
                         // Clear any previous error